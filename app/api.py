@@ -0,0 +1,102 @@
+import datetime
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from reflex.config import get_config
+from starlette.applications import Starlette
+from starlette.concurrency import iterate_in_threadpool
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.ledger.exports import EXPORT_CHUNK_ROWS, EXPORT_FORMATS, export_formats
+from app.ledger.query import TransactionQuery
+from app.storage.base import LedgerStore
+from app.telemetry import METRICS_ENABLED, prometheus_text
+
+EXPORT_TTL_SECONDS = 300
+"""How long an export link stays valid after the event that made it."""
+
+
+@dataclass(frozen=True)
+class PendingExport:
+    """What an export link streams: a store at the revision it was requested, and the
+    filters. No rows are held; they are read chunk by chunk while the body is sent."""
+
+    store: LedgerStore
+    query: TransactionQuery
+    format: str
+    created: float
+
+
+_exports: OrderedDict[str, PendingExport] = OrderedDict()
+_exports_lock = threading.Lock()
+
+
+def register_export(store: LedgerStore, query: TransactionQuery, format: str) -> str:
+    """The unguessable key of a new export link. Links live in this process, like the
+    sessions' state in the default in-memory state manager."""
+    if format not in export_formats():
+        raise ValueError(f"Cannot export as {format!r}")
+    now = time.monotonic()
+    key = secrets.token_urlsafe(16)
+    with _exports_lock:
+        while _exports:
+            oldest = next(iter(_exports.values()))
+            if now - oldest.created < EXPORT_TTL_SECONDS:
+                break
+            _exports.popitem(last=False)
+        _exports[key] = PendingExport(store, query, format, now)
+    return key
+
+
+def export_url(key: str) -> str:
+    return f"{get_config().api_url.rstrip('/')}/export/{key}"
+
+
+async def _stream(
+    export: PendingExport, chunk_rows: int = EXPORT_CHUNK_ROWS
+) -> AsyncIterator[bytes]:
+    """The export's body. Reading and encoding each chunk runs in a worker thread, so
+    neither a database query nor the encoding blocks other sessions' events."""
+    chunks = export.store.iter_transactions(export.query, chunk_rows)
+    pieces = EXPORT_FORMATS[export.format].encode(chunks)
+    async for piece in iterate_in_threadpool(pieces):
+        yield piece
+
+
+async def download_export(request: Request) -> Response:
+    """Streams an export registered by TransactionListState.export_transactions."""
+    with _exports_lock:
+        export = _exports.get(request.path_params["key"])
+    if export is None or time.monotonic() - export.created >= EXPORT_TTL_SECONDS:
+        return PlainTextResponse("This export link has expired.", status_code=404)
+    spec = EXPORT_FORMATS[export.format]
+    filename = f"fintrack-transactions-{datetime.date.today()}.{spec.extension}"
+    return StreamingResponse(
+        _stream(export),
+        media_type=spec.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def metrics(request: Request) -> Response:
+    """The var and event timings for a Prometheus scrape, when FINTRACK_METRICS=1."""
+    if not METRICS_ENABLED:
+        return PlainTextResponse("Metrics are off; set FINTRACK_METRICS=1.", 404)
+    return PlainTextResponse(
+        prometheus_text(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+api = Starlette(
+    routes=[
+        Route("/export/{key}", download_export),
+        Route("/metrics", metrics),
+    ]
+)
+"""Backend routes next to Reflex's own; mounted with rx.App(api_transformer=api)."""
@@ -5,6 +5,9 @@ from app.pages.budgets import budgets_page
 from app.pages.analytics import analytics_page
 from app.pages.insights import insights_page
 from app.components.transaction_form import transaction_form
+from app.middleware import DecodeCounterMiddleware, EventTimingMiddleware
+from app.telemetry import METRICS_ENABLED
+from app.api import api
 
 app = rx.App(
     theme=rx.theme(appearance="light"),
@@ -16,8 +19,12 @@ app = rx.App(
             rel="stylesheet",
         ),
     ],
+    api_transformer=api,
 )
-app.add_page(dashboard, route="/")
-app.add_page(budgets_page, route="/budgets")
-app.add_page(analytics_page, route="/analytics")
-app.add_page(insights_page, route="/insights")
\ No newline at end of file
+app.add_middleware(DecodeCounterMiddleware())
+if METRICS_ENABLED:
+    app.add_middleware(EventTimingMiddleware())
+app.add_page(dashboard, route="/", on_load=AppState.check_storage)
+app.add_page(budgets_page, route="/budgets", on_load=AppState.check_storage)
+app.add_page(analytics_page, route="/analytics", on_load=AppState.check_storage)
+app.add_page(insights_page, route="/insights", on_load=AppState.check_storage)
\ No newline at end of file
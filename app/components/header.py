@@ -1,5 +1,6 @@
 import reflex as rx
-from app.state import AppState
+from app.state import AppState, ImportState, TransactionFormState
+from app.components.import_dialog import import_dialog
 
 
 def header() -> rx.Component:
@@ -18,10 +19,16 @@ def header() -> rx.Component:
             )
         ),
         rx.el.div(
+            rx.el.button(
+                rx.icon("upload", class_name="mr-2 h-4 w-4"),
+                "Import",
+                on_click=ImportState.toggle_import_dialog,
+                class_name="flex items-center text-sm font-medium bg-white text-gray-700 border px-4 py-2 rounded-lg shadow-sm hover:bg-gray-50 transition-colors mr-2",
+            ),
             rx.el.button(
                 rx.icon("circle_plus", class_name="mr-2 h-4 w-4"),
                 "Add Transaction",
-                on_click=AppState.toggle_transaction_dialog,
+                on_click=TransactionFormState.toggle_transaction_dialog,
                 class_name="flex items-center text-sm font-medium bg-blue-600 text-white px-4 py-2 rounded-lg shadow-sm hover:bg-blue-700 transition-colors",
             ),
             rx.el.div(
@@ -34,6 +41,7 @@ def header() -> rx.Component:
                 ),
                 class_name="relative ml-4",
             ),
+            import_dialog(),
             class_name="flex items-center",
         ),
         class_name="flex items-center justify-between h-16 border-b bg-white px-4 md:px-6 sticky top-0 z-30",
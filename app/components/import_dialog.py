@@ -0,0 +1,95 @@
+import reflex as rx
+from app.state import ImportState
+
+
+def import_dialog() -> rx.Component:
+    return rx.radix.primitives.dialog.root(
+        rx.radix.primitives.dialog.portal(
+            rx.radix.primitives.dialog.overlay(
+                class_name="fixed inset-0 z-50 bg-black bg-opacity-40"
+            ),
+            rx.radix.primitives.dialog.content(
+                rx.el.div(
+                    rx.el.h2(
+                        "Import Transactions",
+                        class_name="text-2xl font-bold text-gray-900",
+                    ),
+                    rx.radix.primitives.dialog.close(
+                        rx.el.button(
+                            rx.icon("x", class_name="h-5 w-5"),
+                            class_name="p-1 rounded-full hover:bg-gray-100",
+                            aria_label="Close",
+                        )
+                    ),
+                    class_name="flex items-center justify-between pb-4 border-b",
+                ),
+                rx.upload.root(
+                    rx.el.div(
+                        rx.icon("upload", class_name="h-8 w-8 text-gray-400"),
+                        rx.el.p(
+                            "Drop a bank statement here, or click to choose one",
+                            class_name="text-sm font-medium text-gray-700",
+                        ),
+                        rx.el.p(
+                            "CSV, OFX, QFX or QIF",
+                            class_name="text-xs text-gray-500",
+                        ),
+                        class_name="flex flex-col items-center gap-2",
+                    ),
+                    id="import_upload",
+                    multiple=False,
+                    accept={
+                        "text/csv": [".csv"],
+                        "application/x-ofx": [".ofx", ".qfx"],
+                        "application/qif": [".qif"],
+                    },
+                    disabled=ImportState.importing,
+                    on_drop=ImportState.upload_import(
+                        rx.upload_files(upload_id="import_upload")
+                    ),
+                    class_name="mt-4 flex justify-center rounded-lg border-2 border-dashed border-gray-300 px-6 py-10 cursor-pointer hover:border-blue-400",
+                ),
+                rx.cond(
+                    ImportState.importing,
+                    rx.el.div(
+                        rx.el.div(
+                            class_name="h-2 rounded-full bg-blue-600 transition-all",
+                            style={"width": ImportState.import_progress.to(str) + "%"},
+                        ),
+                        class_name="mt-4 h-2 w-full rounded-full bg-gray-200",
+                    ),
+                    None,
+                ),
+                rx.cond(
+                    ImportState.import_count + ImportState.import_skipped > 0,
+                    rx.el.div(
+                        rx.el.p(
+                            ImportState.import_count.to(str) + " imported, ",
+                            ImportState.import_skipped.to(str) + " skipped",
+                            class_name="text-sm font-medium text-gray-700",
+                        ),
+                        rx.foreach(
+                            ImportState.import_messages,
+                            lambda message: rx.el.p(
+                                message, class_name="text-xs text-gray-500"
+                            ),
+                        ),
+                        class_name="mt-4 flex flex-col gap-1",
+                    ),
+                    None,
+                ),
+                rx.cond(
+                    ImportState.import_error != "",
+                    rx.el.div(
+                        rx.icon("flag_triangle_right", class_name="h-4 w-4 mr-2"),
+                        rx.el.p(ImportState.import_error),
+                        class_name="mt-4 flex items-center text-sm text-red-600 bg-red-50 p-3 rounded-lg",
+                    ),
+                    None,
+                ),
+                class_name="bg-white p-6 rounded-2xl shadow-xl w-full max-w-lg z-50 fixed top-1/2 left-1/2 -translate-x-1/2 -translate-y-1/2",
+            ),
+        ),
+        open=ImportState.show_import_dialog,
+        on_open_change=ImportState.set_show_import_dialog,
+    )
@@ -1,12 +1,14 @@
 import reflex as rx
-from app.state import AppState
+from app.state import AppState, SidebarState
 
 
 def nav_item(text: str, icon: str, href: str, is_active: bool) -> rx.Component:
     return rx.el.a(
         rx.icon(icon, class_name="h-5 w-5 shrink-0"),
         rx.cond(
-            ~AppState.sidebar_collapsed, rx.el.span(text, class_name="truncate"), None
+            ~SidebarState.sidebar_collapsed,
+            rx.el.span(text, class_name="truncate"),
+            None,
         ),
         href=href,
         class_name=rx.cond(
@@ -30,7 +32,7 @@ def sidebar() -> rx.Component:
                 rx.el.a(
                     rx.icon("wallet-cards", class_name="h-8 w-8 text-blue-600"),
                     rx.cond(
-                        ~AppState.sidebar_collapsed,
+                        ~SidebarState.sidebar_collapsed,
                         rx.el.span("Financly", class_name="sr-only"),
                         None,
                     ),
@@ -39,7 +41,7 @@ def sidebar() -> rx.Component:
                 ),
                 rx.el.button(
                     rx.icon("panel-left-close", class_name="h-5 w-5"),
-                    on_click=AppState.toggle_sidebar,
+                    on_click=SidebarState.toggle_sidebar,
                     class_name="rounded-lg p-2 hover:bg-gray-100",
                     aria_label="Toggle sidebar",
                 ),
@@ -60,7 +62,7 @@ def sidebar() -> rx.Component:
         ),
         rx.el.div(
             rx.cond(
-                ~AppState.sidebar_collapsed,
+                ~SidebarState.sidebar_collapsed,
                 rx.el.div(
                     rx.el.div(
                         rx.el.h3(
@@ -83,7 +85,7 @@ def sidebar() -> rx.Component:
             class_name="mt-auto p-4",
         ),
         class_name=rx.cond(
-            AppState.sidebar_collapsed,
+            SidebarState.sidebar_collapsed,
             "hidden border-r bg-white md:flex flex-col w-20 transition-all duration-300 ease-in-out",
             "hidden border-r bg-white md:flex flex-col w-64 transition-all duration-300 ease-in-out",
         ),
@@ -1,5 +1,5 @@
 import reflex as rx
-from app.state import AppState
+from app.state import AppState, LoanState
 
 
 def stat_card(
@@ -43,14 +43,14 @@ def stats_cards() -> rx.Component:
                 rx.el.div(
                     rx.el.p("Payables", class_name="text-xs text-gray-500"),
                     rx.el.p(
-                        f"${AppState.pending_payables.to_string()}",
+                        f"${LoanState.pending_payables.to_string()}",
                         class_name="font-bold text-orange-500",
                     ),
                 ),
                 rx.el.div(
                     rx.el.p("Receivables", class_name="text-xs text-gray-500"),
                     rx.el.p(
-                        f"${AppState.pending_receivables.to_string()}",
+                        f"${LoanState.pending_receivables.to_string()}",
                         class_name="font-bold text-teal-500",
                     ),
                 ),
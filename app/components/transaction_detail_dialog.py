@@ -1,5 +1,5 @@
 import reflex as rx
-from app.state import AppState
+from app.state import TransactionDetailState
 from app.components.transaction_list import status_badge
 
 
@@ -26,7 +26,7 @@ def transaction_detail_dialog() -> rx.Component:
                             class_name="text-2xl font-bold text-gray-900",
                         ),
                         rx.el.p(
-                            f"ID: {AppState.selected_transaction.get('id', '')}",
+                            f"ID: {TransactionDetailState.selected_transaction.get('id', '')}",
                             class_name="text-xs text-gray-400 mt-1",
                         ),
                     ),
@@ -42,34 +42,43 @@ def transaction_detail_dialog() -> rx.Component:
                 rx.el.div(
                     detail_row(
                         "Amount",
-                        f"${AppState.selected_transaction.get('amount', 0).to_string()}",
+                        f"${TransactionDetailState.selected_transaction.get('amount', 0).to_string()}",
                         "dollar-sign",
                     ),
                     detail_row(
                         "Date",
-                        AppState.selected_transaction.get("date", ""),
+                        TransactionDetailState.selected_transaction.get("date", ""),
                         "calendar",
                     ),
                     detail_row(
-                        "Type", AppState.selected_transaction.get("type", ""), "tag"
+                        "Type",
+                        TransactionDetailState.selected_transaction.get("type", ""),
+                        "tag",
                     ),
                     detail_row(
                         "Category",
-                        AppState.selected_transaction.get("category", "N/A"),
+                        TransactionDetailState.selected_transaction.get(
+                            "category", "N/A"
+                        ),
                         "layout-grid",
                     ),
                     rx.cond(
-                        AppState.selected_transaction.get("party", "") != "",
+                        TransactionDetailState.selected_transaction.get("party", "")
+                        != "",
                         detail_row(
                             "Party",
-                            AppState.selected_transaction.get("party", "N/A"),
+                            TransactionDetailState.selected_transaction.get(
+                                "party", "N/A"
+                            ),
                             "user",
                         ),
                         None,
                     ),
                     detail_row(
                         "Description",
-                        AppState.selected_transaction.get("description", "N/A"),
+                        TransactionDetailState.selected_transaction.get(
+                            "description", "N/A"
+                        ),
                         "file-text",
                     ),
                     rx.el.div(
@@ -77,17 +86,21 @@ def transaction_detail_dialog() -> rx.Component:
                         rx.el.span("Status", class_name="font-medium text-gray-600"),
                         rx.el.div(
                             status_badge(
-                                AppState.selected_transaction.get("status", "")
+                                TransactionDetailState.selected_transaction.get(
+                                    "status", ""
+                                )
                             ),
                             class_name="flex justify-end",
                         ),
                         class_name="grid grid-cols-3 items-center gap-2 text-sm",
                     ),
                     rx.cond(
-                        AppState.selected_transaction.contains("linked_transaction_id"),
+                        TransactionDetailState.selected_transaction.contains(
+                            "linked_transaction_id"
+                        ),
                         detail_row(
                             "Linked To",
-                            AppState.selected_transaction.get(
+                            TransactionDetailState.selected_transaction.get(
                                 "linked_transaction_id", ""
                             ),
                             "link-2",
@@ -97,7 +110,9 @@ def transaction_detail_dialog() -> rx.Component:
                     class_name="flex flex-col gap-3 mt-4",
                 ),
                 rx.cond(
-                    AppState.selected_transaction.contains("loan_details"),
+                    TransactionDetailState.selected_transaction.contains(
+                        "loan_details"
+                    ),
                     rx.el.div(
                         rx.el.h3(
                             "Loan Information",
@@ -105,31 +120,31 @@ def transaction_detail_dialog() -> rx.Component:
                         ),
                         detail_row(
                             "Loan Type",
-                            AppState.selected_transaction["loan_details"]
+                            TransactionDetailState.selected_transaction["loan_details"]
                             .to(dict)["type"]
                             .to(str),
                             "landmark",
                         ),
                         detail_row(
                             "Principal",
-                            f"${AppState.selected_transaction['loan_details'].to(dict)['principal'].to(str)}",
+                            f"${TransactionDetailState.selected_transaction['loan_details'].to(dict)['principal'].to(str)}",
                             "banknote",
                         ),
                         detail_row(
                             "Interest Rate",
-                            f"{AppState.selected_transaction['loan_details'].to(dict)['interest_rate'].to(str)}%",
+                            f"{TransactionDetailState.selected_transaction['loan_details'].to(dict)['interest_rate'].to(str)}%",
                             "percent",
                         ),
                         detail_row(
                             "Status",
-                            AppState.selected_transaction["loan_details"]
+                            TransactionDetailState.selected_transaction["loan_details"]
                             .to(dict)["status"]
                             .to(str),
                             "shield-check",
                         ),
                         detail_row(
                             "Remaining Balance",
-                            f"${AppState.selected_transaction['loan_details'].to(dict)['outstanding_balance'].to(str)}",
+                            f"${TransactionDetailState.selected_transaction['loan_details'].to(dict)['outstanding_balance'].to(str)}",
                             "wallet",
                         ),
                     ),
@@ -145,6 +160,6 @@ def transaction_detail_dialog() -> rx.Component:
                 class_name="bg-white p-6 rounded-2xl shadow-xl w-full max-w-lg z-50 fixed top-1/2 left-1/2 -translate-x-1/2 -translate-y-1/2",
             ),
         ),
-        open=AppState.show_transaction_detail_dialog,
-        on_open_change=AppState.close_transaction_detail_dialog,
+        open=TransactionDetailState.show_transaction_detail_dialog,
+        on_open_change=TransactionDetailState.close_transaction_detail_dialog,
     )
\ No newline at end of file
@@ -1,5 +1,6 @@
 import reflex as rx
-from app.state import AppState, TransactionType
+from app.ledger import TRANSACTION_TYPES
+from app.state import LoanState, TransactionFormState
 
 
 def transaction_form() -> rx.Component:
@@ -30,14 +31,15 @@ def transaction_form() -> rx.Component:
                         ),
                         rx.el.div(
                             rx.foreach(
-                                AppState.transaction_types,
+                                TRANSACTION_TYPES,
                                 lambda type: rx.el.button(
                                     type,
-                                    on_click=lambda: AppState.set_transaction_type(
+                                    on_click=lambda: TransactionFormState.set_transaction_type(
                                         type
                                     ),
                                     class_name=rx.cond(
-                                        AppState.current_transaction_type == type,
+                                        TransactionFormState.current_transaction_type
+                                        == type,
                                         "px-3 py-1 text-xs font-semibold rounded-full bg-blue-100 text-blue-700 border border-blue-200",
                                         "px-3 py-1 text-xs font-medium rounded-full bg-white text-gray-600 border hover:bg-gray-50",
                                     ),
@@ -89,10 +91,19 @@ def transaction_form() -> rx.Component:
                         class_name="flex gap-4",
                     ),
                     rx.cond(
-                        (AppState.current_transaction_type == "Payables")
-                        | (AppState.current_transaction_type == "Receivables")
-                        | (AppState.current_transaction_type == "Loan Taken")
-                        | (AppState.current_transaction_type == "Loan Given"),
+                        (TransactionFormState.current_transaction_type == "Payables")
+                        | (
+                            TransactionFormState.current_transaction_type
+                            == "Receivables"
+                        )
+                        | (
+                            TransactionFormState.current_transaction_type
+                            == "Loan Taken"
+                        )
+                        | (
+                            TransactionFormState.current_transaction_type
+                            == "Loan Given"
+                        ),
                         rx.el.div(
                             rx.el.label(
                                 "Party (Name)",
@@ -107,8 +118,11 @@ def transaction_form() -> rx.Component:
                         None,
                     ),
                     rx.cond(
-                        (AppState.current_transaction_type == "Loan Taken")
-                        | (AppState.current_transaction_type == "Loan Given"),
+                        (TransactionFormState.current_transaction_type == "Loan Taken")
+                        | (
+                            TransactionFormState.current_transaction_type
+                            == "Loan Given"
+                        ),
                         rx.el.div(
                             rx.el.label(
                                 "Interest Rate (%)",
@@ -125,12 +139,21 @@ def transaction_form() -> rx.Component:
                         None,
                     ),
                     rx.cond(
-                        (AppState.current_transaction_type == "Loan Taken")
-                        | (AppState.current_transaction_type == "Loan Given"),
+                        (TransactionFormState.current_transaction_type == "Loan Taken")
+                        | (
+                            TransactionFormState.current_transaction_type
+                            == "Loan Given"
+                        ),
                         None,
                         rx.cond(
-                            (AppState.current_transaction_type == "Loan Payment")
-                            | (AppState.current_transaction_type == "Interest Payment"),
+                            (
+                                TransactionFormState.current_transaction_type
+                                == "Loan Payment"
+                            )
+                            | (
+                                TransactionFormState.current_transaction_type
+                                == "Interest Payment"
+                            ),
                             rx.el.div(
                                 rx.el.label(
                                     "Select Loan",
@@ -141,7 +164,7 @@ def transaction_form() -> rx.Component:
                                         "Select a loan...", value="", disabled=True
                                     ),
                                     rx.foreach(
-                                        AppState.active_loans,
+                                        LoanState.active_loans,
                                         lambda loan: rx.el.option(
                                             f"{loan.type} - {loan.party} (${loan.principal})",
                                             value=loan.id,
@@ -162,7 +185,7 @@ def transaction_form() -> rx.Component:
                                         "Select a category...", value="", disabled=True
                                     ),
                                     rx.foreach(
-                                        AppState.categories_for_type,
+                                        TransactionFormState.categories_for_type,
                                         lambda category: rx.el.option(
                                             category, value=category
                                         ),
@@ -186,10 +209,10 @@ def transaction_form() -> rx.Component:
                         ),
                     ),
                     rx.cond(
-                        AppState.form_error != "",
+                        TransactionFormState.form_error != "",
                         rx.el.div(
                             rx.icon("flag_triangle_right", class_name="h-4 w-4 mr-2"),
-                            rx.el.p(AppState.form_error),
+                            rx.el.p(TransactionFormState.form_error),
                             class_name="flex items-center text-sm text-red-600 bg-red-50 p-3 rounded-lg",
                         ),
                         None,
@@ -210,12 +233,12 @@ def transaction_form() -> rx.Component:
                         class_name="mt-6 flex gap-4",
                     ),
                     class_name="flex flex-col gap-4 mt-4",
-                    on_submit=AppState.add_transaction,
+                    on_submit=TransactionFormState.add_transaction,
                     reset_on_submit=True,
                 ),
                 class_name="bg-white p-6 rounded-2xl shadow-xl w-full max-w-lg z-50 fixed top-1/2 left-1/2 -translate-x-1/2 -translate-y-1/2",
             ),
         ),
-        open=AppState.show_transaction_dialog,
-        on_open_change=AppState.set_show_transaction_dialog,
+        open=TransactionFormState.show_transaction_dialog,
+        on_open_change=TransactionFormState.set_show_transaction_dialog,
     )
\ No newline at end of file
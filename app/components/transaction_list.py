@@ -1,5 +1,12 @@
 import reflex as rx
-from app.state import AppState, Transaction, TransactionStatus
+from app.ledger import EXPORT_FORMATS, TRANSACTION_TYPES, export_formats
+from app.models import TransactionStatus
+from app.state import (
+    AppState,
+    Transaction,
+    TransactionDetailState,
+    TransactionListState,
+)
 
 
 def status_badge(status: rx.Var[TransactionStatus]) -> rx.Component:
@@ -110,7 +117,9 @@ def transaction_item(t: Transaction) -> rx.Component:
                 ),
                 rx.el.button(
                     rx.icon("eye", class_name="h-4 w-4"),
-                    on_click=lambda: AppState.view_transaction_details(t.id),
+                    on_click=lambda: TransactionDetailState.view_transaction_details(
+                        t.id
+                    ),
                     class_name="text-gray-400 hover:text-blue-600 ml-2",
                 ),
                 rx.el.button(
@@ -126,6 +135,65 @@ def transaction_item(t: Transaction) -> rx.Component:
     )
 
 
+def pagination_controls() -> rx.Component:
+    return rx.el.div(
+        rx.el.p(
+            f"Showing {TransactionListState.page_start}-{TransactionListState.page_end} of {TransactionListState.filtered_count}",
+            class_name="text-sm text-gray-600",
+        ),
+        rx.el.div(
+            rx.el.select(
+                rx.foreach(
+                    ["10", "25", "50", "100"],
+                    lambda size: rx.el.option(f"{size} / page", value=size),
+                ),
+                on_change=TransactionListState.set_page_size,
+                value=TransactionListState.page_size.to_string(),
+                class_name="rounded-lg border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm",
+            ),
+            rx.el.button(
+                rx.icon("chevron-left", class_name="h-4 w-4"),
+                on_click=TransactionListState.previous_page,
+                disabled=~TransactionListState.has_previous_page,
+                class_name="p-2 rounded-lg border border-gray-200 text-gray-600 hover:bg-gray-50 disabled:opacity-50",
+            ),
+            rx.el.button(
+                rx.icon("chevron-right", class_name="h-4 w-4"),
+                on_click=TransactionListState.next_page,
+                disabled=~TransactionListState.has_next_page,
+                class_name="p-2 rounded-lg border border-gray-200 text-gray-600 hover:bg-gray-50 disabled:opacity-50",
+            ),
+            class_name="flex items-center gap-2",
+        ),
+        class_name="flex items-center justify-between px-6 py-3 border-t border-gray-200 bg-gray-50",
+    )
+
+
+def export_menu() -> rx.Component:
+    return rx.menu.root(
+        rx.menu.trigger(
+            rx.el.button(
+                rx.icon("download", class_name="mr-2 h-4 w-4"),
+                "Export",
+                class_name="flex items-center text-sm font-medium bg-white text-gray-700 border px-4 py-2 rounded-lg shadow-sm hover:bg-gray-50 transition-colors",
+            )
+        ),
+        rx.menu.content(
+            *[
+                rx.menu.item(
+                    f"{label} as .{EXPORT_FORMATS[format].extension}",
+                    on_click=TransactionListState.export_transactions(format, scope),
+                )
+                for scope, label in (
+                    ("filtered", "Filtered transactions"),
+                    ("all", "All transactions"),
+                )
+                for format in export_formats()
+            ],
+        ),
+    )
+
+
 def transaction_list() -> rx.Component:
     headers = ["Description", "Amount", "Type", "Date", "Status", "Actions"]
     return rx.el.div(
@@ -133,14 +201,15 @@ def transaction_list() -> rx.Component:
             rx.el.h2(
                 "Transaction History", class_name="text-xl font-bold text-gray-800"
             ),
-            class_name="mb-4",
+            export_menu(),
+            class_name="flex items-center justify-between mb-4",
         ),
         rx.el.div(
             rx.el.div(
                 rx.el.input(
                     placeholder="Search transactions...",
-                    on_change=AppState.set_search_query.debounce(300),
-                    default_value=AppState.search_query,
+                    on_change=TransactionListState.set_search_query.debounce(300),
+                    default_value=TransactionListState.search_query,
                     class_name="w-full rounded-lg border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm",
                 ),
                 class_name="flex-grow",
@@ -148,25 +217,26 @@ def transaction_list() -> rx.Component:
             rx.el.select(
                 rx.el.option("All Types", value=""),
                 rx.foreach(
-                    AppState.transaction_types,
+                    TRANSACTION_TYPES,
                     lambda type: rx.el.option(type, value=type),
                 ),
-                on_change=AppState.set_filter_type,
-                value=AppState.filter_type,
+                on_change=TransactionListState.set_filter_type,
+                value=TransactionListState.filter_type,
                 class_name="rounded-lg border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm",
             ),
             rx.el.select(
                 rx.el.option("All Categories", value=""),
                 rx.foreach(
-                    AppState.all_categories, lambda cat: rx.el.option(cat, value=cat)
+                    TransactionListState.all_categories,
+                    lambda cat: rx.el.option(cat, value=cat),
                 ),
-                on_change=AppState.set_filter_category,
-                value=AppState.filter_category,
+                on_change=TransactionListState.set_filter_category,
+                value=TransactionListState.filter_category,
                 class_name="rounded-lg border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm",
             ),
             rx.el.button(
                 "Clear",
-                on_click=AppState.clear_filters,
+                on_click=TransactionListState.clear_filters,
                 class_name="text-sm text-gray-600 hover:text-gray-900",
             ),
             class_name="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-4 mb-4 items-center",
@@ -187,7 +257,9 @@ def transaction_list() -> rx.Component:
                         )
                     ),
                     rx.el.tbody(
-                        rx.foreach(AppState.filtered_transactions, transaction_item),
+                        rx.foreach(
+                            TransactionListState.visible_transactions, transaction_item
+                        ),
                         class_name="bg-white divide-y divide-gray-200",
                     ),
                     class_name="min-w-full",
@@ -196,7 +268,7 @@ def transaction_list() -> rx.Component:
                 scrollbars="horizontal",
             ),
             rx.cond(
-                AppState.filtered_transactions.length() == 0,
+                TransactionListState.filtered_count == 0,
                 rx.el.div(
                     rx.icon("folder-search", class_name="h-12 w-12 text-gray-400"),
                     rx.el.h3(
@@ -209,7 +281,7 @@ def transaction_list() -> rx.Component:
                     ),
                     class_name="flex flex-col items-center justify-center text-center p-16 border-2 border-dashed rounded-lg mt-4",
                 ),
-                None,
+                pagination_controls(),
             ),
             class_name="overflow-hidden border border-gray-200 rounded-xl",
         ),
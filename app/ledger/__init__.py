@@ -0,0 +1,144 @@
+from app.ledger.codec import (
+    STORAGE_CODEC,
+    JsonCodec,
+    OrjsonCodec,
+    storage_codec,
+)
+from app.ledger.columns import (
+    LedgerColumns,
+    day_ordinal,
+    ledger_columns,
+    month_key,
+    month_label,
+    month_of_day,
+    prefix_days,
+)
+from app.ledger.exports import (
+    EXPORT_CHUNK_ROWS,
+    EXPORT_FORMATS,
+    ExportFormat,
+    csv_chunks,
+    export_formats,
+    jsonl_chunks,
+    parquet_chunks,
+)
+from app.ledger.imports import (
+    DEFAULT_CATEGORY,
+    IMPORT_BATCH_SIZE,
+    PARSERS,
+    ImportBatch,
+    import_batches,
+    import_format,
+    import_ids,
+    import_row,
+    parse_csv,
+    parse_file,
+    parse_ofx,
+    parse_qif,
+    read_lines,
+    transaction_type,
+)
+from app.ledger.index import (
+    SORT_KEYS,
+    SortedIndex,
+    TransactionIndex,
+    carry_sorted_indexes,
+    date_index,
+    loan_index,
+    sorted_index,
+    transaction_index,
+)
+from app.ledger.journal import (
+    EMPTY_JOURNAL,
+    JOURNAL_COMPACT_BYTES,
+    JournalRecord,
+    append_records,
+    delete_record,
+    needs_compaction,
+    put_record,
+)
+from app.ledger.metrics import (
+    LedgerMetrics,
+    MetricCell,
+    aggregate,
+    ledger_metrics,
+    scan_counter,
+)
+from app.ledger.packed import (
+    PACKED_VERSION,
+    is_packed,
+    pack_transactions,
+    unpack_transactions,
+)
+from app.ledger.query import (
+    SORT_MODES,
+    TransactionCursor,
+    TransactionPage,
+    TransactionQuery,
+    amount_by_category,
+    amount_by_type,
+    count_transactions,
+    filter_transactions,
+    filtered_transactions,
+    query_days,
+    seek_transactions,
+    sort_field,
+    sorted_transactions,
+    transaction_matcher,
+)
+from app.ledger.records import (
+    TransactionLike,
+    TransactionRecord,
+    as_record,
+)
+from app.ledger.rollup import (
+    LedgerRollup,
+    RollupCell,
+    RollupKey,
+    decode_rollup,
+    ledger_rollup,
+    rollup_key,
+)
+from app.ledger.rules import (
+    BUDGET_CATEGORIES,
+    CATEGORIES_FOR_TYPE,
+    EXPENSE_TYPES,
+    LOAN_PAYMENT_TYPES,
+    LOAN_TYPES,
+    NEW_LOAN_TYPES,
+    PARTY_TYPES,
+    PENDING_TYPES,
+    TRANSACTION_TYPES,
+    transaction_error,
+)
+from app.ledger.search import (
+    SearchIndex,
+    carry_search_index,
+    search_index,
+    search_text,
+)
+from app.ledger.shards import (
+    SHARD_COUNT,
+    ShardManifest,
+    TransactionShard,
+    decode_manifest,
+    decode_shard,
+    merge_shards,
+    shard_ledger,
+    shard_of,
+    shards_between,
+    write_shards,
+)
+from app.ledger.snapshot import (
+    LedgerCache,
+    LedgerRevision,
+    LedgerSnapshot,
+    RowLoader,
+    budget_loader,
+    decode_count,
+    decode_counter,
+    event_decodes,
+    ledger_cache,
+    loan_loader,
+    transaction_loader,
+)
@@ -0,0 +1,70 @@
+import functools
+import json
+import os
+from typing import Any, Union
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from app.ledger.records import TransactionRecord
+
+STORAGE_CODEC = os.environ.get("FINTRACK_CODEC", "auto")
+"""How ledger blobs, journals and rollups are serialized: "orjson", "json" (stdlib), or
+"auto" for orjson when it is installed. Both write plain JSON, so they read each other's
+blobs and the setting can change between runs."""
+
+
+def _encode_default(value: Any) -> Any:
+    if isinstance(value, TransactionRecord):
+        return value.to_dict()
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class JsonCodec:
+    """The stdlib json codec, the fallback when orjson is not installed.
+
+    dumps takes rows as they are held in memory (TransactionRecord, pydantic models) as
+    well as plain JSON values.
+    """
+
+    name = "json"
+
+    def dumps(self, value: Any) -> str:
+        return json.dumps(value, default=_encode_default)
+
+    def loads(self, raw: Union[str, bytes]) -> Any:
+        return json.loads(raw)
+
+
+class OrjsonCodec(JsonCodec):
+    """orjson, which encodes TransactionRecord dataclasses natively and only falls back
+    to a dict for pydantic models (loans and budgets)."""
+
+    name = "orjson"
+
+    def dumps(self, value: Any) -> str:
+        return orjson.dumps(value, default=_encode_default).decode()
+
+    def loads(self, raw: Union[str, bytes]) -> Any:
+        # orjson takes str itself only; a field's rx.LocalStorage default is a subclass.
+        if type(raw) is not str and isinstance(raw, str):
+            raw = str(raw)
+        return orjson.loads(raw)
+
+
+@functools.cache
+def storage_codec(name: str = STORAGE_CODEC) -> JsonCodec:
+    """The codec called name; "auto" picks orjson when it can be imported."""
+    if name == "orjson" or (name == "auto" and orjson is not None):
+        if orjson is None:
+            raise ImportError("FINTRACK_CODEC=orjson needs the orjson package")
+        return OrjsonCodec()
+    if name in ("json", "auto"):
+        return JsonCodec()
+    raise ValueError(f"Unknown FINTRACK_CODEC {name!r}, expected orjson, json or auto")
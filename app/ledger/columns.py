@@ -0,0 +1,319 @@
+import datetime
+import functools
+import threading
+from collections import OrderedDict
+from operator import attrgetter
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Generic,
+    Iterable,
+    Optional,
+    Sequence,
+    TypeVar,
+)
+
+import numpy as np
+
+from app.ledger.records import TransactionRecord
+
+T = TypeVar("T")
+
+INVALID_DAY = 0
+"""Day ordinal of a transaction whose date does not parse; no date range contains it."""
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def day_ordinal(date: str) -> int:
+    try:
+        return datetime.date.fromisoformat(date).toordinal()
+    except ValueError:
+        return INVALID_DAY
+
+
+def month_of_day(day: int) -> int:
+    """The month index (year * 12 + month - 1) of a day ordinal."""
+    date = datetime.date.fromordinal(day)
+    return date.year * 12 + date.month - 1
+
+
+@functools.lru_cache(maxsize=1024)
+def month_key(month: int) -> str:
+    """The "YYYY-MM" key of a month index."""
+    year, m = divmod(month, 12)
+    return f"{year:04d}-{m + 1:02d}"
+
+
+@functools.lru_cache(maxsize=1024)
+def month_label(month: int) -> str:
+    """The chart label ("Jan 2025") of a month index."""
+    year, m = divmod(month, 12)
+    return datetime.date(year, m + 1, 1).strftime("%b %Y")
+
+
+def day_ordinals(dates: list[str]) -> np.ndarray:
+    """Day ordinals of ISO dates, parsed in bulk; unparseable dates get INVALID_DAY."""
+    try:
+        days = np.array(dates, dtype="datetime64[D]")
+    except ValueError:
+        return np.fromiter(map(day_ordinal, dates), np.int32, len(dates))
+    return np.where(
+        np.isnat(days), INVALID_DAY, days.astype(np.int64) + EPOCH_ORDINAL
+    ).astype(np.int32)
+
+
+def _encode(values: Iterable[str], n: int) -> tuple[np.ndarray, tuple[str, ...]]:
+    """Small integer codes for values, numbered in order of first appearance."""
+    vocabulary: dict[str, int] = {}
+    codes = np.fromiter(
+        (vocabulary.setdefault(v, len(vocabulary)) for v in values), np.int32, n
+    )
+    return codes, tuple(vocabulary)
+
+
+def prefix_days(prefix: str) -> Optional[tuple[int, int]]:
+    """The [first, last) day ordinals of dates starting with a "YYYY", "YYYY-MM" or full date prefix."""
+    try:
+        if len(prefix) == 4:
+            year = int(prefix)
+            return (
+                datetime.date(year, 1, 1).toordinal(),
+                datetime.date(year + 1, 1, 1).toordinal(),
+            )
+        if len(prefix) == 7:
+            year, month = int(prefix[:4]), int(prefix[5:])
+            first = datetime.date(year, month, 1)
+            return (
+                first.toordinal(),
+                (first + datetime.timedelta(days=31)).replace(day=1).toordinal(),
+            )
+        if len(prefix) == 10:
+            day = datetime.date.fromisoformat(prefix).toordinal()
+            return day, day + 1
+    except ValueError:
+        pass
+    return None
+
+
+@dataclass(frozen=True, eq=False)
+class LedgerColumns:
+    """A columnar copy of transactions, in the order of the rows it is built from.
+
+    type, category and status hold codes into their vocabularies; day holds date ordinals
+    and month holds year * 12 + month - 1.
+    """
+
+    amount: np.ndarray
+    type: np.ndarray
+    category: np.ndarray
+    status: np.ndarray
+    day: np.ndarray
+    month: np.ndarray
+    types: tuple[str, ...]
+    categories: tuple[str, ...]
+    statuses: tuple[str, ...]
+
+    @classmethod
+    def build(cls, transactions: Iterable[TransactionRecord]) -> "LedgerColumns":
+        rows = (
+            transactions if isinstance(transactions, Sequence) else list(transactions)
+        )
+        n = len(rows)
+        type_codes, types = _encode(map(attrgetter("type"), rows), n)
+        category_codes, categories = _encode(map(attrgetter("category"), rows), n)
+        status_codes, statuses = _encode(map(attrgetter("status"), rows), n)
+        day = day_ordinals(list(map(attrgetter("date"), rows)))
+        # datetime64[M] counts months since 1970-01.
+        months = (day - EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[M]")
+        month = np.where(day > INVALID_DAY, months.astype(np.int64) + 1970 * 12, -1)
+        return cls(
+            amount=np.fromiter(map(attrgetter("amount"), rows), np.float64, n),
+            type=type_codes,
+            category=category_codes,
+            status=status_codes,
+            day=day,
+            month=month.astype(np.int32),
+            types=types,
+            categories=categories,
+            statuses=statuses,
+        )
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    def _code(self, vocabulary: tuple[str, ...], value: str) -> int:
+        return vocabulary.index(value) if value in vocabulary else -1
+
+    def _group_sum(
+        self, codes: np.ndarray, vocabulary: tuple[str, ...], mask
+    ) -> dict[str, float]:
+        """Sums amount per code over the masked rows, keyed in order of first masked row."""
+        if mask is not None:
+            codes, amount = codes[mask], self.amount[mask]
+        else:
+            amount = self.amount
+        if not len(codes):
+            return {}
+        totals = np.bincount(codes, weights=amount, minlength=len(vocabulary))
+        present, first = np.unique(codes, return_index=True)
+        return {
+            vocabulary[code]: float(totals[code]) for code in present[np.argsort(first)]
+        }
+
+    def mask(
+        self,
+        tx_type: str = "",
+        category: str = "",
+        days: Optional[tuple[int, int]] = None,
+    ) -> Optional[np.ndarray]:
+        """Rows of a type and category with a day in [first, last); None if unfiltered."""
+        mask = None
+        if tx_type:
+            mask = self.type == self._code(self.types, tx_type)
+        if category:
+            matches = self.category == self._code(self.categories, category)
+            mask = matches if mask is None else mask & matches
+        if days is not None:
+            within = (self.day >= days[0]) & (self.day < days[1])
+            mask = within if mask is None else mask & within
+        return mask
+
+    def spliced(
+        self,
+        removed: Sequence[int],
+        inserted: Sequence[int],
+        rows: Sequence[TransactionRecord],
+    ) -> "LedgerColumns":
+        """A copy without the rows at positions removed, then with rows inserted before
+        positions inserted, as numpy.delete and numpy.insert take them.
+
+        Values the copy has not seen are appended to its vocabularies, so existing codes
+        keep their meaning.
+        """
+        new = LedgerColumns.build(rows)
+
+        def splice(old: np.ndarray, values: np.ndarray) -> np.ndarray:
+            return np.insert(np.delete(old, removed), inserted, values)
+
+        def merge(
+            codes: np.ndarray,
+            vocabulary: tuple[str, ...],
+            new_codes: np.ndarray,
+            new_vocabulary: tuple[str, ...],
+        ) -> tuple[np.ndarray, tuple[str, ...]]:
+            merged = vocabulary + tuple(
+                v for v in new_vocabulary if v not in vocabulary
+            )
+            remap = np.array([merged.index(v) for v in new_vocabulary], np.int32)
+            return splice(codes, remap[new_codes]), merged
+
+        type_codes, types = merge(self.type, self.types, new.type, new.types)
+        category_codes, categories = merge(
+            self.category, self.categories, new.category, new.categories
+        )
+        status_codes, statuses = merge(
+            self.status, self.statuses, new.status, new.statuses
+        )
+        return LedgerColumns(
+            amount=splice(self.amount, new.amount),
+            type=type_codes,
+            category=category_codes,
+            status=status_codes,
+            day=splice(self.day, new.day),
+            month=splice(self.month, new.month),
+            types=types,
+            categories=categories,
+            statuses=statuses,
+        )
+
+    def amount_by_type(self, status: Optional[str] = None) -> dict[str, float]:
+        mask = None
+        if status is not None:
+            mask = self.status == self._code(self.statuses, status)
+        return self._group_sum(self.type, self.types, mask)
+
+    def count_by_type(self) -> dict[str, int]:
+        counts = np.bincount(self.type, minlength=len(self.types))
+        return {t: int(counts[code]) for code, t in enumerate(self.types)}
+
+    def amount_by_category(
+        self, tx_type: str, days: Optional[tuple[int, int]] = None
+    ) -> dict[str, float]:
+        mask = self.type == self._code(self.types, tx_type)
+        if days is not None:
+            mask &= (self.day >= days[0]) & (self.day < days[1])
+        return self._group_sum(self.category, self.categories, mask)
+
+    def amount_by_month(
+        self, types: Collection[str], start_day: int = INVALID_DAY
+    ) -> dict[tuple[str, str], float]:
+        codes = [self._code(self.types, t) for t in types]
+        mask = np.isin(self.type, codes) & (self.day > INVALID_DAY)
+        mask &= self.day >= start_day
+        months, type_codes = self.month[mask], self.type[mask]
+        keys = months.astype(np.int64) * len(self.types) + type_codes
+        totals: dict[tuple[str, str], float] = {}
+        if not len(keys):
+            return totals
+        present, first, inverse = np.unique(
+            keys, return_index=True, return_inverse=True
+        )
+        sums = np.bincount(inverse, weights=self.amount[mask])
+        for i in np.argsort(first):
+            month, code = divmod(int(present[i]), len(self.types))
+            totals[month_key(month), self.types[code]] = float(sums[i])
+        return totals
+
+
+class IdentityCache(Generic[T]):
+    """Bounded LRU of values derived from a tuple of rows, keyed by the tuple's identity.
+
+    Decoded ledgers are cached and shared, so the same tuple object is seen again by every
+    computed var and session at that revision. Other iterables are not cached.
+    """
+
+    def __init__(self, build: Callable[[Iterable[Any]], T], maxsize: int = 32):
+        self.build = build
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[int, tuple[tuple[Any, ...], T]] = OrderedDict()
+
+    def peek(self, rows: Iterable[Any]) -> Optional[T]:
+        """The cached value for rows, without building it."""
+        with self._lock:
+            entry = self._entries.get(id(rows))
+            if entry is not None and entry[0] is rows:
+                self._entries.move_to_end(id(rows))
+                return entry[1]
+        return None
+
+    def put(self, rows: tuple[Any, ...], value: T):
+        """Caches a value derived some other way, e.g. from the previous revision's."""
+        with self._lock:
+            self._entries[id(rows)] = (rows, value)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, rows: Iterable[Any]) -> T:
+        if not isinstance(rows, tuple):
+            return self.build(rows)
+        value = self.peek(rows)
+        if value is None:
+            value = self.build(rows)
+            self.put(rows, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+column_cache = IdentityCache(LedgerColumns.build)
+
+
+def ledger_columns(transactions: Iterable[TransactionRecord]) -> LedgerColumns:
+    """The columnar view of a transactions tuple, built once per decoded ledger."""
+    return column_cache.get(transactions)
@@ -0,0 +1,112 @@
+import csv
+import io
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Callable, Iterable, Iterator
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from app.ledger.codec import storage_codec
+from app.ledger.records import FIELDS, TransactionRecord
+
+EXPORT_CHUNK_ROWS = 1_000
+"""Rows read, encoded and sent together; an export holds one chunk at a time, and keeps
+the event loop from other sessions for about one chunk's work."""
+
+Chunks = Iterable[tuple[TransactionRecord, ...]]
+
+
+def csv_chunks(chunks: Chunks) -> Iterator[bytes]:
+    """The rows as UTF-8 CSV with a header line, one piece per chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+    row_values = attrgetter(*FIELDS)
+    for rows in chunks:
+        writer.writerows(map(row_values, rows))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def jsonl_chunks(chunks: Chunks) -> Iterator[bytes]:
+    """The rows as JSON Lines, one object per row, in the storage codec."""
+    dumps = storage_codec().dumps
+    for rows in chunks:
+        yield "".join(dumps(row) + "\n" for row in rows).encode()
+
+
+class _Drain(io.RawIOBase):
+    """A write-only file that hands its bytes out as they are written.
+
+    ParquetWriter asks the file for its position to record row group offsets, so tell()
+    counts every byte ever written, not just the ones not yet drained.
+    """
+
+    def __init__(self):
+        self.pieces: list[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.pieces.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.pieces)
+        self.pieces.clear()
+        return data
+
+
+def _parquet_schema():
+    string, double = pyarrow.string(), pyarrow.float64()
+    return pyarrow.schema(
+        [(field, double if field == "amount" else string) for field in FIELDS]
+    )
+
+
+def parquet_chunks(chunks: Chunks) -> Iterator[bytes]:
+    """The rows as a Parquet file, one row group per chunk; needs pyarrow."""
+    if pyarrow is None:
+        raise ImportError("Parquet export needs the pyarrow package")
+    schema = _parquet_schema()
+    sink = _Drain()
+    with pyarrow.parquet.ParquetWriter(sink, schema) as writer:
+        for rows in chunks:
+            columns = {field: [getattr(t, field) for t in rows] for field in FIELDS}
+            writer.write_batch(pyarrow.RecordBatch.from_pydict(columns, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    extension: str
+    media_type: str
+    encode: Callable[[Chunks], Iterator[bytes]]
+
+
+EXPORT_FORMATS = {
+    "csv": ExportFormat("csv", "text/csv", csv_chunks),
+    "jsonl": ExportFormat("jsonl", "application/x-ndjson", jsonl_chunks),
+    "parquet": ExportFormat(
+        "parquet", "application/vnd.apache.parquet", parquet_chunks
+    ),
+}
+
+
+def export_formats() -> list[str]:
+    """The export formats this install can write; Parquet only with pyarrow."""
+    return [name for name in EXPORT_FORMATS if name != "parquet" or pyarrow is not None]
@@ -0,0 +1,324 @@
+import codecs
+import csv
+import datetime
+import functools
+import html
+import itertools
+import re
+from dataclasses import dataclass
+from pathlib import PurePath
+from typing import BinaryIO, Callable, Iterable, Iterator, Mapping, Optional, get_args
+
+from app.ledger.records import TransactionRecord
+from app.ledger.rules import LOAN_TYPES, PENDING_TYPES, transaction_error
+from app.ledger.snapshot import transaction_loader
+from app.models import TransactionType
+
+IMPORT_BATCH_SIZE = 10_000
+"""Rows validated and written together; each batch is a single store write."""
+
+READ_CHUNK_BYTES = 1 << 20
+
+DEFAULT_CATEGORY = "Other"
+"""The category of imported rows that have none; both income and expenses offer it."""
+
+COLUMN_ALIASES: dict[str, tuple[str, ...]] = {
+    "date": ("date", "transaction date", "posted date", "posting date", "booking date"),
+    "amount": ("amount", "transaction amount", "value"),
+    "debit": ("debit", "withdrawal", "withdrawals", "money out", "paid out"),
+    "credit": ("credit", "deposit", "deposits", "money in", "paid in"),
+    "type": ("type", "transaction type", "kind"),
+    "category": ("category",),
+    "description": ("description", "memo", "details", "narrative", "notes"),
+    "party": ("party", "payee", "counterparty", "merchant", "name"),
+}
+"""The CSV header names (compared case-insensitively) read into each import field."""
+
+TYPE_ALIASES: dict[str, TransactionType] = {
+    "credit": "Income",
+    "dep": "Income",
+    "deposit": "Income",
+    "directdep": "Income",
+    "int": "Income",
+    "div": "Income",
+    "debit": "Expense",
+    "withdrawal": "Expense",
+    "payment": "Expense",
+    "pos": "Expense",
+    "atm": "Expense",
+    "check": "Expense",
+    "fee": "Expense",
+    "srvchg": "Expense",
+    "directdebit": "Expense",
+    "repeatpmt": "Expense",
+}
+"""Type names of bank exports (OFX TRNTYPE among them); other unknown types follow the
+sign of the amount."""
+
+_TRANSACTION_TYPES = {t.lower(): t for t in get_args(TransactionType)} | TYPE_ALIASES
+
+DATE_FORMATS = ("%Y-%m-%d", "%Y%m%d", "%m/%d/%Y", "%m/%d/%y", "%Y/%m/%d", "%d.%m.%Y")
+"""The date formats tried, in order, when a date_format is not given."""
+
+_DATE_PREFIX = re.compile(r"\d{4}-\d{2}-\d{2}|\d{8}")
+_AMOUNT_NOISE = re.compile(r"[^0-9.eE+-]")
+_LAST_SEPARATOR = re.compile(r"([.,])(\d+)\D*$")
+_OFX_ELEMENT = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+_QIF_FIELDS = {"D": "date", "T": "amount", "U": "amount", "P": "party"}
+_QIF_FIELDS |= {"M": "description", "L": "category"}
+
+
+def read_lines(file: BinaryIO, chunk_bytes: int = READ_CHUNK_BYTES) -> Iterator[str]:
+    """The lines of a UTF-8 file, read and decoded a chunk at a time.
+
+    A byte order mark is dropped and bytes that are not UTF-8 become U+FFFD, so exports
+    in a legacy encoding still import (with their accented letters replaced).
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    while chunk := file.read(chunk_bytes):
+        lines = (pending + decoder.decode(chunk)).splitlines(keepends=True)
+        pending = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+        yield from lines
+    if pending := pending + decoder.decode(b"", final=True):
+        yield pending
+
+
+def _header_columns(
+    header: list[str], columns: Optional[Mapping[str, str]]
+) -> dict[str, int]:
+    names = [name.strip().lower() for name in header]
+    found: dict[str, int] = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        wanted = (columns[field].lower(),) if columns and field in columns else aliases
+        index = next(
+            (i for alias in wanted for i, n in enumerate(names) if n == alias), None
+        )
+        if index is not None:
+            found[field] = index
+    if "date" not in found:
+        raise ValueError("The CSV file has no date column.")
+    if not found.keys() & {"amount", "debit", "credit"}:
+        raise ValueError("The CSV file has no amount, debit or credit column.")
+    return found
+
+
+def parse_csv(
+    lines: Iterable[str], columns: Optional[Mapping[str, str]] = None
+) -> Iterator[dict[str, str]]:
+    """The rows of a CSV file with a header line, as import fields; ValueError if the
+    file is not CSV.
+
+    Columns are found by their header name (see COLUMN_ALIASES); columns maps an import
+    field to the header of its column for files the aliases miss. The delimiter is
+    sniffed from the header line.
+    """
+    lines = iter(lines)
+    first = next(lines, "")
+    try:
+        dialect = csv.Sniffer().sniff(first, delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(itertools.chain([first], lines), dialect)
+    header = next(reader, None)
+    if header is None:
+        return
+    found = _header_columns(header, columns)
+    try:
+        for row in reader:
+            if any(row):
+                yield {field: row[i] for field, i in found.items() if i < len(row)}
+    except csv.Error as e:
+        raise ValueError(f"Malformed CSV at line {reader.line_num}: {e}") from e
+
+
+def parse_ofx(lines: Iterable[str]) -> Iterator[dict[str, str]]:
+    """The STMTTRN statement transactions of an OFX or QFX file (SGML or XML)."""
+    fields: Optional[dict[str, str]] = None
+    for line in lines:
+        for closing, tag, value in _OFX_ELEMENT.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing and fields is not None:
+                    yield {
+                        "date": fields.get("DTPOSTED", ""),
+                        "amount": fields.get("TRNAMT", ""),
+                        "type": fields.get("TRNTYPE", ""),
+                        "party": fields.get("NAME", ""),
+                        "description": fields.get("MEMO") or fields.get("NAME", ""),
+                    }
+                fields = None if closing else {}
+            elif fields is not None and not closing:
+                fields[tag] = html.unescape(value.strip())
+
+
+def parse_qif(lines: Iterable[str]) -> Iterator[dict[str, str]]:
+    """The records of a QIF file, each ended by a "^" line."""
+    fields: dict[str, str] = {}
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code == "^":
+            if fields:
+                yield fields
+            fields = {}
+        elif code in _QIF_FIELDS:
+            fields.setdefault(_QIF_FIELDS[code], value)
+    if fields:
+        yield fields
+
+
+PARSERS: dict[str, Callable[[Iterable[str]], Iterator[dict[str, str]]]] = {
+    "csv": parse_csv,
+    "ofx": parse_ofx,
+    "qfx": parse_ofx,
+    "qif": parse_qif,
+}
+
+
+def import_format(filename: str) -> str:
+    """The parser of a file, by its extension; ValueError if none reads it."""
+    kind = PurePath(filename).suffix.lower().lstrip(".")
+    if kind not in PARSERS:
+        raise ValueError(
+            f"Cannot import {filename!r}: expected a CSV, OFX, QFX or QIF file."
+        )
+    return kind
+
+
+def parse_file(file: BinaryIO, kind: str) -> Iterator[dict[str, str]]:
+    """The rows of an open binary file of the given format, streamed."""
+    return PARSERS[kind](read_lines(file))
+
+
+def _amount(text: str) -> float:
+    """A signed amount; currency signs and thousands separators are ignored, and
+    (12.50) or a trailing minus is negative. A comma before the last one or two digits
+    is a decimal comma (1.234,50)."""
+    text = text.strip()
+    if (last := _LAST_SEPARATOR.search(text)) and last.group(1) == ",":
+        if len(last.group(2)) != 3:
+            text = text.replace(".", "").replace(",", ".")
+    negative = text.endswith("-") or (text.startswith("(") and text.endswith(")"))
+    try:
+        value = float(_AMOUNT_NOISE.sub("", text).rstrip("-"))
+    except ValueError:
+        raise ValueError(f"Invalid amount {text!r}.") from None
+    return -abs(value) if negative else value
+
+
+def _signed_amount(raw: Mapping[str, str]) -> float:
+    if raw.get("amount", "").strip():
+        return _amount(raw["amount"])
+    if raw.get("credit", "").strip():
+        return abs(_amount(raw["credit"]))
+    if raw.get("debit", "").strip():
+        return -abs(_amount(raw["debit"]))
+    raise ValueError("Amount is required.")
+
+
+@functools.lru_cache(maxsize=4096)
+def _iso_date(text: str, date_format: Optional[str] = None) -> str:
+    """The ISO date of a date as exported; QIF's 1/15'24 reads as 1/15/24, and a time
+    after an ISO or OFX (YYYYMMDDHHMMSS) date is dropped."""
+    text = text.strip().replace("'", "/").replace(" ", "")
+    if not text:
+        return ""
+    if date_format is None and (prefix := _DATE_PREFIX.match(text)):
+        text = prefix.group()
+    for fmt in (date_format,) if date_format else DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            pass
+    raise ValueError(f"Unrecognized date {text!r}.")
+
+
+def transaction_type(text: str, amount: float) -> TransactionType:
+    """The transaction type a bank export's type names; money in is income and money
+    out an expense when the name says nothing more."""
+    return _TRANSACTION_TYPES.get(
+        text.strip().lower(), "Expense" if amount < 0 else "Income"
+    )
+
+
+def import_row(
+    raw: Mapping[str, str],
+    date_format: Optional[str] = None,
+    default_category: str = DEFAULT_CATEGORY,
+) -> dict:
+    """The transaction fields (all but the id) of a parsed row.
+
+    Raises ValueError with the reason when the row cannot be read or breaks the rules of
+    the transaction form. Loans are only made from the form, which creates the loan
+    with them.
+    """
+    amount = _signed_amount(raw)
+    tx_type = transaction_type(raw.get("type", ""), amount)
+    if tx_type in LOAN_TYPES:
+        raise ValueError(f"{tx_type} transactions must be added from the form.")
+    party = raw.get("party", "").strip() or None
+    fields = {
+        "date": _iso_date(raw.get("date", ""), date_format),
+        "category": raw.get("category", "").strip() or default_category,
+        "party": party,
+    }
+    if error := transaction_error(tx_type, abs(amount), fields):
+        raise ValueError(error)
+    return {
+        "type": tx_type,
+        "amount": abs(amount),
+        "description": raw.get("description", "").strip() or party or "",
+        "status": "pending" if tx_type in PENDING_TYPES else "active",
+        **fields,
+    }
+
+
+def import_ids(start: datetime.datetime) -> Iterator[str]:
+    """Transaction ids in the form's datetime.now().isoformat() style, one microsecond
+    apart from start on."""
+    step = datetime.timedelta(microseconds=1)
+    while True:
+        yield start.isoformat()
+        start += step
+
+
+@dataclass(frozen=True)
+class ImportBatch:
+    """The valid rows of a run of parsed rows, and the (row number, reason) of the rows
+    skipped in it."""
+
+    rows: tuple[TransactionRecord, ...]
+    skipped: tuple[tuple[int, str], ...] = ()
+
+
+def import_batches(
+    rows: Iterable[Mapping[str, str]],
+    batch_size: int = IMPORT_BATCH_SIZE,
+    ids: Optional[Iterator[str]] = None,
+    date_format: Optional[str] = None,
+    default_category: str = DEFAULT_CATEGORY,
+) -> Iterator[ImportBatch]:
+    """Reads parsed rows into batches of validated transactions, as they stream in.
+
+    Every batch_size rows (valid or skipped) a batch is checked against the Transaction
+    model in one bulk pass and handed out, so a caller writing each batch holds at most
+    one in memory. ids default to import_ids from now.
+    """
+    ids = ids or import_ids(datetime.datetime.now())
+    valid: list[dict] = []
+    skipped: list[tuple[int, str]] = []
+    for number, raw in enumerate(rows, 1):
+        try:
+            valid.append(
+                {"id": next(ids), **import_row(raw, date_format, default_category)}
+            )
+        except ValueError as e:
+            skipped.append((number, str(e)))
+        if len(valid) + len(skipped) >= batch_size:
+            yield ImportBatch(transaction_loader.validated(valid), tuple(skipped))
+            valid, skipped = [], []
+    if valid or skipped:
+        yield ImportBatch(transaction_loader.validated(valid), tuple(skipped))
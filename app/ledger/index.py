@@ -0,0 +1,167 @@
+import bisect
+import functools
+from collections import defaultdict
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Optional
+
+from app.ledger.columns import IdentityCache, LedgerColumns
+from app.ledger.records import TransactionRecord
+from app.models import Loan
+
+
+@dataclass(frozen=True, eq=False)
+class TransactionIndex:
+    """Hash indexes over one decoded ledger for O(1) point lookups.
+
+    settlements maps a transaction id to the rows whose linked_transaction_id points at
+    it; the other direction is the row's own linked_transaction_id looked up in by_id.
+    """
+
+    by_id: dict[str, TransactionRecord]
+    by_loan: dict[str, tuple[TransactionRecord, ...]]
+    settlements: dict[str, tuple[TransactionRecord, ...]]
+
+    @classmethod
+    def build(cls, transactions: Iterable[TransactionRecord]) -> "TransactionIndex":
+        by_id: dict[str, TransactionRecord] = {}
+        by_loan: dict[str, list[TransactionRecord]] = defaultdict(list)
+        settlements: dict[str, list[TransactionRecord]] = defaultdict(list)
+        for t in transactions:
+            by_id.setdefault(t.id, t)
+            if t.loan_id:
+                by_loan[t.loan_id].append(t)
+            if t.linked_transaction_id:
+                settlements[t.linked_transaction_id].append(t)
+        return cls(
+            by_id,
+            {k: tuple(v) for k, v in by_loan.items()},
+            {k: tuple(v) for k, v in settlements.items()},
+        )
+
+
+SORT_KEYS = {
+    "date": attrgetter("date", "id"),
+    "amount": attrgetter("amount", "id"),
+}
+"""The fields transactions can be sorted by, each with its (value, id) sort key."""
+
+
+@dataclass(frozen=True, eq=False)
+class SortedIndex:
+    """The transactions ordered by (field, id): a permutation index for one sort key.
+
+    The descending order is the same rows reversed, a range of field values is a bisect
+    slice, and columns (in this order) turn the list filters into masks. Writes bisect
+    the rows they add or remove in or out of a copy of the order, and splice the columns
+    if they were built, instead of sorting the ledger again.
+    """
+
+    field: str
+    rows: tuple[TransactionRecord, ...]
+
+    @classmethod
+    def build(
+        cls, field: str, transactions: Iterable[TransactionRecord]
+    ) -> "SortedIndex":
+        return cls(field, tuple(sorted(transactions, key=SORT_KEYS[field])))
+
+    @functools.cached_property
+    def descending(self) -> tuple[TransactionRecord, ...]:
+        return self.rows[::-1]
+
+    @functools.cached_property
+    def columns(self) -> LedgerColumns:
+        return LedgerColumns.build(self.rows)
+
+    def position(self, value: Any, row_id: str, after: bool = True) -> int:
+        """Where (value, row_id) falls in the order; past a row with that key if after."""
+        find = bisect.bisect_right if after else bisect.bisect_left
+        return find(self.rows, (value, row_id), key=SORT_KEYS[self.field])
+
+    def _find(self, transaction: TransactionRecord) -> Optional[int]:
+        key = SORT_KEYS[self.field]
+        i = bisect.bisect_left(self.rows, key(transaction), key=key)
+        if i < len(self.rows) and self.rows[i].id == transaction.id:
+            return i
+        return None
+
+    def applied(
+        self,
+        added: Iterable[TransactionRecord] = (),
+        removed: Iterable[TransactionRecord] = (),
+    ) -> "SortedIndex":
+        """A copy reflecting rows written and the rows they replaced or deleted."""
+        added = tuple(added)
+        key = SORT_KEYS[self.field]
+        gone = sorted({i for t in removed if (i := self._find(t)) is not None})
+        if len(gone) + len(added) > max(64, len(self.rows) // 16):
+            dropped = set(gone)
+            kept = (t for i, t in enumerate(self.rows) if i not in dropped)
+            return SortedIndex.build(self.field, (*kept, *added))
+        rows = list(self.rows)
+        for i in reversed(gone):
+            del rows[i]
+        for t in added:
+            bisect.insort(rows, t, key=key)
+        index = SortedIndex(self.field, tuple(rows))
+        if "columns" in self.__dict__:
+            ordered = sorted(added, key=key)
+            at = [
+                bisect.bisect_left(rows, key(t), key=key) - j
+                for j, t in enumerate(ordered)
+            ]
+            index.__dict__["columns"] = self.columns.spliced(gone, at, ordered)
+        return index
+
+    def between(
+        self, start: Any = None, end: Any = None, descending: bool = False
+    ) -> tuple[TransactionRecord, ...]:
+        """Rows with start <= field <= end (a None bound is open), in field order."""
+        value, n = attrgetter(self.field), len(self.rows)
+        lo = 0 if start is None else bisect.bisect_left(self.rows, start, key=value)
+        hi = n if end is None else bisect.bisect_right(self.rows, end, key=value)
+        if not descending:
+            return self.rows[lo:hi]
+        return self.descending[n - hi : n - lo]
+
+
+transaction_index_cache = IdentityCache(TransactionIndex.build)
+sorted_index_caches = {
+    field: IdentityCache(functools.partial(SortedIndex.build, field))
+    for field in SORT_KEYS
+}
+loan_index_cache = IdentityCache(lambda loans: {l.id: l for l in reversed(loans)})
+
+
+def transaction_index(transactions: Iterable[TransactionRecord]) -> TransactionIndex:
+    """The indexes of a transactions tuple, built once per decoded ledger."""
+    return transaction_index_cache.get(transactions)
+
+
+def loan_index(loans: Iterable[Loan]) -> dict[str, Loan]:
+    """Loans by id (the first row wins for duplicate ids), built once per decoded ledger."""
+    return loan_index_cache.get(loans)
+
+
+def sorted_index(transactions: Iterable[TransactionRecord], field: str) -> SortedIndex:
+    """The order of a transactions tuple by one field, built once per decoded ledger."""
+    return sorted_index_caches[field].get(transactions)
+
+
+def date_index(transactions: Iterable[TransactionRecord]) -> SortedIndex:
+    return sorted_index(transactions, "date")
+
+
+def carry_sorted_indexes(
+    previous: tuple[TransactionRecord, ...],
+    current: Callable[[], tuple[TransactionRecord, ...]],
+    added: Iterable[TransactionRecord] = (),
+    removed: Iterable[TransactionRecord] = (),
+):
+    """Derives the sort orders of the next revision from the previous ones that were built."""
+    added, removed = tuple(added), tuple(removed)
+    for cache in sorted_index_caches.values():
+        index = cache.peek(previous)
+        if index is not None:
+            cache.put(current(), index.applied(added, removed))
@@ -0,0 +1,82 @@
+from typing import Callable, Literal, Optional, TypedDict, TypeVar, Union
+
+from pydantic import BaseModel
+
+from app.ledger.codec import storage_codec
+from app.ledger.records import TransactionRecord
+
+RowT = TypeVar("RowT")
+
+JOURNAL_COMPACT_BYTES = 64 * 1024
+"""Journals larger than this are folded into their base blob by a background compaction."""
+
+EMPTY_JOURNAL = "[]"
+
+
+class JournalRecord(TypedDict, total=False):
+    op: Literal["put", "delete"]
+    row: Union[dict, BaseModel, TransactionRecord]
+    id: str
+
+
+def put_record(row: Union[BaseModel, TransactionRecord]) -> JournalRecord:
+    """A record that inserts a row, or replaces the row with the same id.
+
+    The row is kept as is and turned into JSON by the storage codec; replayed records
+    hold the decoded dict instead.
+    """
+    return {"op": "put", "row": row}
+
+
+def delete_record(row_id: str) -> JournalRecord:
+    return {"op": "delete", "id": row_id}
+
+
+def append_records(raw_journal: str, *records: JournalRecord) -> str:
+    """Appends records to a serialized journal without decoding the existing entries."""
+    encoded = storage_codec().dumps(records)[1:-1]
+    if not encoded:
+        return raw_journal
+    body = raw_journal.strip()
+    if not body.startswith("[") or not body.endswith("]"):
+        return f"[{encoded}]"
+    if body[1:-1].strip() == "":
+        return f"[{encoded}]"
+    return f"{body[:-1]}, {encoded}]"
+
+
+def needs_compaction(raw_journal: str) -> bool:
+    return len(raw_journal) > JOURNAL_COMPACT_BYTES
+
+
+def replay(
+    base: tuple[RowT, ...],
+    records: list[JournalRecord],
+    load: Callable[[dict], RowT],
+    prepend: bool,
+) -> tuple[RowT, ...]:
+    """Applies journal records on top of a base snapshot.
+
+    New rows are placed where the original full rewrite would have put them: at the
+    front for newest-first collections (transactions), at the end otherwise.
+    """
+    if not records:
+        return base
+    rows: dict[str, Optional[RowT]] = {row.id: row for row in base}
+    added: dict[str, None] = {}
+    for record in records:
+        if record.get("op") == "put":
+            row = load(record["row"])
+            if row.id not in rows:
+                added[row.id] = None
+            rows[row.id] = row
+        elif record.get("op") == "delete":
+            if record.get("id") in rows:
+                rows[record["id"]] = None
+    added_rows = [rows[row_id] for row_id in added if rows[row_id] is not None]
+    base_rows = [
+        row for row_id, row in rows.items() if row is not None and row_id not in added
+    ]
+    if prepend:
+        return tuple(added_rows[::-1] + base_rows)
+    return tuple(base_rows + added_rows)
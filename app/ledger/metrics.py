@@ -0,0 +1,128 @@
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Collection, Iterable, NamedTuple, Optional
+
+import numpy as np
+
+from app.ledger.columns import (
+    IdentityCache,
+    LedgerColumns,
+    ledger_columns,
+    month_key,
+)
+from app.ledger.records import TransactionRecord
+
+MetricKey = tuple[str, str, str, str]
+"""(type, status, "YYYY-MM" month, category); the month is "" for unparseable dates."""
+
+scan_counter: Counter[str] = Counter()
+
+
+class MetricCell(NamedTuple):
+    amount: float
+    count: int
+    max_amount: float
+
+
+@dataclass(frozen=True, eq=False)
+class LedgerMetrics:
+    """Every dashboard and insight aggregate of one ledger revision.
+
+    cells holds the sum, count and largest amount of each (type, status, month, category)
+    group, in order of the group's first row in the ledger, so grouped totals keep the
+    order a row-by-row loop would have produced.
+    """
+
+    cells: dict[MetricKey, MetricCell]
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[tuple[str, str, str, str, float, int, float]]
+    ) -> "LedgerMetrics":
+        """Builds the metrics from already-grouped rows, e.g. a SQL GROUP BY."""
+        return cls(
+            {
+                (tx_type, status, month, category): MetricCell(
+                    amount, count, max_amount
+                )
+                for tx_type, status, month, category, amount, count, max_amount in rows
+            }
+        )
+
+    def amount_by_type(self, status: Optional[str] = None) -> dict[str, float]:
+        totals: dict[str, float] = defaultdict(float)
+        for (tx_type, tx_status, _, _), cell in self.cells.items():
+            if status is None or tx_status == status:
+                totals[tx_type] += cell.amount
+        return dict(totals)
+
+    def count_by_type(self) -> dict[str, int]:
+        counts: dict[str, int] = defaultdict(int)
+        for (tx_type, _, _, _), cell in self.cells.items():
+            counts[tx_type] += cell.count
+        return dict(counts)
+
+    def max_amount(self, tx_type: str) -> float:
+        return max(
+            (cell.max_amount for key, cell in self.cells.items() if key[0] == tx_type),
+            default=0.0,
+        )
+
+    def amount_by_category(self, tx_type: str, month: str = "") -> dict[str, float]:
+        """Total amount per category for one type, optionally only for one "YYYY-MM"."""
+        totals: dict[str, float] = defaultdict(float)
+        for (t, _, m, category), cell in self.cells.items():
+            if t == tx_type and (not month or m == month):
+                totals[category] += cell.amount
+        return dict(totals)
+
+    def amount_by_month(self, types: Collection[str]) -> dict[tuple[str, str], float]:
+        totals: dict[tuple[str, str], float] = defaultdict(float)
+        for (tx_type, _, month, _), cell in self.cells.items():
+            if tx_type in types and month:
+                totals[month, tx_type] += cell.amount
+        return dict(totals)
+
+    def categories(self) -> list[str]:
+        return sorted({key[3] for key in self.cells})
+
+
+def aggregate(columns: LedgerColumns) -> LedgerMetrics:
+    """The single aggregation pass: one group-by over every row of the ledger."""
+    scan_counter["metrics"] += 1
+    if not len(columns):
+        return LedgerMetrics({})
+    month = columns.month.astype(np.int64)
+    valid = month >= 0
+    first_month = int(month[valid].min()) if valid.any() else 0
+    month_offset = np.where(valid, month - first_month + 1, 0)
+    months = int(month_offset.max()) + 1
+    key = columns.type.astype(np.int64)
+    key = key * len(columns.statuses) + columns.status
+    key = key * len(columns.categories) + columns.category
+    key = key * months + month_offset
+    present, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+    amount = np.bincount(inverse, weights=columns.amount)
+    count = np.bincount(inverse)
+    max_amount = np.full(len(present), -np.inf)
+    np.maximum.at(max_amount, inverse, columns.amount)
+    cells: dict[MetricKey, MetricCell] = {}
+    for i in np.argsort(first, kind="stable"):
+        rest, offset = divmod(int(present[i]), months)
+        rest, category = divmod(rest, len(columns.categories))
+        tx_type, status = divmod(rest, len(columns.statuses))
+        cells[
+            columns.types[tx_type],
+            columns.statuses[status],
+            month_key(first_month + offset - 1) if offset else "",
+            columns.categories[category],
+        ] = MetricCell(float(amount[i]), int(count[i]), float(max_amount[i]))
+    return LedgerMetrics(cells)
+
+
+metrics_cache = IdentityCache(lambda rows: aggregate(ledger_columns(rows)))
+
+
+def ledger_metrics(transactions: Iterable[TransactionRecord]) -> LedgerMetrics:
+    """The metrics of a transactions tuple, aggregated once per decoded ledger."""
+    return metrics_cache.get(transactions)
@@ -0,0 +1,209 @@
+import base64
+import datetime
+import math
+import re
+import zlib
+from operator import attrgetter
+from typing import Any, Callable, Optional, Sequence, Union
+
+import numpy as np
+
+from app.ledger.codec import storage_codec
+from app.ledger.records import TransactionRecord
+
+PACKED_VERSION = 1
+PACKED_PREFIX = f"fintrack-packed-{PACKED_VERSION}:"
+"""Starts every packed blob; unpacked (JSON) blobs start with "["."""
+
+PACKED_LEVEL = 4
+"""The zlib level of packed blobs. Every write repacks its shards, and level 4 packs
+about three times faster than the default 6 for 6% more characters."""
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+_ISO_ID = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.(?!0{6})\d{6})?")
+_ISO_DAY = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+CODED_FIELDS = (
+    "type",
+    "category",
+    "description",
+    "status",
+    "linked_transaction_id",
+    "loan_id",
+    "party",
+)
+"""The string fields stored as codes into the blob's string table."""
+
+
+def is_packed(raw: str) -> bool:
+    return raw.startswith("fintrack-packed-")
+
+
+def _id_micros(row_id: str) -> Optional[int]:
+    """Microseconds since the epoch of an id written by datetime.now().isoformat(), or
+    None for any other id (kept as a string)."""
+    try:
+        moment = datetime.datetime.fromisoformat(row_id)
+    except ValueError:
+        return None
+    if moment.tzinfo is not None or moment.isoformat() != row_id:
+        return None
+    return (moment - _EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def _day(date: str) -> Optional[int]:
+    """Days since the epoch of an ISO date, or None for any other date string."""
+    try:
+        day = datetime.date.fromisoformat(date)
+    except ValueError:
+        return None
+    return (day - _EPOCH.date()).days if day.isoformat() == date else None
+
+
+def _undelta(column: list[Union[int, str]], unit: str) -> list[str]:
+    """The ISO strings of a delta encoded datetime64 column, keeping the verbatim
+    strings it holds in place; numpy formats the whole column at once."""
+    verbatim = [isinstance(v, str) for v in column]
+    deltas = np.array([0 if s else v for v, s in zip(column, verbatim)], np.int64)
+    texts = np.cumsum(deltas).astype(f"datetime64[{unit}]").astype(str).tolist()
+    return [v if s else t for v, s, t in zip(column, verbatim, texts)]
+
+
+def _stamps(
+    values: list[str],
+    unit: str,
+    pattern: re.Pattern,
+    scalar: Callable[[str], Optional[int]],
+) -> list[Optional[int]]:
+    """scalar of every value, parsed in bulk: the strings in the canonical form pattern
+    matches go through numpy at once. Should numpy reject one (a day out of range) or
+    read one Python would not (year 0), the column falls back to scalar."""
+    matched = [v if pattern.fullmatch(v) else None for v in values]
+    try:
+        parsed = np.array([v for v in matched if v is not None], f"datetime64[{unit}]")
+        if parsed.size and parsed.min() < np.datetime64("0001-01-01", unit):
+            raise ValueError("year 0")
+    except ValueError:
+        return [scalar(v) for v in values]
+    stamps = iter(parsed.astype(np.int64).tolist())
+    return [None if v is None else next(stamps) for v in matched]
+
+
+def _delta(values: list[str], stamps: list[Optional[int]]) -> list[Union[int, str]]:
+    """Each stamp as the difference to the previous one, values without one verbatim."""
+    column: list[Union[int, str]] = []
+    last = 0
+    for value, stamp in zip(values, stamps):
+        if stamp is None:
+            column.append(value)
+        else:
+            column.append(stamp - last)
+            last = stamp
+    return column
+
+
+def _amount(amount: float) -> Union[int, float, str]:
+    """Minor units when they hold the amount exactly (and fit a double, as JSON readers
+    want); JSON has no inf or nan."""
+    if not math.isfinite(amount):
+        return str(amount)
+    cents = round(amount * 100)
+    return cents if abs(cents) < 2**53 and cents / 100 == amount else amount
+
+
+def _amounts(amounts: list[float]) -> list[Union[int, float, str]]:
+    """_amount of every amount, computed on the whole column."""
+    values = np.array(amounts, np.float64)
+    with np.errstate(invalid="ignore", over="ignore"):
+        cents = np.rint(values * 100)
+        exact = (np.abs(cents) < 2**53) & (cents / 100 == values)
+    cents = np.where(exact, cents, 0).astype(np.int64).tolist()
+    return [c if e else _amount(a) for a, c, e in zip(amounts, cents, exact.tolist())]
+
+
+class _StringTable(dict):
+    """The code of each string, handed out in order of first use; 0 is None."""
+
+    def __init__(self):
+        super().__init__({None: 0})
+
+    def __missing__(self, value: Optional[str]) -> int:
+        code = self[value] = len(self)
+        return code
+
+
+def pack_transactions(
+    rows: Sequence[TransactionRecord], sequence: Optional[Sequence[int]] = None
+) -> str:
+    """The rows as a packed blob: one compressed, base64 encoded column per field.
+
+    Strings are dictionary encoded into one table, amounts with at most two decimals are
+    stored in minor units, and timestamp ids and ISO dates become integers delta encoded
+    against the previous row (the ledger is sorted newest first, so the deltas are
+    small). Values that do not fit their column's encoding are kept as they are, so
+    unpack_transactions returns exactly the rows given.
+
+    sequence, one integer per row, is stored delta encoded alongside; shards keep the
+    ledger position of their rows in it (see app/ledger/shards.py).
+    """
+    strings = _StringTable()
+    ids = list(map(attrgetter("id"), rows))
+    dates = list(map(attrgetter("date"), rows))
+    payload = {
+        "id": _delta(ids, _stamps(ids, "us", _ISO_ID, _id_micros)),
+        "date": _delta(dates, _stamps(dates, "D", _ISO_DAY, _day)),
+        "amount": _amounts(list(map(attrgetter("amount"), rows))),
+        **{
+            field: [strings[v] for v in map(attrgetter(field), rows)]
+            for field in CODED_FIELDS
+        },
+        "strings": list(strings),
+    }
+    if sequence is not None:
+        payload["seq"] = np.diff(sequence, prepend=0).tolist()
+    packed = zlib.compress(storage_codec().dumps(payload).encode(), PACKED_LEVEL)
+    return PACKED_PREFIX + base64.b64encode(packed).decode("ascii")
+
+
+def _columns(raw: str) -> dict[str, Any]:
+    version, _, body = raw.removeprefix("fintrack-packed-").partition(":")
+    if version != str(PACKED_VERSION):
+        raise ValueError(f"Unsupported packed ledger version {version!r}")
+    return storage_codec().loads(zlib.decompress(base64.b64decode(body)))
+
+
+def _unpack(raw: str) -> tuple[dict[str, Any], tuple[TransactionRecord, ...]]:
+    try:
+        columns = _columns(raw)
+    except zlib.error as e:
+        raise ValueError(f"Corrupt packed ledger: {e}") from e
+    strings = columns["strings"]
+    # isoformat() leaves out a zero microsecond part; numpy always writes it.
+    ids = [
+        i[:-7] if i.endswith(".000000") and not isinstance(v, str) else i
+        for i, v in zip(_undelta(columns["id"], "us"), columns["id"])
+    ]
+    days = _undelta(columns["date"], "D")
+    amounts = [v / 100 if isinstance(v, int) else float(v) for v in columns["amount"]]
+    coded = [[strings[code] for code in columns[field]] for field in CODED_FIELDS]
+    return columns, tuple(
+        TransactionRecord.from_values(*values)
+        for values in zip(ids, coded[0], amounts, coded[1], days, *coded[2:])
+    )
+
+
+def unpack_transactions(raw: str) -> tuple[TransactionRecord, ...]:
+    """The rows of a blob written by pack_transactions.
+
+    Raises ValueError for a blob that is corrupt or of an unknown version.
+    """
+    return _unpack(raw)[1]
+
+
+def unpack_sequenced(
+    raw: str,
+) -> tuple[tuple[TransactionRecord, ...], tuple[int, ...]]:
+    """The rows of a blob packed with a sequence, and that sequence."""
+    columns, rows = _unpack(raw)
+    return rows, tuple(np.cumsum(columns["seq"], dtype=np.int64).tolist())
@@ -0,0 +1,299 @@
+import bisect
+import datetime
+import functools
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Callable, Iterable, Optional, Union
+
+import numpy as np
+
+from app.ledger.columns import (
+    INVALID_DAY,
+    IdentityCache,
+    day_ordinal,
+    ledger_columns,
+    prefix_days,
+)
+from app.ledger.index import SortedIndex, date_index, sorted_index
+from app.ledger.records import TransactionRecord
+from app.ledger.search import search_index
+
+SortBy = str
+SORT_MODES: tuple[SortBy, ...] = ("date_desc", "date_asc", "amount_desc", "amount_asc")
+
+
+@dataclass(frozen=True)
+class TransactionQuery:
+    """The transaction list filters, in the form every ledger store understands."""
+
+    search: str = ""
+    type: str = ""
+    category: str = ""
+    start_date: str = ""
+    end_date: str = ""
+    sort_by: SortBy = "date_desc"
+
+
+@dataclass(frozen=True)
+class TransactionCursor:
+    """A position just after one row of a sort order.
+
+    It is the row's sort value and id rather than an index, so it stays valid while rows
+    are inserted or deleted around it.
+    """
+
+    value: Union[str, float]
+    id: str
+
+    @classmethod
+    def after(cls, row: TransactionRecord, sort_by: SortBy) -> "TransactionCursor":
+        return cls(getattr(row, sort_field(sort_by)), row.id)
+
+
+@dataclass(frozen=True)
+class TransactionPage:
+    """One window of the filtered transaction list and the size of the whole list."""
+
+    rows: tuple[TransactionRecord, ...]
+    total: int
+    offset: int
+
+
+def sort_field(sort_by: SortBy) -> str:
+    return "amount" if sort_by.startswith("amount") else "date"
+
+
+@functools.total_ordering
+class _Descending:
+    """Inverts the ordering of a value inside an ascending sort key."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other) -> bool:
+        return self.value == other.value
+
+    def __lt__(self, other) -> bool:
+        return other.value < self.value
+
+
+def _seek_key(sort_by: SortBy, value, row_id: str) -> tuple:
+    """The ascending key of a row in a sort mode: (sort value, id), inverted for _desc."""
+    if sort_by.endswith("_desc"):
+        return _Descending(value), _Descending(row_id)
+    return value, row_id
+
+
+def sorted_transactions(
+    transactions: Iterable[TransactionRecord], sort_by: SortBy
+) -> tuple[TransactionRecord, ...]:
+    """The ledger in one sort mode, ties broken by id in the same direction.
+
+    Each order comes from a sorted index built once per decoded ledger and carried across
+    writes; a descending order is its ascending order reversed.
+    """
+    if sort_by not in SORT_MODES:
+        return tuple(transactions)
+    index = sorted_index(transactions, sort_field(sort_by))
+    return index.descending if sort_by.endswith("_desc") else index.rows
+
+
+def transaction_matcher(query: TransactionQuery) -> Callable[[TransactionRecord], bool]:
+    """A predicate for the query's filters, ignoring its sort order.
+
+    A date range tests day ordinals, as the column mask does, so a row whose date does
+    not parse is outside every range; only a range with a bound that is not an ISO date
+    falls back to comparing the date strings.
+    """
+    needle = query.search.lower()
+    try:
+        days = query_days(query)
+    except ValueError:
+        days = None
+
+    def in_range(date: str) -> bool:
+        if days is not None:
+            return days[0] <= day_ordinal(date) < days[1]
+        return (not query.start_date or date >= query.start_date) and (
+            not query.end_date or date <= query.end_date
+        )
+
+    def matches(t: TransactionRecord) -> bool:
+        return (
+            (
+                not needle
+                or needle in t.description.lower()
+                or needle in t.category.lower()
+                or needle in (t.party or "").lower()
+            )
+            and (not query.type or t.type == query.type)
+            and (not query.category or t.category == query.category)
+            and in_range(t.date)
+        )
+
+    return matches
+
+
+def query_days(query: TransactionQuery) -> Optional[tuple[int, int]]:
+    """The query's date range as [first, last) day ordinals, or None if it has none.
+
+    Raises ValueError for a bound that is not a full ISO date.
+    """
+    if not query.start_date and not query.end_date:
+        return None
+    first, last = INVALID_DAY + 1, datetime.date.max.toordinal() + 1
+    for bound in filter(None, (query.start_date, query.end_date)):
+        if len(bound) != 10 or day_ordinal(bound) == INVALID_DAY:
+            raise ValueError(f"not an ISO date: {bound!r}")
+    if query.start_date:
+        first = day_ordinal(query.start_date)
+    if query.end_date:
+        last = day_ordinal(query.end_date) + 1
+    return first, last
+
+
+def _selection(
+    transactions: Iterable[TransactionRecord], query: TransactionQuery
+) -> Optional[tuple[SortedIndex, np.ndarray]]:
+    """The sorted index of the query's order and the positions in it that pass the
+    filters, in that order; None when the filters cannot be answered with a mask.
+
+    The type, category and date filters are one vectorized mask over the presorted
+    columns, so neither a filter nor a sort change sorts or tests rows one by one.
+    """
+    if query.search or query.sort_by not in SORT_MODES:
+        return None
+    try:
+        days = query_days(query)
+    except ValueError:
+        return None
+    index = sorted_index(transactions, sort_field(query.sort_by))
+    mask = index.columns.mask(query.type, query.category, days)
+    positions = np.arange(len(index.rows)) if mask is None else np.flatnonzero(mask)
+    return index, positions[::-1] if query.sort_by.endswith("_desc") else positions
+
+
+def _candidates(
+    transactions: Iterable[TransactionRecord], query: TransactionQuery
+) -> tuple[TransactionRecord, ...]:
+    """The rows the query's filters must test one by one, in its sort order.
+
+    A search is answered by the search index first, so only its hits are sorted and
+    tested; a date range under a date sort is a slice of the date index.
+    """
+    if query.sort_by not in SORT_MODES:
+        return tuple(transactions)
+    if query.search:
+        hits = search_index(transactions).search(query.search.lower())
+        field = attrgetter(sort_field(query.sort_by))
+        return tuple(
+            sorted(hits, key=lambda t: _seek_key(query.sort_by, field(t), t.id))
+        )
+    if sort_field(query.sort_by) == "date":
+        return date_index(transactions).between(
+            query.start_date or None,
+            query.end_date or None,
+            query.sort_by.endswith("_desc"),
+        )
+    return sorted_transactions(transactions, query.sort_by)
+
+
+def filter_transactions(
+    transactions: Iterable[TransactionRecord], query: TransactionQuery
+) -> list[TransactionRecord]:
+    """Applies all filters and sorting to the transaction list."""
+    selection = _selection(transactions, query)
+    if selection is not None:
+        index, positions = selection
+        return [index.rows[i] for i in positions.tolist()]
+    matches = transaction_matcher(query)
+    return [t for t in _candidates(transactions, query) if matches(t)]
+
+
+def count_transactions(
+    transactions: Iterable[TransactionRecord], query: TransactionQuery
+) -> int:
+    selection = _selection(transactions, query)
+    if selection is not None:
+        return len(selection[1])
+    return len(filtered_transactions(transactions, query))
+
+
+def seek_transactions(
+    transactions: Iterable[TransactionRecord],
+    query: TransactionQuery,
+    after: Optional[TransactionCursor],
+    limit: int,
+) -> tuple[TransactionRecord, ...]:
+    """The first limit matching rows after the cursor; only the rows returned are touched."""
+    selection = _selection(transactions, query)
+    if selection is not None:
+        index, positions = selection
+        start = 0
+        if after is not None:
+            if query.sort_by.endswith("_desc"):
+                # positions descend: skip those at or past the cursor's position.
+                cut = index.position(after.value, after.id, after=False)
+                start = int(np.searchsorted(-positions, -cut, side="right"))
+            else:
+                cut = index.position(after.value, after.id)
+                start = int(np.searchsorted(positions, cut, side="left"))
+        return tuple(index.rows[i] for i in positions[start : start + limit].tolist())
+    ordered = _candidates(transactions, query)
+    start = 0
+    if after is not None and query.sort_by in SORT_MODES:
+        field = attrgetter(sort_field(query.sort_by))
+        start = bisect.bisect_right(
+            ordered,
+            _seek_key(query.sort_by, after.value, after.id),
+            key=lambda t: _seek_key(query.sort_by, field(t), t.id),
+        )
+    matches = transaction_matcher(query)
+    rows = []
+    for i in range(start, len(ordered)):
+        if matches(ordered[i]):
+            rows.append(ordered[i])
+            if len(rows) == limit:
+                break
+    return tuple(rows)
+
+
+_filter_cache = IdentityCache(lambda rows: OrderedDict())
+
+
+def filtered_transactions(
+    transactions: Iterable[TransactionRecord],
+    query: TransactionQuery,
+    maxsize: int = 16,
+) -> tuple[TransactionRecord, ...]:
+    """filter_transactions, memoized per decoded ledger and query."""
+    results = _filter_cache.get(transactions)
+    items = results.get(query)
+    if items is None:
+        items = results[query] = tuple(filter_transactions(transactions, query))
+        if len(results) > maxsize:
+            results.popitem(last=False)
+    return items
+
+
+def amount_by_type(
+    transactions: Iterable[TransactionRecord], status: Optional[str] = None
+) -> dict[str, float]:
+    return ledger_columns(transactions).amount_by_type(status)
+
+
+def amount_by_category(
+    transactions: Iterable[TransactionRecord], tx_type: str, date_prefix: str = ""
+) -> dict[str, float]:
+    if not date_prefix:
+        return ledger_columns(transactions).amount_by_category(tx_type)
+    if (days := prefix_days(date_prefix)) is not None:
+        return ledger_columns(transactions).amount_by_category(tx_type, days)
+    totals: dict[str, float] = defaultdict(float)
+    for t in transactions:
+        if t.type == tx_type and t.date.startswith(date_prefix):
+            totals[t.category] += t.amount
+    return dict(totals)
@@ -0,0 +1,131 @@
+import dataclasses
+from dataclasses import dataclass
+from sys import intern
+from typing import Any, Optional, Union
+
+from app.models import Transaction, TransactionStatus, TransactionType
+
+FIELDS = tuple(Transaction.model_fields)
+"""The stored row keys, in the order Transaction.model_dump() writes them."""
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return None if value is None else intern(value)
+
+
+@dataclass(frozen=True, slots=True)
+class TransactionRecord:
+    """A compact, immutable transaction row for the ledger internals.
+
+    A slotted dataclass instead of a pydantic model, with the low-cardinality strings
+    (type, category, status, date, party) interned so every row shares one copy of each.
+    orjson encodes it as is, with no intermediate dict. The Transaction model is only
+    built at the form and API boundaries.
+    """
+
+    id: str
+    type: TransactionType
+    amount: float
+    category: str
+    date: str
+    description: str
+    status: TransactionStatus = "active"
+    linked_transaction_id: Optional[str] = None
+    loan_id: Optional[str] = None
+    party: Optional[str] = None
+
+    def __post_init__(self):
+        _set_type(self, intern(self.type))
+        _set_amount(self, float(self.amount))
+        _set_category(self, intern(self.category))
+        _set_date(self, intern(self.date))
+        _set_status(self, intern(self.status))
+        _set_loan_id(self, _intern(self.loan_id))
+        _set_party(self, _intern(self.party))
+
+    @classmethod
+    def from_dict(cls, row: dict[str, Any]) -> "TransactionRecord":
+        """A record from a stored row (a Transaction.model_dump() dict), unvalidated.
+
+        This runs for every row of every decode, so it sets the slots through their
+        descriptors instead of binding keywords through __init__. Raises KeyError for a
+        row missing a required field.
+        """
+        return cls.from_values(
+            row["id"],
+            row["type"],
+            row["amount"],
+            row["category"],
+            row["date"],
+            row["description"],
+            row.get("status", "active"),
+            row.get("linked_transaction_id"),
+            row.get("loan_id"),
+            row.get("party"),
+        )
+
+    @classmethod
+    def from_values(
+        cls,
+        id: str,
+        type: TransactionType,
+        amount: float,
+        category: str,
+        date: str,
+        description: str,
+        status: TransactionStatus,
+        linked_transaction_id: Optional[str],
+        loan_id: Optional[str],
+        party: Optional[str],
+    ) -> "TransactionRecord":
+        """A record from every field in FIELDS order, unvalidated; the decode hot path."""
+        record = object.__new__(cls)
+        _set_id(record, id)
+        _set_type(record, intern(type))
+        _set_amount(record, float(amount))
+        _set_category(record, intern(category))
+        _set_date(record, intern(date))
+        _set_description(record, description)
+        _set_status(record, intern(status))
+        _set_linked_transaction_id(record, linked_transaction_id)
+        _set_loan_id(record, _intern(loan_id))
+        _set_party(record, _intern(party))
+        return record
+
+    @classmethod
+    def from_model(cls, transaction: Transaction) -> "TransactionRecord":
+        return cls.from_dict(transaction.__dict__)
+
+    def to_dict(self) -> dict[str, Any]:
+        """The row as Transaction.model_dump() would give it, for persistence."""
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def to_model(self) -> Transaction:
+        """The pydantic model of the row, for the API and the UI."""
+        return Transaction.model_construct(**self.to_dict())
+
+    def replace(self, **changes: Any) -> "TransactionRecord":
+        return dataclasses.replace(self, **changes)
+
+
+(
+    _set_id,
+    _set_type,
+    _set_amount,
+    _set_category,
+    _set_date,
+    _set_description,
+    _set_status,
+    _set_linked_transaction_id,
+    _set_loan_id,
+    _set_party,
+) = (getattr(TransactionRecord, field).__set__ for field in FIELDS)
+
+TransactionLike = Union[Transaction, TransactionRecord]
+
+
+def as_record(row: TransactionLike) -> TransactionRecord:
+    """The record of a row written through a store, which may still be a form model."""
+    if isinstance(row, TransactionRecord):
+        return row
+    return TransactionRecord.from_model(row)
@@ -0,0 +1,113 @@
+import functools
+import logging
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Collection, Iterable, NamedTuple, Optional
+
+from app.ledger.codec import storage_codec
+from app.ledger.columns import IdentityCache
+from app.ledger.records import TransactionRecord
+
+RollupKey = tuple[str, str, str]
+"""("YYYY-MM" month, type, category)."""
+
+
+class RollupCell(NamedTuple):
+    amount: float
+    count: int
+
+
+def rollup_key(transaction: TransactionRecord) -> RollupKey:
+    return transaction.date[:7], transaction.type, transaction.category
+
+
+@dataclass(frozen=True, eq=False)
+class LedgerRollup:
+    """Total amount and row count per month, type and category.
+
+    Stores keep it next to the ledger and adjust it by the rows each write adds and
+    removes, so charts and budgets never rescan the transactions.
+    """
+
+    cells: dict[RollupKey, RollupCell]
+
+    @classmethod
+    def build(cls, transactions: Iterable[TransactionRecord]) -> "LedgerRollup":
+        return cls({}).applied(added=transactions)
+
+    def applied(
+        self,
+        added: Iterable[TransactionRecord] = (),
+        removed: Iterable[TransactionRecord] = (),
+    ) -> "LedgerRollup":
+        """A copy adjusted for rows written and for the rows they replaced or deleted."""
+        cells = dict(self.cells)
+        for sign, rows in ((-1, removed), (1, added)):
+            for t in rows:
+                key = rollup_key(t)
+                amount, count = cells.get(key, (0.0, 0))
+                if count + sign:
+                    cells[key] = RollupCell(amount + sign * t.amount, count + sign)
+                else:
+                    cells.pop(key, None)
+        return LedgerRollup(cells)
+
+    def amount_by_category(self, tx_type: str, month: str = "") -> dict[str, float]:
+        """Total amount per category for one type, optionally only for one "YYYY-MM"."""
+        totals: dict[str, float] = defaultdict(float)
+        for (m, t, category), cell in self.cells.items():
+            if t == tx_type and (not month or m == month):
+                totals[category] += cell.amount
+        return dict(sorted(totals.items()))
+
+    def amount_by_month(self, types: Collection[str]) -> dict[tuple[str, str], float]:
+        totals: dict[tuple[str, str], float] = defaultdict(float)
+        for (month, tx_type, _), cell in self.cells.items():
+            if tx_type in types:
+                totals[month, tx_type] += cell.amount
+        return dict(totals)
+
+    def mismatches(self, other: "LedgerRollup") -> list[RollupKey]:
+        """Keys whose totals differ beyond float drift, e.g. against a fresh build."""
+        empty = RollupCell(0.0, 0)
+        mismatched = []
+        for key in sorted(self.cells.keys() | other.cells.keys()):
+            mine, theirs = self.cells.get(key, empty), other.cells.get(key, empty)
+            if mine.count != theirs.count or not math.isclose(
+                mine.amount, theirs.amount, abs_tol=1e-6
+            ):
+                mismatched.append(key)
+        return mismatched
+
+    def to_json(self) -> str:
+        return storage_codec().dumps(
+            [[*key, *cell] for key, cell in self.cells.items()]
+        )
+
+
+@functools.lru_cache(maxsize=32)
+def decode_rollup(raw: str) -> Optional[LedgerRollup]:
+    """The stored rollup, or None if it is missing or unreadable and must be rebuilt."""
+    if not raw:
+        return None
+    try:
+        return LedgerRollup(
+            {
+                (month, tx_type, category): RollupCell(amount, count)
+                for month, tx_type, category, amount, count in storage_codec().loads(
+                    raw
+                )
+            }
+        )
+    except (TypeError, ValueError) as e:
+        logging.exception(f"Failed to parse rollup JSON: {e}")
+        return None
+
+
+rollup_cache = IdentityCache(LedgerRollup.build)
+
+
+def ledger_rollup(transactions: Iterable[TransactionRecord]) -> LedgerRollup:
+    """A rollup built from scratch, once per decoded ledger."""
+    return rollup_cache.get(transactions)
@@ -0,0 +1,62 @@
+from typing import Mapping, Optional, get_args
+
+from app.models import TransactionType
+
+TRANSACTION_TYPES: tuple[TransactionType, ...] = get_args(TransactionType)
+"""Every transaction type, in the order the form and filters offer them."""
+EXPENSE_TYPES = frozenset(
+    ("Expense", "Loan Payment", "Interest Payment", "EMI", "Insurance", "Bill Payment")
+)
+"""Types that count as spending in the expense total and the cash flow."""
+CATEGORIES_FOR_TYPE: dict[str, tuple[str, ...]] = {
+    "Income": ("Salary", "Freelance", "Investment", "Gift", "Other"),
+    "Expense": (
+        "Food",
+        "Groceries",
+        "Transport",
+        "Shopping",
+        "Entertainment",
+        "Utilities",
+        "Other",
+    ),
+    "Loan Payment": ("Personal Loan", "Home Loan", "Car Loan", "Student Loan"),
+    "Interest Payment": ("Credit Card", "Loan Interest"),
+    "EMI": ("Electronics", "Vehicle", "Home Appliance"),
+    "Insurance": ("Health", "Life", "Vehicle", "Home"),
+    "Bill Payment": ("Electricity", "Water", "Internet", "Phone", "Gas"),
+    "Payables": ("Friend", "Vendor", "Credit"),
+    "Receivables": ("Friend", "Client", "Refund"),
+    "Loan Taken": ("Personal", "Business"),
+    "Loan Given": ("Personal", "Business"),
+}
+"""The categories the transaction form offers for each type."""
+BUDGET_CATEGORIES = tuple(sorted(CATEGORIES_FOR_TYPE["Expense"]))
+"""The categories a budget can be set for: the expense categories, sorted."""
+
+PARTY_TYPES = ("Payables", "Receivables", "Loan Taken", "Loan Given")
+NEW_LOAN_TYPES = ("Loan Taken", "Loan Given")
+LOAN_PAYMENT_TYPES = ("Loan Payment", "Interest Payment")
+LOAN_TYPES = NEW_LOAN_TYPES + LOAN_PAYMENT_TYPES
+PENDING_TYPES = ("Payables", "Receivables")
+"""Transactions of these types start out pending, until they are paid or received."""
+
+
+def transaction_error(tx_type: str, amount: float, fields: Mapping) -> Optional[str]:
+    """Why a new transaction breaks the entry rules, or None if it is valid.
+
+    fields holds the entered date, party, interest_rate, loan_id and category; the
+    messages are the ones the transaction form shows.
+    """
+    if amount <= 0:
+        return "Amount must be greater than zero."
+    if not fields.get("date"):
+        return "Date is required."
+    if tx_type in PARTY_TYPES and not fields.get("party"):
+        return "Party name is required for this transaction type."
+    if tx_type in NEW_LOAN_TYPES and not fields.get("interest_rate"):
+        return "Interest rate is required for new loans."
+    if tx_type in LOAN_PAYMENT_TYPES and not fields.get("loan_id"):
+        return "A loan must be selected for this payment."
+    if tx_type not in LOAN_TYPES and not fields.get("category"):
+        return "Category is required."
+    return None
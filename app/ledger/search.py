@@ -0,0 +1,149 @@
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from app.ledger.columns import IdentityCache
+from app.ledger.records import TransactionRecord
+
+GRAM = 3
+_WORD = re.compile(r"\w+")
+
+
+def search_text(transaction: TransactionRecord) -> str:
+    """The lowercased text a search matches: description, category and party."""
+    return "\n".join(
+        (transaction.description, transaction.category, transaction.party or "")
+    ).lower()
+
+
+def _postings(keyed: dict[str, list[int]]) -> dict[str, np.ndarray]:
+    return {key: np.array(rows, np.int32) for key, rows in keyed.items()}
+
+
+@dataclass(frozen=True, eq=False)
+class SearchIndex:
+    """Token and trigram inverted index over the searchable text of a set of rows.
+
+    Postings hold positions into rows. A substring of three or more characters is looked
+    up by intersecting the postings of its trigrams; shorter word-character needles are
+    looked up in the token vocabulary, so a search touches the candidate rows and never
+    the whole ledger. Writes are applied as a small overlay (hidden ids plus an index of
+    the new rows) that is folded into a fresh build once it grows.
+    """
+
+    rows: tuple[TransactionRecord, ...]
+    texts: tuple[str, ...]
+    grams: dict[str, np.ndarray]
+    tokens: dict[str, np.ndarray]
+    vocabulary: tuple[str, ...]
+    hidden: frozenset[str] = frozenset()
+    overlay: Optional["SearchIndex"] = None
+
+    @classmethod
+    def build(cls, transactions: Iterable[TransactionRecord]) -> "SearchIndex":
+        rows = tuple(transactions)
+        texts = tuple(map(search_text, rows))
+        grams: dict[str, list[int]] = defaultdict(list)
+        tokens: dict[str, list[int]] = defaultdict(list)
+        for i, text in enumerate(texts):
+            for gram in {text[j : j + GRAM] for j in range(len(text) - GRAM + 1)}:
+                grams[gram].append(i)
+            for token in set(_WORD.findall(text)):
+                tokens[token].append(i)
+        return cls(
+            rows, texts, _postings(grams), _postings(tokens), tuple(sorted(tokens))
+        )
+
+    def applied(
+        self,
+        added: Iterable[TransactionRecord] = (),
+        removed: Iterable[TransactionRecord] = (),
+        max_overlay: int = 1024,
+    ) -> "SearchIndex":
+        """A copy reflecting rows written and the rows they replaced or deleted."""
+        added = tuple(added)
+        changed = {t.id for t in added} | {t.id for t in removed}
+        if not changed:
+            return self
+        pending = self.overlay.rows if self.overlay is not None else ()
+        new_rows = tuple(t for t in pending if t.id not in changed) + added
+        hidden = self.hidden | changed
+        if len(new_rows) > max(max_overlay, len(self.rows) // 8):
+            kept = (t for t in self.rows if t.id not in hidden)
+            return SearchIndex.build((*kept, *new_rows))
+        overlay = SearchIndex.build(new_rows) if new_rows else None
+        return SearchIndex(
+            self.rows,
+            self.texts,
+            self.grams,
+            self.tokens,
+            self.vocabulary,
+            frozenset(hidden),
+            overlay,
+        )
+
+    def _tokens_containing(self, needle: str) -> Optional[np.ndarray]:
+        matches = [self.tokens[token] for token in self.vocabulary if needle in token]
+        return np.unique(np.concatenate(matches)) if matches else None
+
+    def _candidates(self, needle: str) -> Optional[np.ndarray]:
+        """Positions that may contain needle, or None when the index cannot narrow it."""
+        if len(needle) >= GRAM:
+            postings = []
+            for j in range(len(needle) - GRAM + 1):
+                rows = self.grams.get(needle[j : j + GRAM])
+                if rows is None:
+                    return np.empty(0, np.int32)
+                postings.append(rows)
+            postings.sort(key=len)
+            candidates = postings[0]
+            for rows in postings[1:]:
+                # Past this point checking the few candidates' text is cheaper.
+                if len(candidates) * 16 <= len(rows):
+                    break
+                candidates = np.intersect1d(candidates, rows, assume_unique=True)
+            return candidates
+        if _WORD.fullmatch(needle):
+            found = self._tokens_containing(needle)
+            return found if found is not None else np.empty(0, np.int32)
+        return None
+
+    def search(self, needle: str) -> list[TransactionRecord]:
+        """Rows whose description, category or party contains needle (already lowercased)."""
+        candidates = self._candidates(needle)
+        positions = range(len(self.rows)) if candidates is None else candidates.tolist()
+        texts, rows, hidden = self.texts, self.rows, self.hidden
+        found = [
+            rows[i]
+            for i in positions
+            if needle in texts[i] and (not hidden or rows[i].id not in hidden)
+        ]
+        if self.overlay is not None:
+            found += self.overlay.search(needle)
+        return found
+
+
+search_index_cache = IdentityCache(SearchIndex.build)
+
+
+def search_index(transactions: Iterable[TransactionRecord]) -> SearchIndex:
+    """The search index of a transactions tuple, built once per decoded ledger."""
+    return search_index_cache.get(transactions)
+
+
+def carry_search_index(
+    previous: tuple[TransactionRecord, ...],
+    current: Callable[[], tuple[TransactionRecord, ...]],
+    added: Iterable[TransactionRecord] = (),
+    removed: Iterable[TransactionRecord] = (),
+):
+    """Derives the index of the next revision from the previous one, if that was built.
+
+    current is only called (decoding the next revision) when there is an index to carry.
+    """
+    index = search_index_cache.peek(previous)
+    if index is not None:
+        search_index_cache.put(current(), index.applied(added, removed))
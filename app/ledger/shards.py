@@ -0,0 +1,209 @@
+import functools
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Collection, Iterable, Optional, Sequence
+
+import numpy as np
+
+from app.ledger.codec import storage_codec
+from app.ledger.columns import INVALID_DAY, day_ordinal, month_key, month_of_day
+from app.ledger.packed import pack_transactions, unpack_sequenced
+from app.ledger.records import TransactionRecord
+
+SHARD_COUNT = 12
+"""Transactions are split by calendar month: shard m - 1 holds month m of every year.
+Reflex declares each LocalStorage key as a state field, so the keys cannot follow the
+years. Writes are appended to the transactions journal; compacting it re-encodes only
+the shards of the months its rows were in or moved to."""
+
+MANIFEST_VERSION = 1
+
+
+@functools.lru_cache(maxsize=4096)
+def _date_month(date: str) -> Optional[int]:
+    day = day_ordinal(date)
+    return None if day == INVALID_DAY else month_of_day(day)
+
+
+def shard_month(transaction: TransactionRecord) -> Optional[int]:
+    """The month index of a transaction's date, None if the date does not parse."""
+    return _date_month(transaction.date)
+
+
+def shard_of(transaction: TransactionRecord) -> int:
+    """The shard holding a transaction; undated rows live with January."""
+    month = shard_month(transaction)
+    return 0 if month is None else month % SHARD_COUNT
+
+
+def shards_between(first: int, last: int) -> tuple[int, ...]:
+    """The shards holding the dated rows of the days [first, last), by index."""
+    if last <= first:
+        return ()
+    months = range(month_of_day(first), month_of_day(last - 1) + 1)
+    return tuple(sorted({month % SHARD_COUNT for month in months[:SHARD_COUNT]}))
+
+
+@dataclass(frozen=True)
+class TransactionShard:
+    """The rows of one shard, newest first, with their ledger sequence numbers.
+
+    Sequence numbers are handed out in insertion order and kept when a row is replaced,
+    so merging the shards by descending sequence gives back the order the unsharded
+    ledger had.
+    """
+
+    rows: tuple[TransactionRecord, ...] = ()
+    sequence: tuple[int, ...] = ()
+
+    def pack(self) -> str:
+        return pack_transactions(self.rows, self.sequence) if self.rows else ""
+
+
+EMPTY_SHARD = TransactionShard()
+
+
+def decode_shard(raw: str) -> TransactionShard:
+    """A shard from its stored blob; "" is an empty shard."""
+    if not raw:
+        return EMPTY_SHARD
+    return TransactionShard(*unpack_sequenced(raw))
+
+
+def merge_shards(shards: Iterable[TransactionShard]) -> tuple[TransactionRecord, ...]:
+    """The ledger rows of all shards, newest first."""
+    shards = [s for s in shards if s.rows]
+    if len(shards) <= 1:
+        return shards[0].rows if shards else ()
+    rows = [row for shard in shards for row in shard.rows]
+    sequence = np.fromiter(
+        (seq for shard in shards for seq in shard.sequence), np.int64, len(rows)
+    )
+    return tuple(rows[i] for i in np.argsort(-sequence, kind="stable").tolist())
+
+
+@dataclass(frozen=True)
+class ShardManifest:
+    """The small index stored next to the shards.
+
+    next_seq is the sequence number of the next inserted row; months counts the rows of
+    each "YYYY-MM" month ("" for undated rows).
+    """
+
+    next_seq: int = 0
+    months: dict[str, int] = field(default_factory=dict)
+
+    def to_json(self) -> str:
+        return storage_codec().dumps(
+            {
+                "version": MANIFEST_VERSION,
+                "next_seq": self.next_seq,
+                "months": self.months,
+            }
+        )
+
+
+@functools.lru_cache(maxsize=32)
+def decode_manifest(raw: str) -> ShardManifest:
+    """The stored manifest; an empty one if it is missing or unreadable."""
+    if not raw:
+        return ShardManifest()
+    try:
+        data = storage_codec().loads(raw)
+        return ShardManifest(int(data["next_seq"]), dict(data["months"]))
+    except (TypeError, ValueError, KeyError) as e:
+        logging.exception(f"Failed to parse shard manifest: {e}")
+        return ShardManifest()
+
+
+def _month_label(transaction: TransactionRecord) -> str:
+    month = shard_month(transaction)
+    return "" if month is None else month_key(month)
+
+
+def shard_ledger(
+    transactions: Sequence[TransactionRecord],
+) -> tuple[list[TransactionShard], ShardManifest]:
+    """Splits a ledger (newest first) into shards, numbering its rows in that order."""
+    sequences: list[list[int]] = [[] for _ in range(SHARD_COUNT)]
+    rows: list[list[TransactionRecord]] = [[] for _ in range(SHARD_COUNT)]
+    n = len(transactions)
+    for i, row in enumerate(transactions):
+        index = shard_of(row)
+        sequences[index].append(n - 1 - i)
+        rows[index].append(row)
+    shards = [
+        TransactionShard(tuple(r), tuple(seq)) if r else EMPTY_SHARD
+        for seq, r in zip(sequences, rows)
+    ]
+    months = Counter(map(_month_label, transactions))
+    return shards, ShardManifest(n, dict(months))
+
+
+def _sorted_shard(
+    sequence: list[int], rows: list[TransactionRecord]
+) -> TransactionShard:
+    """The shard of rows in any order, put newest (highest sequence) first."""
+    if not rows:
+        return EMPTY_SHARD
+    order = np.argsort(-np.array(sequence, np.int64), kind="stable").tolist()
+    return TransactionShard(
+        tuple(rows[i] for i in order), tuple(sequence[i] for i in order)
+    )
+
+
+def write_shards(
+    shards: Sequence[TransactionShard],
+    manifest: ShardManifest,
+    existing: Callable[[str], Optional[TransactionRecord]],
+    put: Iterable[TransactionRecord] = (),
+    delete: Collection[str] = (),
+) -> tuple[dict[int, TransactionShard], ShardManifest]:
+    """The shards changed by deleting ids and writing rows, and the manifest after.
+
+    A written row replaces the row with the same id in place (keeping its sequence
+    number, moving shards if its month changed) or is inserted as the newest row.
+    existing looks up the current row of an id.
+    """
+    # Sequence numbers and rows of each changed shard, kept as parallel lists rather
+    # than (seq, row) pairs: an import touches every row of its shards.
+    changed: dict[int, tuple[list[int], list[TransactionRecord]]] = {}
+    written: dict[str, Optional[TransactionRecord]] = {}
+    months = Counter(manifest.months)
+    next_seq = manifest.next_seq
+
+    def entries(index: int) -> tuple[list[int], list[TransactionRecord]]:
+        if index not in changed:
+            shard = shards[index]
+            changed[index] = (list(shard.sequence), list(shard.rows))
+        return changed[index]
+
+    def remove(row_id: str) -> Optional[int]:
+        old = written[row_id] if row_id in written else existing(row_id)
+        if old is None:
+            return None
+        sequence, rows = entries(shard_of(old))
+        position = next((i for i, r in enumerate(rows) if r.id == row_id), None)
+        if position is None:
+            return None
+        months[_month_label(old)] -= 1
+        written[row_id] = None
+        rows.pop(position)
+        return sequence.pop(position)
+
+    for row_id in delete:
+        remove(row_id)
+    for row in put:
+        seq = remove(row.id)
+        if seq is None:
+            seq, next_seq = next_seq, next_seq + 1
+        sequence, rows = entries(shard_of(row))
+        sequence.append(seq)
+        rows.append(row)
+        months[_month_label(row)] += 1
+        written[row.id] = row
+    return (
+        {index: _sorted_shard(*e) for index, e in changed.items()},
+        ShardManifest(next_seq, {k: n for k, n in sorted(months.items()) if n > 0}),
+    )
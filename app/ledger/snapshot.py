@@ -0,0 +1,339 @@
+import logging
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar, Union
+
+from pydantic import BaseModel, TypeAdapter
+
+from app.models import Budget, Loan, Transaction
+from app.ledger.codec import storage_codec
+from app.ledger.journal import EMPTY_JOURNAL, JournalRecord, replay
+from app.ledger.packed import is_packed, unpack_transactions
+from app.ledger.records import TransactionRecord
+from app.ledger.shards import (
+    EMPTY_SHARD,
+    SHARD_COUNT,
+    TransactionShard,
+    decode_shard,
+    merge_shards,
+)
+
+RowT = TypeVar("RowT")
+
+LedgerRevision = tuple[int, ...]
+
+decode_counter: Counter[str] = Counter()
+event_decodes: ContextVar[Counter[str] | None] = ContextVar(
+    "event_decodes", default=None
+)
+
+
+@dataclass(frozen=True)
+class LedgerSnapshot:
+    """A decoded, immutable view of the stored ledger at one revision."""
+
+    revision: LedgerRevision
+    transactions: tuple[TransactionRecord, ...]
+    loans: tuple[Loan, ...]
+    budgets: tuple[Budget, ...]
+
+
+def _count_decode(name: str):
+    decode_counter[name] += 1
+    if (counter := event_decodes.get()) is not None:
+        counter[name] += 1
+
+
+def blob_revision(raw: str) -> int:
+    """Returns the revision of a stored JSON blob.
+
+    str objects memoize their hash, so repeated reads of the same stored value are free.
+    """
+    return hash(raw)
+
+
+class RowLoader(Generic[RowT]):
+    """Turns stored row dicts of one model into the row objects kept in memory.
+
+    Rows the app wrote itself (the LocalStorage blobs and journals, the SQL tables) are
+    loaded trusted, without validation. Imported or migrated payloads go through
+    validated: one bulk TypeAdapter pass over the whole payload. Blobs in the packed
+    format (see app/ledger/packed.py) are read whole with unpack.
+    """
+
+    def __init__(
+        self,
+        model: type[BaseModel],
+        trusted: Callable[[dict], RowT],
+        from_model: Optional[Callable[[Any], RowT]] = None,
+        unpack: Optional[Callable[[str], tuple[RowT, ...]]] = None,
+    ):
+        self.adapter = TypeAdapter(list[model])
+        self.trusted = trusted
+        self.from_model = from_model
+        self.unpack = unpack
+
+    def validated(self, payload: Union[str, bytes, list]) -> tuple[RowT, ...]:
+        """The rows of a JSON payload or decoded list, checked against the model.
+
+        Raises pydantic.ValidationError (a ValueError) on the first invalid row.
+        """
+        if isinstance(payload, (str, bytes)):
+            models = self.adapter.validate_json(payload)
+        else:
+            models = self.adapter.validate_python(payload)
+        if self.from_model is None:
+            return tuple(models)
+        return tuple(map(self.from_model, models))
+
+
+def _constructor(model: type[BaseModel]) -> Callable[[dict], Any]:
+    """model_construct for trusted rows; float fields are still cast, as JSON does not
+    keep 100.0 apart from 100."""
+    floats = [
+        name for name, field in model.model_fields.items() if field.annotation is float
+    ]
+
+    def construct(row: dict) -> Any:
+        row = {**row, **{name: float(row[name]) for name in floats if name in row}}
+        return model.model_construct(**row)
+
+    return construct
+
+
+transaction_loader = RowLoader(
+    Transaction,
+    TransactionRecord.from_dict,
+    TransactionRecord.from_model,
+    unpack_transactions,
+)
+loan_loader: RowLoader[Loan] = RowLoader(Loan, _constructor(Loan))
+budget_loader: RowLoader[Budget] = RowLoader(Budget, _constructor(Budget))
+
+
+class _BlobCache(Generic[RowT]):
+    """Bounded LRU of decoded rows keyed by the revision of the raw base and journal blobs.
+
+    Rows are loaded through loader.trusted: the blobs are the app's own writes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: RowLoader[RowT],
+        prepend: bool,
+        maxsize: int = 32,
+    ):
+        self.name = name
+        self.load = loader.trusted
+        self.unpack = loader.unpack
+        self.prepend = prepend
+        self.maxsize = maxsize
+        self._entries: OrderedDict[int, tuple[str, tuple[RowT, ...]]] = OrderedDict()
+        self._replayed: OrderedDict[
+            tuple[int, int], tuple[Hashable, str, tuple[RowT, ...]]
+        ] = OrderedDict()
+
+    def get(self, raw: str, raw_journal: str = EMPTY_JOURNAL) -> tuple[RowT, ...]:
+        return self.replayed(raw, self._base(raw), raw_journal)
+
+    def replayed(
+        self, source: Hashable, base: tuple[RowT, ...], raw_journal: str
+    ) -> tuple[RowT, ...]:
+        """base with the journal replayed on top, once per revision of the journal and
+        of source, the blob (or blobs) base was decoded from."""
+        if raw_journal == EMPTY_JOURNAL:
+            return base
+        revision = (hash(source), blob_revision(raw_journal))
+        entry = self._replayed.get(revision)
+        if entry is not None and entry[0] == source and entry[1] == raw_journal:
+            self._replayed.move_to_end(revision)
+            return entry[2]
+        rows = replay(base, self._decode_journal(raw_journal), self.load, self.prepend)
+        self._replayed[revision] = (source, raw_journal, rows)
+        if len(self._replayed) > self.maxsize:
+            self._replayed.popitem(last=False)
+        return rows
+
+    def _base(self, raw: str) -> tuple[RowT, ...]:
+        revision = blob_revision(raw)
+        entry = self._entries.get(revision)
+        if entry is not None and entry[0] == raw:
+            self._entries.move_to_end(revision)
+            return entry[1]
+        rows = self._decode(raw)
+        self._entries[revision] = (raw, rows)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return rows
+
+    def _decode_journal(self, raw_journal: str) -> list[JournalRecord]:
+        _count_decode(f"{self.name}_journal")
+        try:
+            records = storage_codec().loads(raw_journal)
+            return records if isinstance(records, list) else []
+        except ValueError as e:
+            logging.exception(f"Failed to parse {self.name} journal JSON: {e}")
+            return []
+
+    def _decode(self, raw: str) -> tuple[RowT, ...]:
+        _count_decode(self.name)
+        logging.debug(
+            f"Decoding {self.name} blob ({len(raw)} chars), decode #{decode_counter[self.name]}"
+        )
+        try:
+            if self.unpack is not None and is_packed(raw):
+                return self.unpack(raw)
+            raw_data = storage_codec().loads(raw)
+            return tuple(map(self.load, raw_data))
+        except (ValueError, TypeError, KeyError) as e:
+            logging.exception(f"Failed to parse {self.name} JSON: {e}")
+            return ()
+
+    def clear(self):
+        self._entries.clear()
+        self._replayed.clear()
+
+
+class LedgerCache:
+    """Process-wide cache of decoded ledgers shared by every session and computed var.
+
+    Each blob is decoded at most once per revision and each journal is replayed at most
+    once per revision; snapshots are immutable so they can be shared safely between
+    sessions that hold the same data.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        self._transactions = _BlobCache(
+            "transactions", transaction_loader, True, maxsize
+        )
+        self._loans = _BlobCache("loans", loan_loader, False, maxsize)
+        self._budgets = _BlobCache("budgets", budget_loader, False, maxsize)
+        self._shards: OrderedDict[int, tuple[str, TransactionShard]] = OrderedDict()
+        self._merged: OrderedDict[
+            LedgerRevision, tuple[tuple[str, ...], tuple[TransactionRecord, ...]]
+        ] = OrderedDict()
+        self._snapshots: OrderedDict[LedgerRevision, LedgerSnapshot] = OrderedDict()
+        self.maxsize = maxsize
+
+    def transactions(
+        self, raw: str, raw_journal: str = EMPTY_JOURNAL
+    ) -> tuple[TransactionRecord, ...]:
+        return self._transactions.get(raw, raw_journal)
+
+    def transaction_shard(self, raw: str) -> TransactionShard:
+        """One month shard, decoded once per revision of its blob."""
+        revision = blob_revision(raw)
+        entry = self._shards.get(revision)
+        if entry is not None and entry[0] == raw:
+            self._shards.move_to_end(revision)
+            return entry[1]
+        _count_decode("transactions_shard")
+        try:
+            shard = decode_shard(raw)
+        except (ValueError, TypeError, KeyError) as e:
+            logging.exception(f"Failed to parse transactions shard: {e}")
+            shard = EMPTY_SHARD
+        self.put_shard(raw, shard)
+        return shard
+
+    def put_shard(self, raw: str, shard: TransactionShard):
+        """Caches a shard under the blob it was just packed into, so a write never
+        decodes its own output."""
+        self._shards[blob_revision(raw)] = (raw, shard)
+        if len(self._shards) > self.maxsize * SHARD_COUNT:
+            self._shards.popitem(last=False)
+
+    def sharded_transactions(
+        self, shards: tuple[str, ...], raw_journal: str = EMPTY_JOURNAL
+    ) -> tuple[TransactionRecord, ...]:
+        """The rows held in month shards (all of them, or the months of a date range)
+        with the transactions journal replayed on top. A compaction rewrites only some
+        shards, so only those are decoded again; the merge into ledger order and the
+        replay are each cached per revision."""
+        revision = tuple(map(blob_revision, shards))
+        entry = self._merged.get(revision)
+        if entry is not None and entry[0] == shards:
+            self._merged.move_to_end(revision)
+            rows = entry[1]
+        else:
+            rows = merge_shards(map(self.transaction_shard, shards))
+            self.put_merged(shards, rows)
+        return self._transactions.replayed(shards, rows, raw_journal)
+
+    def put_merged(self, shards: tuple[str, ...], rows: tuple[TransactionRecord, ...]):
+        """Caches the rows the shards merge into, e.g. the ledger a compaction just
+        wrote into them, so that ledger keeps its decoded rows and indexes."""
+        self._merged[tuple(map(blob_revision, shards))] = (shards, rows)
+        if len(self._merged) > self.maxsize:
+            self._merged.popitem(last=False)
+
+    def loans(self, raw: str, raw_journal: str = EMPTY_JOURNAL) -> tuple[Loan, ...]:
+        return self._loans.get(raw, raw_journal)
+
+    def budgets(self, raw: str, raw_journal: str = EMPTY_JOURNAL) -> tuple[Budget, ...]:
+        return self._budgets.get(raw, raw_journal)
+
+    def snapshot(
+        self,
+        transactions_json: str,
+        loans_json: str,
+        budgets_json: str,
+        transactions_journal: str = EMPTY_JOURNAL,
+        loans_journal: str = EMPTY_JOURNAL,
+        budgets_journal: str = EMPTY_JOURNAL,
+        transaction_shards: tuple[str, ...] = (),
+    ) -> LedgerSnapshot:
+        """The decoded ledger; transactions come from transaction_shards when given,
+        else from transactions_json, and transactions_journal is replayed on either."""
+        if transaction_shards:
+            transactions = self.sharded_transactions(
+                transaction_shards, transactions_journal
+            )
+        else:
+            transactions = self.transactions(transactions_json, transactions_journal)
+        loans = self.loans(loans_json, loans_journal)
+        budgets = self.budgets(budgets_json, budgets_journal)
+        revision = tuple(
+            blob_revision(raw)
+            for raw in (
+                transactions_json,
+                loans_json,
+                budgets_json,
+                transactions_journal,
+                loans_journal,
+                budgets_journal,
+                *transaction_shards,
+            )
+        )
+        snapshot = self._snapshots.get(revision)
+        if (
+            snapshot is None
+            or snapshot.transactions is not transactions
+            or snapshot.loans is not loans
+            or snapshot.budgets is not budgets
+        ):
+            snapshot = LedgerSnapshot(revision, transactions, loans, budgets)
+            self._snapshots[revision] = snapshot
+            if len(self._snapshots) > self.maxsize:
+                self._snapshots.popitem(last=False)
+        else:
+            self._snapshots.move_to_end(revision)
+        return snapshot
+
+    def clear(self):
+        self._transactions.clear()
+        self._loans.clear()
+        self._budgets.clear()
+        self._shards.clear()
+        self._merged.clear()
+        self._snapshots.clear()
+
+
+ledger_cache = LedgerCache()
+
+
+def decode_count() -> int:
+    """Total number of blob decodes since startup; diff it around an event to count its decodes."""
+    return sum(decode_counter.values())
@@ -0,0 +1,140 @@
+import asyncio
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterator, TypeVar
+
+from app.storage import STORAGE_BACKEND
+from app.telemetry import timed_var
+
+T = TypeVar("T")
+
+MEMO_SIZE = 8
+"""Results kept per var, the least recently used dropped first: enough for the current
+and previous revisions of the ledgers (and list filters) of the sessions in use."""
+
+
+class VarMemo:
+    """One computed var's recent results by the values of its inputs, shared by every
+    session in the process. Results are immutable by convention, like the decoded ledger
+    they come from."""
+
+    def __init__(self, maxsize: int = MEMO_SIZE):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+var_memos: dict[str, VarMemo] = {}
+"""Every ledger_var's memo, by var name."""
+
+
+def clear_memos():
+    """Drops every memoized result, e.g. to time vars as a new revision computes them."""
+    for memo in var_memos.values():
+        memo.clear()
+
+
+def _frozen(value: Any) -> Hashable:
+    """A field's value as part of a memo key; lists (e.g. of page cursors) as tuples."""
+    return tuple(value) if isinstance(value, list) else value
+
+
+def ledger_var(
+    *inputs: str, page: bool = False, today: bool = False, **kwargs
+) -> Callable[[Callable], Any]:
+    """A computed var of AppState or a page substate, derived from the ledger and inputs.
+
+    The dependencies are declared rather than traced: the ledger's revision (the
+    _revision var), the named fields or vars, the router if page (the var is empty off
+    its state's page) and the _today field if today. Reflex recomputes the var only when
+    one of them is assigned, and a recompute with inputs seen before, in this session or
+    any other, returns the memoized result. Takes timed_var's keyword arguments.
+    """
+    deps = ["_revision", *inputs]
+    if page:
+        deps.append("router")
+    if today:
+        deps.append("_today")
+
+    def decorator(fget: Callable) -> Any:
+        memo = var_memos[fget.__qualname__] = VarMemo()
+
+        @functools.wraps(fget)
+        def memoized(state) -> Any:
+            key = (
+                state._revision,
+                *(_frozen(getattr(state, name)) for name in inputs),
+                state._showing() if page else None,
+                state._today if today else None,
+            )
+            return memo.get(key, lambda: fget(state))
+
+        return timed_var(memoized, deps=deps, auto_deps=False, **kwargs)
+
+    return decorator
+
+
+def refresh_ledger_vars(state: Any):
+    """Recomputes the stale ledger vars of every state loaded in a session, so the delta
+    computed next finds their results memoized and sends them without a store call."""
+    states = [state._get_root_state()]
+    for substate in states:
+        substate._mark_dirty_computed_vars()
+        states.extend(substate.substates.values())
+        for name in substate.dirty_vars & substate.computed_vars.keys():
+            if substate.computed_vars[name]._fget.__qualname__ in var_memos:
+                getattr(substate, name)
+
+
+def _refreshed(state: Any, call: Callable[..., T], *args) -> T:
+    result = call(*args)
+    if inspect.isgenerator(result):
+        result = list(result)
+    refresh_ledger_vars(state)
+    return result
+
+
+async def off_loop(state: Any, call: Callable[..., T], *args) -> T:
+    """call(*args) for a session's state, run in a worker thread when the ledger is in a
+    database, followed by the ledger vars it left stale: their queries then hold a pooled
+    connection without blocking the event loop for every other session. The local store
+    computes in memory, so the call runs inline. A generator's items are returned as a
+    list."""
+    if STORAGE_BACKEND == "local":
+        return call(*args)
+    return await asyncio.to_thread(_refreshed, state, call, *args)
+
+
+def ledger_event(fn: Callable) -> Callable:
+    """An event handler of AppState or a page substate that calls the ledger store, run
+    through off_loop. Under rx.event; the events the handler returns or yields are
+    yielded in order."""
+
+    @functools.wraps(fn)
+    async def handler(state, *args, **kwargs):
+        events = await off_loop(state, functools.partial(fn, state, *args, **kwargs))
+        if isinstance(events, (list, Iterator)):
+            for event in events:
+                yield event
+        elif events is not None:
+            yield events
+
+    return handler
@@ -0,0 +1,66 @@
+import logging
+import time
+from collections import Counter
+import reflex as rx
+from reflex.event import Event
+from reflex.state import BaseState, StateUpdate
+from app.ledger import event_decodes
+from app.telemetry import EventMetrics, current_event, record_event
+
+
+class DecodeCounterMiddleware(rx.Middleware):
+    """Counts how many ledger blobs were decoded while handling each event."""
+
+    async def preprocess(
+        self, app: rx.App, state: BaseState, event: Event
+    ) -> StateUpdate | None:
+        event_decodes.set(Counter())
+        return None
+
+    async def postprocess(
+        self, app: rx.App, state: BaseState, event: Event, update: StateUpdate
+    ) -> StateUpdate:
+        counter = event_decodes.get()
+        if update.final and counter:
+            logging.info(
+                f"{event.name}: {counter.total()} ledger decodes ({dict(counter)})"
+            )
+        return update
+
+
+def handler_name(state: BaseState, event: Event) -> str:
+    """An event's State.handler name, like the vars' names in app.telemetry."""
+    path, _, handler = event.name.rpartition(".")
+    try:
+        substate = type(state).get_class_substate(tuple(path.split(".")[1:]))
+    except ValueError:
+        return event.name
+    return f"{substate.__name__}.{handler}"
+
+
+class EventTimingMiddleware(rx.Middleware):
+    """Times each event up to its final update, with the bytes of every update sent.
+
+    Installed when FINTRACK_METRICS=1; the totals are served at /metrics and each event
+    is logged to fintrack.metrics (see app.telemetry). Counting the bytes serializes each
+    update once more. Background events return before postprocess, so they are not
+    timed.
+    """
+
+    async def preprocess(
+        self, app: rx.App, state: BaseState, event: Event
+    ) -> StateUpdate | None:
+        current_event.set(EventMetrics(time.perf_counter()))
+        return None
+
+    async def postprocess(
+        self, app: rx.App, state: BaseState, event: Event, update: StateUpdate
+    ) -> StateUpdate:
+        metrics = current_event.get()
+        if metrics is None:
+            return update
+        metrics.delta_bytes += len(update.json().encode())
+        if update.final:
+            record_event(handler_name(state, event), metrics)
+            current_event.set(None)
+        return update
@@ -0,0 +1,62 @@
+from typing import Literal, Optional
+from pydantic import BaseModel, ConfigDict
+
+TransactionType = Literal[
+    "Income",
+    "Expense",
+    "Loan Payment",
+    "Interest Payment",
+    "EMI",
+    "Insurance",
+    "Bill Payment",
+    "Payables",
+    "Receivables",
+    "Loan Taken",
+    "Loan Given",
+]
+TransactionStatus = Literal["pending", "paid", "received", "settled", "active"]
+LoanType = Literal["Taken", "Given"]
+LoanStatus = Literal["Active", "Paid Off"]
+
+
+class Transaction(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    id: str
+    type: TransactionType
+    amount: float
+    category: str
+    date: str
+    description: str
+    status: TransactionStatus = "active"
+    linked_transaction_id: Optional[str] = None
+    loan_id: Optional[str] = None
+    party: Optional[str] = None
+
+
+class Loan(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    id: str
+    type: LoanType
+    principal: float
+    interest_rate: float
+    party: str
+    start_date: str
+    status: LoanStatus = "Active"
+    payments_made: float = 0.0
+
+    @property
+    def outstanding_balance(self) -> float:
+        return self.principal - self.payments_made
+
+
+class Budget(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    id: str
+    category: str
+    limit: float
+    spent: float = 0.0
+    remaining: float = 0.0
+    progress: float = 0.0
@@ -1,5 +1,5 @@
 import reflex as rx
-from app.state import AppState
+from app.state import AnalyticsState
 from app.components.sidebar import sidebar
 from app.components.header import header
 from app.components.transaction_form import transaction_form
@@ -32,7 +32,7 @@ def income_expense_chart() -> rx.Component:
             rx.recharts.y_axis(),
             rx.recharts.line(data_key="income", type_="monotone", stroke="#10b981"),
             rx.recharts.line(data_key="expense", type_="monotone", stroke="#ef4444"),
-            data=AppState.income_vs_expense_data,
+            data=AnalyticsState.income_vs_expense_data,
             height=300,
             class_name="[&_.recharts-tooltip-cursor]:stroke-gray-300",
         ),
@@ -49,7 +49,7 @@ def category_pie_chart() -> rx.Component:
         rx.recharts.pie_chart(
             rx.recharts.graphing_tooltip(**TOOLTIP_PROPS),
             rx.recharts.pie(
-                data=AppState.expense_by_category_data,
+                data=AnalyticsState.expense_by_category_data,
                 data_key="value",
                 name_key="name",
                 cx="50%",
@@ -84,7 +84,7 @@ def cash_flow_chart() -> rx.Component:
                 fill="#3b82f6",
                 fill_opacity=0.3,
             ),
-            data=AppState.cash_flow_data,
+            data=AnalyticsState.cash_flow_data,
             height=300,
             class_name="[&_.recharts-tooltip-cursor]:stroke-gray-300",
         ),
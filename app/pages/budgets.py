@@ -1,5 +1,6 @@
 import reflex as rx
-from app.state import AppState, Budget
+from app.ledger import BUDGET_CATEGORIES
+from app.state import BudgetState, Budget
 from app.components.sidebar import sidebar
 from app.components.header import header
 from app.components.transaction_form import transaction_form
@@ -38,7 +39,7 @@ def budget_form() -> rx.Component:
                                 "Select a category...", value="", disabled=True
                             ),
                             rx.foreach(
-                                AppState.budget_categories,
+                                BUDGET_CATEGORIES,
                                 lambda category: rx.el.option(category, value=category),
                             ),
                             name="category",
@@ -70,10 +71,10 @@ def budget_form() -> rx.Component:
                         class_name="flex-1",
                     ),
                     rx.cond(
-                        AppState.form_error != "",
+                        BudgetState.form_error != "",
                         rx.el.div(
                             rx.icon("flag_triangle_right", class_name="h-4 w-4 mr-2"),
-                            rx.el.p(AppState.form_error),
+                            rx.el.p(BudgetState.form_error),
                             class_name="flex items-center text-sm text-red-600 bg-red-50 p-3 rounded-lg",
                         ),
                         None,
@@ -94,14 +95,14 @@ def budget_form() -> rx.Component:
                         class_name="mt-6 flex gap-4",
                     ),
                     class_name="flex flex-col gap-4 mt-4",
-                    on_submit=AppState.add_budget,
+                    on_submit=BudgetState.add_budget,
                     reset_on_submit=True,
                 ),
                 class_name="bg-white p-6 rounded-2xl shadow-xl w-full max-w-md z-50 fixed top-1/2 left-1/2 -translate-x-1/2 -translate-y-1/2",
             ),
         ),
-        open=AppState.show_budget_dialog,
-        on_open_change=AppState.set_show_budget_dialog,
+        open=BudgetState.show_budget_dialog,
+        on_open_change=BudgetState.set_show_budget_dialog,
     )
 
 
@@ -123,7 +124,7 @@ def budget_item(budget: Budget) -> rx.Component:
             ),
             rx.el.button(
                 rx.icon("trash-2", class_name="h-4 w-4"),
-                on_click=lambda: AppState.delete_budget(budget.id),
+                on_click=lambda: BudgetState.delete_budget(budget.id),
                 class_name="text-gray-400 hover:text-red-600",
                 variant="ghost",
             ),
@@ -165,15 +166,15 @@ def budgets_page() -> rx.Component:
                     ),
                     rx.el.button(
                         "Add Budget",
-                        on_click=AppState.toggle_budget_dialog,
+                        on_click=BudgetState.toggle_budget_dialog,
                         class_name="flex items-center text-sm font-medium bg-blue-600 text-white px-4 py-2 rounded-lg shadow-sm hover:bg-blue-700 transition-colors",
                     ),
                     class_name="flex justify-between items-center mb-6",
                 ),
                 rx.cond(
-                    AppState.budgets.length() > 0,
+                    BudgetState.budgets.length() > 0,
                     rx.el.div(
-                        rx.foreach(AppState.budgets_with_progress, budget_item),
+                        rx.foreach(BudgetState.budgets_with_progress, budget_item),
                         class_name="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6",
                     ),
                     rx.el.div(
@@ -188,7 +189,7 @@ def budgets_page() -> rx.Component:
                         ),
                         rx.el.button(
                             "Create Budget",
-                            on_click=AppState.toggle_budget_dialog,
+                            on_click=BudgetState.toggle_budget_dialog,
                             class_name="mt-4 text-sm font-medium bg-blue-600 text-white px-4 py-2 rounded-lg shadow-sm hover:bg-blue-700 transition-colors",
                         ),
                         class_name="flex flex-col items-center justify-center text-center p-16 border-2 border-dashed rounded-lg mt-4",
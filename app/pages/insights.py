@@ -1,5 +1,5 @@
 import reflex as rx
-from app.state import AppState
+from app.state import InsightsState
 from app.components.sidebar import sidebar
 from app.components.header import header
 from app.components.transaction_form import transaction_form
@@ -72,7 +72,7 @@ def insights_dialog() -> rx.Component:
             rx.radix.primitives.dialog.content(
                 rx.el.div(
                     rx.el.h2(
-                        AppState.current_insight.get("title", "Insight"),
+                        InsightsState.current_insight.get("title", "Insight"),
                         class_name="text-xl font-bold text-gray-900",
                     ),
                     rx.radix.primitives.dialog.close(
@@ -85,15 +85,15 @@ def insights_dialog() -> rx.Component:
                     class_name="flex items-center justify-between pb-4 border-b",
                 ),
                 rx.el.p(
-                    AppState.current_insight.get("description", ""),
+                    InsightsState.current_insight.get("description", ""),
                     class_name="mt-4 text-gray-600",
                 ),
                 rx.cond(
-                    AppState.current_insight.contains("potential_savings"),
+                    InsightsState.current_insight.contains("potential_savings"),
                     rx.el.div(
                         rx.el.p("Potential Monthly Savings:", class_name="font-medium"),
                         rx.el.p(
-                            f"${AppState.current_insight.get('potential_savings', 0).to_string()}",
+                            f"${InsightsState.current_insight.get('potential_savings', 0).to_string()}",
                             class_name="text-2xl font-bold text-green-600",
                         ),
                         class_name="mt-4 p-4 bg-green-50 rounded-lg text-center",
@@ -103,8 +103,8 @@ def insights_dialog() -> rx.Component:
                 class_name="bg-white p-6 rounded-2xl shadow-xl w-full max-w-md",
             ),
         ),
-        open=AppState.show_insights_dialog,
-        on_open_change=AppState.close_insights_dialog,
+        open=InsightsState.show_insights_dialog,
+        on_open_change=InsightsState.close_insights_dialog,
     )
 
 
@@ -128,9 +128,9 @@ def insights_page() -> rx.Component:
                             class_name="text-lg font-semibold text-gray-800 mb-4",
                         ),
                         rx.cond(
-                            AppState.smart_alerts.length() > 0,
+                            InsightsState.smart_alerts.length() > 0,
                             rx.el.div(
-                                rx.foreach(AppState.smart_alerts, alert_card),
+                                rx.foreach(InsightsState.smart_alerts, alert_card),
                                 class_name="flex flex-col gap-4",
                             ),
                             rx.el.div(
@@ -148,14 +148,14 @@ def insights_page() -> rx.Component:
                             class_name="text-lg font-semibold text-gray-800 mb-4",
                         ),
                         rx.cond(
-                            AppState.savings_suggestions.length() > 0,
+                            InsightsState.savings_suggestions.length() > 0,
                             rx.el.div(
                                 rx.foreach(
-                                    AppState.savings_suggestions,
+                                    InsightsState.savings_suggestions,
                                     lambda s: insight_card(
                                         s["title"],
                                         s["description"],
-                                        lambda: AppState.show_insight_details(s),
+                                        lambda: InsightsState.show_insight_details(s),
                                     ),
                                 ),
                                 class_name="flex flex-col gap-4",
@@ -182,16 +182,17 @@ def insights_page() -> rx.Component:
                             class_name="text-gray-600",
                         ),
                         rx.el.p(
-                            f"${AppState.monthly_surplus.to_string()}",
+                            f"${InsightsState.monthly_surplus.to_string()}",
                             class_name="text-3xl font-bold text-blue-600",
                         ),
                         class_name="mb-6 p-6 bg-blue-50 rounded-lg text-center",
                     ),
                     rx.cond(
-                        AppState.investment_recommendations.length() > 0,
+                        InsightsState.investment_recommendations.length() > 0,
                         rx.el.div(
                             rx.foreach(
-                                AppState.investment_recommendations, investment_card
+                                InsightsState.investment_recommendations,
+                                investment_card,
                             ),
                             class_name="grid grid-cols-1 md:grid-cols-3 gap-6",
                         ),
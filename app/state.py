@@ -1,122 +1,368 @@
 import reflex as rx
-from typing import Literal, TypedDict, cast, Optional
+import asyncio
+from typing import Any, ClassVar, Hashable
 import datetime
-import json
-from pydantic import BaseModel
 import logging
-from collections import defaultdict
-
-TransactionType = Literal[
-    "Income",
-    "Expense",
-    "Loan Payment",
-    "Interest Payment",
-    "EMI",
-    "Insurance",
-    "Bill Payment",
-    "Payables",
-    "Receivables",
-    "Loan Taken",
-    "Loan Given",
-]
-TransactionStatus = Literal["pending", "paid", "received", "settled", "active"]
-LoanType = Literal["Taken", "Given"]
-LoanStatus = Literal["Active", "Paid Off"]
-
-
-class Transaction(BaseModel):
-    id: str
-    type: TransactionType
-    amount: float
-    category: str
-    date: str
-    description: str
-    status: TransactionStatus = "active"
-    linked_transaction_id: Optional[str] = None
-    loan_id: Optional[str] = None
-    party: Optional[str] = None
-
-
-class Loan(BaseModel):
-    id: str
-    type: LoanType
-    principal: float
-    interest_rate: float
-    party: str
-    start_date: str
-    status: LoanStatus = "Active"
-    payments_made: float = 0.0
-
-    @property
-    def outstanding_balance(self) -> float:
-        return self.principal - self.payments_made
-
-
-class Budget(BaseModel):
-    id: str
-    category: str
-    limit: float
-    spent: float = 0.0
-    remaining: float = 0.0
-    progress: float = 0.0
+import shutil
+import uuid
+from pathlib import Path
+from app.models import (
+    Budget,
+    Loan,
+    Transaction,
+    TransactionType,
+)
+from app.ledger import (
+    CATEGORIES_FOR_TYPE,
+    EMPTY_JOURNAL,
+    EXPENSE_TYPES,
+    LOAN_PAYMENT_TYPES,
+    NEW_LOAN_TYPES,
+    PENDING_TYPES,
+    LedgerMetrics,
+    LedgerRollup,
+    TransactionCursor,
+    TransactionPage,
+    TransactionQuery,
+    import_batches,
+    import_format,
+    month_key,
+    month_label,
+    month_of_day,
+    parse_file,
+    transaction_error,
+)
+from app.api import export_url, register_export
+from app.memo import ledger_event, ledger_var, off_loop
+from app.telemetry import timed_var
+from app.storage import (
+    SHARD_FIELDS,
+    STORAGE_BACKEND,
+    LedgerStore,
+    LocalLedgerStore,
+    SqlLedgerStore,
+    StoreUpdate,
+    ledger_database,
+)
 
 
 class AppState(rx.State):
-    """The main state for the application."""
-
-    sidebar_collapsed: bool = False
-    transactions_json: str = rx.LocalStorage("[]", name="transactions_v2")
+    """The ledger: the blobs (or SQLite ledger) it is stored in, and the writes to it.
+
+    Each page's state is a substate of this one: it reads the ledger's fields and vars
+    as its own. Vars derived from the ledger are ledger_vars (see app/memo.py): they
+    declare the revision, fields and date they depend on, and are recomputed and sent
+    only when one of those changes.
+    """
+
+    route: ClassVar[str] = ""
+    """The route of the page rendering this state; its page vars are empty elsewhere."""
+
+    transactions_json: str = rx.LocalStorage("[]", name="transactions_v3")
+    legacy_transactions_json: str = rx.LocalStorage("", name="transactions_v2")
+    transactions_m01: str = rx.LocalStorage("", name="transactions_v4_m01")
+    transactions_m02: str = rx.LocalStorage("", name="transactions_v4_m02")
+    transactions_m03: str = rx.LocalStorage("", name="transactions_v4_m03")
+    transactions_m04: str = rx.LocalStorage("", name="transactions_v4_m04")
+    transactions_m05: str = rx.LocalStorage("", name="transactions_v4_m05")
+    transactions_m06: str = rx.LocalStorage("", name="transactions_v4_m06")
+    transactions_m07: str = rx.LocalStorage("", name="transactions_v4_m07")
+    transactions_m08: str = rx.LocalStorage("", name="transactions_v4_m08")
+    transactions_m09: str = rx.LocalStorage("", name="transactions_v4_m09")
+    transactions_m10: str = rx.LocalStorage("", name="transactions_v4_m10")
+    transactions_m11: str = rx.LocalStorage("", name="transactions_v4_m11")
+    transactions_m12: str = rx.LocalStorage("", name="transactions_v4_m12")
+    transactions_manifest: str = rx.LocalStorage("", name="transactions_v4_manifest")
     budgets_json: str = rx.LocalStorage("[]", name="budgets_v1")
     loans_json: str = rx.LocalStorage("[]", name="loans_v1")
-    show_transaction_dialog: bool = False
-    current_transaction_type: TransactionType = "Expense"
-    form_error: str = ""
-    search_query: str = ""
-    filter_type: str = ""
-    filter_category: str = ""
-    filter_start_date: str = ""
-    filter_end_date: str = ""
-    sort_by: str = "date_desc"
-    show_budget_dialog: bool = False
-    show_insights_dialog: bool = False
-    current_insight: dict = {}
-    show_transaction_detail_dialog: bool = False
-    selected_transaction: dict = {}
+    transactions_journal: str = rx.LocalStorage(
+        EMPTY_JOURNAL, name="transactions_v2_journal"
+    )
+    budgets_journal: str = rx.LocalStorage(EMPTY_JOURNAL, name="budgets_v1_journal")
+    loans_journal: str = rx.LocalStorage(EMPTY_JOURNAL, name="loans_v1_journal")
+    rollup_json: str = rx.LocalStorage("", name="ledger_rollup_v1")
+    ledger_id: str = rx.LocalStorage("", name="ledger_id")
+    _ledger_revision: int = 0
+    _today: str = datetime.date.today().isoformat()
+    """The date the date-dependent vars are for, moved on by the first page load of a day."""
+
+    def __setattr__(self, name: str, value: Any):
+        """Skips assigning a stored field its current value. The browser sends back every
+        LocalStorage field on each page load; assigning them would recompute every ledger
+        var and send the blobs straight back."""
+        if (
+            name in self.base_vars
+            and self._is_client_storage(name)
+            and getattr(self, name) == value
+        ):
+            return
+        super().__setattr__(name, value)
 
     @rx.event
-    def view_transaction_details(self, transaction_id: str):
-        tx = next((t for t in self.transactions if t.id == transaction_id), None)
-        if tx:
-            tx_dict = tx.model_dump()
-            if tx.loan_id:
-                loan = next((l for l in self.loans if l.id == tx.loan_id), None)
-                if loan:
-                    loan_dump = loan.model_dump()
-                    loan_dump["outstanding_balance"] = loan.outstanding_balance
-                    tx_dict["loan_details"] = loan_dump
-            self.selected_transaction = tx_dict
-            self.show_transaction_detail_dialog = True
+    @ledger_event
+    def delete_transaction(self, transaction_id: str):
+        """Deletes a transaction from the list and saves."""
+        self._apply(self._writable_store().delete_transaction(transaction_id))
+        yield rx.toast.error("Transaction deleted.")
+        if self._store().needs_compaction():
+            yield AppState.compact_journal
+
+    def _store(self) -> LedgerStore:
+        """The store holding this session's ledger, per the configured backend.
+
+        A database ledger reads as empty until check_storage has fetched its revision
+        off the event loop, so the vars sent on hydrate run no query on it.
+        """
+        if STORAGE_BACKEND != "local":
+            if not self._ledger_revision:
+                return LocalLedgerStore()
+            return self._database_store()
+        return LocalLedgerStore(
+            self.transactions_json,
+            self.loans_json,
+            self.budgets_json,
+            self.transactions_journal,
+            self.loans_journal,
+            self.budgets_journal,
+            self.rollup_json,
+            self.legacy_transactions_json,
+            # Read by name, not through SHARD_FIELDS, so that a var tracking what it
+            # reads would see them; _revision declares them.
+            (
+                self.transactions_m01,
+                self.transactions_m02,
+                self.transactions_m03,
+                self.transactions_m04,
+                self.transactions_m05,
+                self.transactions_m06,
+                self.transactions_m07,
+                self.transactions_m08,
+                self.transactions_m09,
+                self.transactions_m10,
+                self.transactions_m11,
+                self.transactions_m12,
+            ),
+            self.transactions_manifest,
+        )
+
+    def _database_store(self) -> SqlLedgerStore:
+        return SqlLedgerStore(ledger_database(), self.ledger_id, self._ledger_revision)
+
+    def _writable_store(self) -> LedgerStore:
+        if STORAGE_BACKEND == "local":
+            return self._store()
+        if not self.ledger_id:
+            self.ledger_id = uuid.uuid4().hex
+        return self._database_store()
+
+    def _apply(self, update: StoreUpdate):
+        """Assigns the state fields changed by a store write."""
+        for field, value in update.items():
+            setattr(self, field, value)
+
+    def _showing(self) -> bool:
+        """Whether the session is on this state's page. Reading the router makes a
+        change of page recompute the page vars; Reflex names the "/" route "/index"."""
+        return self.router.route_id == ("/index" if self.route == "/" else self.route)
+
+    def _budget_progress(self) -> list[Budget]:
+        """The budgets with this month's spending against them."""
+        current_month = self._today[:7]
+        expense_by_cat = self._rollup.amount_by_category("Expense", current_month)
+        updated_budgets = []
+        for budget in self._store().budgets():
+            spent = expense_by_cat.get(budget.category, 0.0)
+            remaining = budget.limit - spent
+            progress = spent / budget.limit * 100 if budget.limit > 0 else 0
+            updated_budgets.append(
+                budget.model_copy(
+                    update={
+                        "spent": spent,
+                        "remaining": remaining,
+                        "progress": progress,
+                    }
+                )
+            )
+        return updated_budgets
+
+    def _income_vs_expense(self) -> list[dict]:
+        """Income and expense of the last six months, bucketed by integer month index."""
+        today = datetime.date.fromisoformat(self._today).toordinal()
+        months = {}
+        for i in range(6):
+            month = month_of_day(today - i * 30)
+            months[month_key(month)] = month
+        monthly_data = {m: {"income": 0, "expense": 0} for m in months.values()}
+        totals = self._rollup.amount_by_month(("Income", "Expense"))
+        for (key, tx_type), amount in totals.items():
+            if key in months:
+                monthly_data[months[key]][tx_type.lower()] += amount
+        return [
+            {"month": month_label(month), **amounts}
+            for month, amounts in sorted(monthly_data.items())
+        ]
 
     @rx.event
-    def close_transaction_detail_dialog(self):
-        self.show_transaction_detail_dialog = False
-        self.selected_transaction = {}
+    @ledger_event
+    def check_storage(self):
+        """On page load, moves _today on to a new day, reads a database ledger's current
+        revision, and compacts the journals (migrating any legacy blob) if due."""
+        today = datetime.date.today().isoformat()
+        if self._today != today:
+            self._today = today
+        if STORAGE_BACKEND != "local" and self.ledger_id:
+            revision = ledger_database().revision(self.ledger_id)
+            if self._ledger_revision != revision:
+                self._ledger_revision = revision
+        if self._store().needs_compaction():
+            return AppState.compact_journal
+
+    @rx.event(background=True)
+    async def compact_journal(self):
+        """Folds the journals into their base blobs so replay stays cheap."""
+        async with self:
+            self._apply(self._store().compact())
 
     @rx.event
-    def show_insight_details(self, insight: dict):
-        self.current_insight = insight
-        self.show_insights_dialog = True
+    @ledger_event
+    def rebuild_rollup(self):
+        """Checks the stored rollup against the transactions and rebuilds it if they differ."""
+        store = self._writable_store()
+        mismatches = store.verify_rollup()
+        if not mismatches:
+            return rx.toast.success("Monthly totals are up to date.")
+        logging.warning(f"Rebuilding rollup, {len(mismatches)} stale cells")
+        self._apply(store.rebuild_rollup())
+        return rx.toast.info(f"Rebuilt monthly totals ({len(mismatches)} corrected).")
 
     @rx.event
-    def close_insights_dialog(self):
-        self.show_insights_dialog = False
-        self.current_insight = {}
+    @ledger_event
+    def settle_payable(self, transaction_id: str):
+        store = self._writable_store()
+        original_tx = store.get_transaction(transaction_id)
+        if (
+            not original_tx
+            or original_tx.type != "Payables"
+            or original_tx.status != "pending"
+        ):
+            return rx.toast.error("Invalid action.")
+        settlement_tx = Transaction(
+            id=datetime.datetime.now().isoformat(),
+            type="Expense",
+            amount=original_tx.amount,
+            category="Settlement",
+            date=datetime.date.today().isoformat(),
+            description=f"Paid off: {original_tx.description}",
+            status="settled",
+            linked_transaction_id=original_tx.id,
+            party=original_tx.party,
+        )
+        self._apply(
+            store.put_transactions(original_tx.replace(status="settled"), settlement_tx)
+        )
+        yield rx.toast.success("Payable marked as paid!")
+        if self._store().needs_compaction():
+            yield AppState.compact_journal
+
+    @rx.event
+    @ledger_event
+    def settle_receivable(self, transaction_id: str):
+        store = self._writable_store()
+        original_tx = store.get_transaction(transaction_id)
+        if (
+            not original_tx
+            or original_tx.type != "Receivables"
+            or original_tx.status != "pending"
+        ):
+            return rx.toast.error("Invalid action.")
+        settlement_tx = Transaction(
+            id=datetime.datetime.now().isoformat(),
+            type="Income",
+            amount=original_tx.amount,
+            category="Settlement",
+            date=datetime.date.today().isoformat(),
+            description=f"Received payment for: {original_tx.description}",
+            status="received",
+            linked_transaction_id=original_tx.id,
+            party=original_tx.party,
+        )
+        self._apply(
+            store.put_transactions(original_tx.replace(status="settled"), settlement_tx)
+        )
+        yield rx.toast.success("Receivable marked as received!")
+        if self._store().needs_compaction():
+            yield AppState.compact_journal
+
+    @timed_var(
+        deps=[
+            "transactions_json",
+            "legacy_transactions_json",
+            *SHARD_FIELDS,
+            "transactions_manifest",
+            "budgets_json",
+            "loans_json",
+            "transactions_journal",
+            "budgets_journal",
+            "loans_journal",
+            "rollup_json",
+            "ledger_id",
+            "_ledger_revision",
+        ],
+        auto_deps=False,
+    )
+    def _revision(self) -> Hashable:
+        """The ledger's revision (LedgerStore.ledger_key): the one input of every var
+        derived from the ledger. Its own inputs are declared: every field _store builds
+        the store from, so a write or the browser changing any one of them moves it."""
+        return self._store().ledger_key()
+
+    @ledger_var()
+    def _metrics(self) -> LedgerMetrics:
+        """The ledger's aggregates, from one pass per revision shared by every metric var."""
+        return self._store().metrics()
+
+    @ledger_var()
+    def _rollup(self) -> LedgerRollup:
+        """Monthly totals per type and category, maintained by the store on every write."""
+        return self._store().rollup()
+
+    @ledger_var()
+    def total_income(self) -> float:
+        """Calculates the total income."""
+        income_types = {"Income"}
+        totals = self._metrics.amount_by_type()
+        return sum((amount for t, amount in totals.items() if t in income_types))
+
+    @ledger_var()
+    def total_expenses(self) -> float:
+        """Calculates total expenses, including various payment types."""
+        totals = self._metrics.amount_by_type()
+        return sum((amount for t, amount in totals.items() if t in EXPENSE_TYPES))
+
+    @ledger_var()
+    def current_balance(self) -> float:
+        """Calculates the current balance (income - expenses)."""
+        return self.total_income - self.total_expenses
+
+
+class SidebarState(rx.State):
+    """The sidebar, apart from the ledger so that toggling it loads none of it."""
+
+    sidebar_collapsed: bool = False
 
     @rx.event
     def toggle_sidebar(self):
         """Toggles the sidebar's collapsed state."""
         self.sidebar_collapsed = not self.sidebar_collapsed
 
+
+class TransactionFormState(AppState):
+    """The new transaction dialog, on every page."""
+
+    show_transaction_dialog: bool = False
+    current_transaction_type: TransactionType = "Expense"
+    form_error: str = ""
+
     @rx.event
     def toggle_transaction_dialog(self):
         """Toggles the visibility of the transaction form dialog."""
@@ -128,62 +374,32 @@ class AppState(rx.State):
     def set_show_transaction_dialog(self, value: bool):
         self.show_transaction_dialog = value
 
-    @rx.event
-    def toggle_budget_dialog(self):
-        self.show_budget_dialog = not self.show_budget_dialog
-        self.form_error = ""
-
-    @rx.event
-    def set_show_budget_dialog(self, value: bool):
-        self.show_budget_dialog = value
-
     @rx.event
     def set_transaction_type(self, type: TransactionType):
         """Sets the current transaction type in the form."""
         self.current_transaction_type = type
 
     @rx.event
+    @ledger_event
     def add_transaction(self, form_data: dict):
         """Adds a new transaction, validates it, and saves to local storage."""
         self.form_error = ""
         try:
             amount = float(form_data.get("amount", 0))
-            if amount <= 0:
-                self.form_error = "Amount must be greater than zero."
-                return
-            if not form_data.get("date"):
-                self.form_error = "Date is required."
-                return
             tx_type = self.current_transaction_type
             party = form_data.get("party")
             loan_id = form_data.get("loan_id")
             interest_rate = form_data.get("interest_rate")
             category = form_data.get("category")
-            if tx_type in ["Payables", "Receivables", "Loan Taken", "Loan Given"] and (
-                not party
-            ):
-                self.form_error = "Party name is required for this transaction type."
-                return
-            if tx_type in ["Loan Taken", "Loan Given"] and (not interest_rate):
-                self.form_error = "Interest rate is required for new loans."
-                return
-            if tx_type in ["Loan Payment", "Interest Payment"] and (not loan_id):
-                self.form_error = "A loan must be selected for this payment."
-                return
-            if tx_type not in [
-                "Loan Taken",
-                "Loan Given",
-                "Loan Payment",
-                "Interest Payment",
-            ] and (not category):
-                self.form_error = "Category is required."
+            error = transaction_error(tx_type, amount, form_data)
+            if error:
+                self.form_error = error
                 return
         except (ValueError, TypeError) as e:
             logging.exception(f"Error parsing form data: {e}")
             self.form_error = "Invalid data provided. Check amount and interest rate."
             return
-        transactions = self.transactions
-        loans = self.loans
+        store = self._writable_store()
         transaction_id = datetime.datetime.now().isoformat()
         transaction_data = {
             "id": transaction_id,
@@ -195,9 +411,9 @@ class AppState(rx.State):
             "loan_id": loan_id,
             "category": category,
         }
-        if tx_type in ["Payables", "Receivables"]:
+        if tx_type in PENDING_TYPES:
             transaction_data["status"] = "pending"
-        if tx_type in ["Loan Taken", "Loan Given"]:
+        if tx_type in NEW_LOAN_TYPES:
             new_loan = Loan(
                 id=transaction_id,
                 type="Taken" if tx_type == "Loan Taken" else "Given",
@@ -206,13 +422,12 @@ class AppState(rx.State):
                 party=party,
                 start_date=form_data["date"],
             )
-            loans.append(new_loan)
-            self._save_loans(loans)
+            self._apply(self._writable_store().put_loans(new_loan))
             transaction_data["loan_id"] = new_loan.id
             transaction_data["category"] = f"Loan with {party}"
             transaction_data["status"] = "active"
-        elif tx_type in ["Loan Payment", "Interest Payment"]:
-            loan = next((l for l in loans if l.id == loan_id), None)
+        elif tx_type in LOAN_PAYMENT_TYPES:
+            loan = store.get_loan(loan_id)
             if loan:
                 transaction_data["category"] = (
                     f"{tx_type.split(' ')[0]} for loan from/to {loan.party}"
@@ -223,29 +438,371 @@ class AppState(rx.State):
                 )
                 transaction_data["status"] = "active"
                 if tx_type == "Loan Payment":
-                    loan.payments_made += amount
+                    loan = loan.model_copy(
+                        update={"payments_made": loan.payments_made + amount}
+                    )
                     if loan.outstanding_balance <= 0:
-                        loan.status = "Paid Off"
+                        loan = loan.model_copy(update={"status": "Paid Off"})
                         transaction_data["status"] = "settled"
-                self._save_loans(loans)
+                    self._apply(self._writable_store().put_loans(loan))
         new_transaction = Transaction(**transaction_data)
-        transactions.insert(0, new_transaction)
-        self._save_transactions(transactions)
-        yield AppState.toggle_transaction_dialog
+        self._apply(self._writable_store().put_transactions(new_transaction))
+        yield TransactionFormState.toggle_transaction_dialog
         yield rx.toast.success("Transaction added successfully!")
+        if self._store().needs_compaction():
+            yield AppState.compact_journal
+
+    @timed_var(deps=["current_transaction_type"], auto_deps=False)
+    def categories_for_type(self) -> list[str]:
+        """Returns a list of categories based on the currently selected transaction type."""
+        return list(CATEGORIES_FOR_TYPE.get(self.current_transaction_type, ()))
+
+
+class TransactionDetailState(AppState):
+    """The dialog showing one transaction, and its loan."""
+
+    show_transaction_detail_dialog: bool = False
+    selected_transaction: dict = {}
 
     @rx.event
-    def delete_transaction(self, transaction_id: str):
-        """Deletes a transaction from the list and saves."""
-        transactions = [t for t in self.transactions if t.id != transaction_id]
-        self._save_transactions(transactions)
-        yield rx.toast.error("Transaction deleted.")
+    @ledger_event
+    def view_transaction_details(self, transaction_id: str):
+        store = self._store()
+        tx = store.get_transaction(transaction_id)
+        if tx:
+            tx_dict = tx.to_dict()
+            if tx.loan_id:
+                loan = store.get_loan(tx.loan_id)
+                if loan:
+                    loan_dump = loan.model_dump()
+                    loan_dump["outstanding_balance"] = loan.outstanding_balance
+                    tx_dict["loan_details"] = loan_dump
+            self.selected_transaction = tx_dict
+            self.show_transaction_detail_dialog = True
+
+    @rx.event
+    def close_transaction_detail_dialog(self):
+        self.show_transaction_detail_dialog = False
+        self.selected_transaction = {}
+
+
+class ImportState(AppState):
+    """The statement import dialog and the import running in the background."""
+
+    show_import_dialog: bool = False
+    importing: bool = False
+    import_progress: int = 0
+    import_count: int = 0
+    import_skipped: int = 0
+    import_messages: list[str] = []
+    import_error: str = ""
+    _import_path: str = ""
+
+    @rx.event
+    def toggle_import_dialog(self):
+        self.show_import_dialog = not self.show_import_dialog
+
+    @rx.event
+    def set_show_import_dialog(self, value: bool):
+        self.show_import_dialog = value
+
+    @rx.event
+    async def upload_import(self, files: list[rx.UploadFile]):
+        """Saves an uploaded CSV, OFX or QIF statement and imports it in the background."""
+        if self.importing or not files:
+            return
+        self.import_progress = 0
+        self.import_count = 0
+        self.import_skipped = 0
+        self.import_messages = []
+        self.import_error = ""
+        try:
+            kind = import_format(files[0].name or "")
+        except ValueError as e:
+            self.import_error = str(e)
+            return
+        path = rx.get_upload_dir() / f"import-{uuid.uuid4().hex}.{kind}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as saved:
+            shutil.copyfileobj(files[0].file, saved)
+        self._import_path = str(path)
+        self.importing = True
+        self._writable_store()
+        return ImportState.import_transactions
+
+    @rx.event(background=True)
+    async def import_transactions(self):
+        """Streams the uploaded statement in, writing each batch of valid rows at once.
+
+        Each batch is read, parsed and validated in a worker thread, so the event loop
+        keeps serving other sessions meanwhile; the state lock is only held to write a
+        batch and report progress.
+        """
+        async with self:
+            if not self._import_path:
+                return
+            path = Path(self._import_path)
+        try:
+            with path.open("rb") as file:
+                size = max(path.stat().st_size, 1)
+                batches = import_batches(parse_file(file, path.suffix.lstrip(".")))
+                while (
+                    batch := await asyncio.to_thread(next, batches, None)
+                ) is not None:
+                    async with self:
+                        if batch.rows:
+                            store = self._writable_store()
+                            await off_loop(
+                                self,
+                                lambda: self._apply(
+                                    store.put_transactions(*batch.rows)
+                                ),
+                            )
+                        self.import_count += len(batch.rows)
+                        self.import_skipped += len(batch.skipped)
+                        self.import_messages = (
+                            self.import_messages
+                            + [f"Row {n}: {reason}" for n, reason in batch.skipped]
+                        )[:5]
+                        self.import_progress = min(100, file.tell() * 100 // size)
+        except (ValueError, OSError) as e:
+            logging.exception(f"Import of {path.name} failed: {e}")
+            async with self:
+                self.import_error = str(e)
+        finally:
+            path.unlink(missing_ok=True)
+            async with self:
+                self.importing = False
+                self._import_path = ""
+                imported = self.import_count
+        if imported:
+            yield rx.toast.success(f"Imported {imported} transactions.")
+
+
+class TransactionListState(AppState):
+    """The dashboard's filtered, paged transaction list."""
+
+    route: ClassVar[str] = "/"
+
+    search_query: str = ""
+    filter_type: str = ""
+    filter_category: str = ""
+    filter_start_date: str = ""
+    filter_end_date: str = ""
+    sort_by: str = "date_desc"
+    page_size: int = 25
+    page_offset: int = 0
+    _page_cursors: list[TransactionCursor] = []
+
+    @rx.event
+    def export_transactions(self, format: str, scope: str = "filtered"):
+        """Downloads the filtered transactions (or, with scope "all", the whole ledger).
+
+        The rows are not read here: the download link streams them from the backend a
+        chunk at a time.
+        """
+        query = self._transaction_query() if scope == "filtered" else TransactionQuery()
+        try:
+            key = register_export(self._store(), query, format)
+        except ValueError as e:
+            return rx.toast.error(str(e))
+        # An absolute backend URL, which rx.download only takes as a Var; the response
+        # names the file.
+        return rx.download(url=rx.Var.create(export_url(key)))
 
-    def _save_transactions(self, transactions: list[Transaction]):
-        """Helper to serialize and save transactions to local storage."""
-        self.transactions_json = json.dumps([t.model_dump() for t in transactions])
+    @rx.event
+    @ledger_event
+    def clear_filters(self):
+        """Resets all filter and search fields."""
+        self.search_query = ""
+        self.filter_type = ""
+        self.filter_category = ""
+        self.filter_start_date = ""
+        self.filter_end_date = ""
+        self._first_page()
+
+    @rx.event
+    @ledger_event
+    def set_search_query(self, value: str):
+        self.search_query = value
+        self._first_page()
+
+    @rx.event
+    @ledger_event
+    def set_filter_type(self, value: str):
+        self.filter_type = value
+        self._first_page()
+
+    @rx.event
+    @ledger_event
+    def set_filter_category(self, value: str):
+        self.filter_category = value
+        self._first_page()
+
+    def _first_page(self):
+        self._page_cursors = []
+        self.page_offset = 0
+
+    @rx.event
+    @ledger_event
+    def set_page_size(self, value: str):
+        """Changes the rows per page and returns to the first page."""
+        self.page_size = max(int(value), 1)
+        self._first_page()
+
+    @rx.event
+    @ledger_event
+    def next_page(self):
+        """Seeks past the last visible row instead of skipping over page_offset rows."""
+        page = self._transaction_page
+        if self.has_next_page:
+            self._page_cursors = [
+                *self._page_cursors,
+                TransactionCursor.after(page.rows[-1], self.sort_by),
+            ]
+            self.page_offset = page.offset + len(page.rows)
 
     @rx.event
+    @ledger_event
+    def previous_page(self):
+        if self._page_cursors:
+            self._page_cursors = self._page_cursors[:-1]
+            self.page_offset = max(self.page_offset - self.page_size, 0)
+        if not self._page_cursors:
+            self.page_offset = 0
+
+    def _transaction_query(self) -> TransactionQuery:
+        """The transaction list's filters and sort order."""
+        return TransactionQuery(
+            search=self.search_query,
+            type=self.filter_type,
+            category=self.filter_category,
+            start_date=self.filter_start_date,
+            end_date=self.filter_end_date,
+            sort_by=self.sort_by,
+        )
+
+    @ledger_var(
+        "search_query",
+        "filter_type",
+        "filter_category",
+        "filter_start_date",
+        "filter_end_date",
+        "sort_by",
+        "page_size",
+        "page_offset",
+        "_page_cursors",
+        page=True,
+    )
+    def _transaction_page(self) -> TransactionPage:
+        """The visible window of the filtered and sorted transaction list."""
+        if not self._showing():
+            return TransactionPage((), 0, 0)
+        store = self._store()
+        query = self._transaction_query()
+        after = self._page_cursors[-1] if self._page_cursors else None
+        return TransactionPage(
+            store.seek_transactions(query, after, self.page_size),
+            store.count_transactions(query),
+            self.page_offset,
+        )
+
+    @timed_var(deps=["_transaction_page"], auto_deps=False)
+    def visible_transactions(self) -> list[Transaction]:
+        """Only the rows on the current page are sent to the browser."""
+        return [t.to_model() for t in self._transaction_page.rows]
+
+    @timed_var(deps=["_transaction_page"], auto_deps=False)
+    def filtered_count(self) -> int:
+        return self._transaction_page.total
+
+    @timed_var(deps=["_transaction_page"], auto_deps=False)
+    def page_start(self) -> int:
+        """1-based position of the first visible row, 0 when nothing matches."""
+        page = self._transaction_page
+        return page.offset + 1 if page.rows else 0
+
+    @timed_var(deps=["_transaction_page"], auto_deps=False)
+    def page_end(self) -> int:
+        page = self._transaction_page
+        return page.offset + len(page.rows)
+
+    @timed_var(deps=["_page_cursors"], auto_deps=False)
+    def has_previous_page(self) -> bool:
+        return bool(self._page_cursors)
+
+    @timed_var(deps=["_transaction_page"], auto_deps=False)
+    def has_next_page(self) -> bool:
+        page = self._transaction_page
+        return page.offset + len(page.rows) < page.total
+
+    @ledger_var(page=True)
+    def all_categories(self) -> list[str]:
+        """Returns a unique, sorted list of all categories across all transactions."""
+        if not self._showing():
+            return []
+        return self._metrics.categories()
+
+
+class LoanState(AppState):
+    """The loans, for the transaction form and the dashboard's pending totals."""
+
+    @ledger_var()
+    def loans(self) -> list[Loan]:
+        return list(self._store().loans())
+
+    @timed_var(deps=["loans"], auto_deps=False)
+    def active_loans(self) -> list[Loan]:
+        return [loan for loan in self.loans if loan.status == "Active"]
+
+    @ledger_var()
+    def pending_payables(self) -> float:
+        """Calculates money you owe others (Payables + Loans Taken)."""
+        payables_amount = self._metrics.amount_by_type("pending").get("Payables", 0)
+        loan_taken_amount = sum(
+            (
+                l.outstanding_balance
+                for l in self.loans
+                if l.type == "Taken" and l.status == "Active"
+            )
+        )
+        return payables_amount + loan_taken_amount
+
+    @ledger_var()
+    def pending_receivables(self) -> float:
+        """Calculates money others owe you (Receivables + Loans Given)."""
+        receivables_amount = self._metrics.amount_by_type("pending").get(
+            "Receivables", 0
+        )
+        loan_given_amount = sum(
+            (
+                l.outstanding_balance
+                for l in self.loans
+                if l.type == "Given" and l.status == "Active"
+            )
+        )
+        return receivables_amount + loan_given_amount
+
+
+class BudgetState(AppState):
+    """The budgets page."""
+
+    route: ClassVar[str] = "/budgets"
+
+    show_budget_dialog: bool = False
+    form_error: str = ""
+
+    @rx.event
+    def toggle_budget_dialog(self):
+        self.show_budget_dialog = not self.show_budget_dialog
+        self.form_error = ""
+
+    @rx.event
+    def set_show_budget_dialog(self, value: bool):
+        self.show_budget_dialog = value
+
+    @rx.event
+    @ledger_event
     def add_budget(self, form_data: dict):
         self.form_error = ""
         try:
@@ -257,233 +814,125 @@ class AppState(rx.State):
             if limit <= 0:
                 self.form_error = "Limit must be a positive number."
                 return
-            if any((b.category == category for b in self.budgets)):
+            if any((b.category == category for b in self._store().budgets())):
                 self.form_error = f"A budget for '{category}' already exists."
                 return
         except (ValueError, TypeError) as e:
             logging.exception(f"Error parsing budget limit: {e}")
             self.form_error = "Invalid limit amount."
             return
-        budgets = self.budgets
         new_budget = Budget(
             id=datetime.datetime.now().isoformat(), category=category, limit=limit
         )
-        budgets.append(new_budget)
-        self._save_budgets(budgets)
-        yield AppState.toggle_budget_dialog
+        self._apply(self._writable_store().put_budgets(new_budget))
+        yield BudgetState.toggle_budget_dialog
         yield rx.toast.success(f"Budget for '{category}' created!")
+        if self._store().needs_compaction():
+            yield AppState.compact_journal
 
     @rx.event
+    @ledger_event
     def delete_budget(self, budget_id: str):
-        budgets = [b for b in self.budgets if b.id != budget_id]
-        self._save_budgets(budgets)
+        self._apply(self._writable_store().delete_budget(budget_id))
         yield rx.toast.error("Budget deleted.")
+        if self._store().needs_compaction():
+            yield AppState.compact_journal
 
-    def _save_budgets(self, budgets: list[Budget]):
-        self.budgets_json = json.dumps([b.model_dump() for b in budgets])
+    @ledger_var(page=True)
+    def budgets(self) -> list[Budget]:
+        if not self._showing():
+            return []
+        return list(self._store().budgets())
 
-    def _save_loans(self, loans: list[Loan]):
-        self.loans_json = json.dumps([l.model_dump() for l in loans])
+    @ledger_var(page=True, today=True)
+    def budgets_with_progress(self) -> list[Budget]:
+        if not self._showing():
+            return []
+        return self._budget_progress()
 
-    @rx.event
-    def settle_payable(self, transaction_id: str):
-        transactions = self.transactions
-        original_tx = next((t for t in transactions if t.id == transaction_id), None)
-        if (
-            not original_tx
-            or original_tx.type != "Payables"
-            or original_tx.status != "pending"
-        ):
-            return rx.toast.error("Invalid action.")
-        settlement_tx = Transaction(
-            id=datetime.datetime.now().isoformat(),
-            type="Expense",
-            amount=original_tx.amount,
-            category="Settlement",
-            date=datetime.date.today().isoformat(),
-            description=f"Paid off: {original_tx.description}",
-            status="settled",
-            linked_transaction_id=original_tx.id,
-            party=original_tx.party,
-        )
-        original_tx.status = "settled"
-        transactions.insert(0, settlement_tx)
-        self._save_transactions(transactions)
-        yield rx.toast.success("Payable marked as paid!")
 
-    @rx.event
-    def settle_receivable(self, transaction_id: str):
-        transactions = self.transactions
-        original_tx = next((t for t in transactions if t.id == transaction_id), None)
-        if (
-            not original_tx
-            or original_tx.type != "Receivables"
-            or original_tx.status != "pending"
-        ):
-            return rx.toast.error("Invalid action.")
-        settlement_tx = Transaction(
-            id=datetime.datetime.now().isoformat(),
-            type="Income",
-            amount=original_tx.amount,
-            category="Settlement",
-            date=datetime.date.today().isoformat(),
-            description=f"Received payment for: {original_tx.description}",
-            status="received",
-            linked_transaction_id=original_tx.id,
-            party=original_tx.party,
-        )
-        original_tx.status = "settled"
-        transactions.insert(0, settlement_tx)
-        self._save_transactions(transactions)
-        yield rx.toast.success("Receivable marked as received!")
+class AnalyticsState(AppState):
+    """The analytics page's charts."""
 
-    @rx.event
-    def clear_filters(self):
-        """Resets all filter and search fields."""
-        self.search_query = ""
-        self.filter_type = ""
-        self.filter_category = ""
-        self.filter_start_date = ""
-        self.filter_end_date = ""
+    route: ClassVar[str] = "/analytics"
 
-    @rx.var
-    def transactions(self) -> list[Transaction]:
-        """Parses the JSON string from local storage into a list of Transaction models."""
-        try:
-            raw_data = json.loads(self.transactions_json)
-            return [Transaction.model_validate(item) for item in raw_data]
-        except (json.JSONDecodeError, TypeError) as e:
-            logging.exception(f"Failed to parse transactions JSON: {e}")
+    @ledger_var(page=True, today=True)
+    def income_vs_expense_data(self) -> list[dict]:
+        if not self._showing():
             return []
+        return self._income_vs_expense()
 
-    @rx.var
-    def budgets(self) -> list[Budget]:
-        try:
-            raw_data = json.loads(self.budgets_json)
-            return [Budget.model_validate(item) for item in raw_data]
-        except (json.JSONDecodeError, TypeError) as e:
-            logging.exception(f"Failed to parse budgets JSON: {e}")
+    @ledger_var(page=True, today=True)
+    def expense_by_category_data(self) -> list[dict]:
+        if not self._showing():
             return []
+        current_month = self._today[:7]
+        category_totals = self._rollup.amount_by_category("Expense", current_month)
+        return [
+            {"name": cat, "value": round(val)} for cat, val in category_totals.items()
+        ]
 
-    @rx.var
-    def loans(self) -> list[Loan]:
-        try:
-            raw_data = json.loads(self.loans_json)
-            return [Loan.model_validate(item) for item in raw_data]
-        except (json.JSONDecodeError, TypeError) as e:
-            logging.exception(f"Failed to parse loans JSON: {e}")
+    @ledger_var(page=True)
+    def cash_flow_data(self) -> list[dict]:
+        if not self._showing():
             return []
+        balance = 0.0
+        data = []
+        for date, tx_type, amount in self._store().cash_flow_rows():
+            if tx_type == "Income":
+                balance += amount
+            elif tx_type in EXPENSE_TYPES:
+                balance -= amount
+            data.append({"date": date, "balance": round(balance, 2)})
+        return data
 
-    @rx.var
-    def active_loans(self) -> list[Loan]:
-        return [loan for loan in self.loans if loan.status == "Active"]
 
-    @rx.var
-    def budgets_with_progress(self) -> list[Budget]:
-        expense_by_cat = defaultdict(float)
-        current_month = datetime.date.today().strftime("%Y-%m")
-        for t in self.transactions:
-            if t.type == "Expense" and t.date.startswith(current_month):
-                expense_by_cat[t.category] += t.amount
-        updated_budgets = []
-        for budget in self.budgets:
-            spent = expense_by_cat[budget.category]
-            remaining = budget.limit - spent
-            progress = spent / budget.limit * 100 if budget.limit > 0 else 0
-            budget.spent = spent
-            budget.remaining = remaining
-            budget.progress = progress
-            updated_budgets.append(budget)
-        return updated_budgets
+class InsightsState(AppState):
+    """The insights page: suggestions, recommendations and alerts."""
 
-    @rx.var
-    def filtered_transactions(self) -> list[Transaction]:
-        """Applies all filters and sorting to the transaction list."""
-        items = self.transactions
-        if self.search_query:
-            query = self.search_query.lower()
-            items = [
-                t
-                for t in items
-                if query in t.description.lower() or query in t.category.lower()
-            ]
-        if self.filter_type:
-            items = [t for t in items if t.type == self.filter_type]
-        if self.filter_category:
-            items = [t for t in items if t.category == self.filter_category]
-        if self.filter_start_date:
-            items = [t for t in items if t.date >= self.filter_start_date]
-        if self.filter_end_date:
-            items = [t for t in items if t.date <= self.filter_end_date]
-        if self.sort_by == "date_asc":
-            items.sort(key=lambda t: t.date)
-        elif self.sort_by == "date_desc":
-            items.sort(key=lambda t: t.date, reverse=True)
-        elif self.sort_by == "amount_asc":
-            items.sort(key=lambda t: t.amount)
-        elif self.sort_by == "amount_desc":
-            items.sort(key=lambda t: t.amount, reverse=True)
-        return items
-
-    @rx.var
-    def transaction_types(self) -> list[TransactionType]:
-        """Returns a list of all available transaction types."""
-        return [
-            "Income",
-            "Expense",
-            "Loan Payment",
-            "Interest Payment",
-            "EMI",
-            "Insurance",
-            "Bill Payment",
-            "Payables",
-            "Receivables",
-            "Loan Taken",
-            "Loan Given",
-        ]
+    route: ClassVar[str] = "/insights"
 
-    @rx.var
-    def categories_for_type(self) -> list[str]:
-        """Returns a list of categories based on the currently selected transaction type."""
-        return self.categories_for_type_map.get(self.current_transaction_type, [])
+    show_insights_dialog: bool = False
+    current_insight: dict = {}
 
-    @rx.var
-    def all_categories(self) -> list[str]:
-        """Returns a unique, sorted list of all categories across all transactions."""
-        categories = {t.category for t in self.transactions}
-        return sorted(list(categories))
+    @rx.event
+    def show_insight_details(self, insight: dict):
+        self.current_insight = insight
+        self.show_insights_dialog = True
 
-    @rx.var
-    def budget_categories(self) -> list[str]:
-        """Returns a list of all expense categories."""
-        return sorted(self.categories_for_type_map.get("Expense", []))
+    @rx.event
+    def close_insights_dialog(self):
+        self.show_insights_dialog = False
+        self.current_insight = {}
 
-    @rx.var
+    @ledger_var(page=True, today=True)
     def monthly_surplus(self) -> float:
         """Calculates the average monthly surplus."""
+        if not self._showing():
+            return 0.0
         income = 0
         expenses = 0
-        num_months = len(self.income_vs_expense_data)
+        monthly_data = self._income_vs_expense()
+        num_months = len(monthly_data)
         if num_months == 0:
             return 0.0
-        for month_data in self.income_vs_expense_data:
+        for month_data in monthly_data:
             income += month_data["income"]
             expenses += month_data["expense"]
         avg_monthly_income = income / num_months if num_months > 0 else 0
         avg_monthly_expenses = expenses / num_months if num_months > 0 else 0
         return avg_monthly_income - avg_monthly_expenses
 
-    @rx.var
+    @ledger_var(page=True)
     def savings_suggestions(self) -> list[dict]:
         """Generates personalized savings suggestions."""
+        if not self._showing():
+            return []
         suggestions = []
         total_expense = self.total_expenses
         if total_expense == 0:
             return []
-        category_totals = defaultdict(float)
-        for t in self.transactions:
-            if t.type == "Expense":
-                category_totals[t.category] += t.amount
+        category_totals = self._metrics.amount_by_category("Expense")
         for category, spent in category_totals.items():
             if spent > total_expense * 0.2:
                 suggestions.append(
@@ -495,9 +944,11 @@ class AppState(rx.State):
                 )
         return suggestions
 
-    @rx.var
+    @ledger_var(page=True, today=True)
     def investment_recommendations(self) -> list[dict]:
         """Generates investment recommendations based on surplus."""
+        if not self._showing():
+            return []
         surplus = self.monthly_surplus
         if surplus <= 50:
             return [
@@ -529,11 +980,13 @@ class AppState(rx.State):
             },
         ]
 
-    @rx.var
+    @ledger_var(page=True, today=True)
     def smart_alerts(self) -> list[dict]:
         """Generates smart alerts based on spending and budgets."""
+        if not self._showing():
+            return []
         alerts = []
-        for budget in self.budgets_with_progress:
+        for budget in self._budget_progress():
             if 80 < budget.progress <= 100:
                 alerts.append(
                     {
@@ -550,167 +1003,21 @@ class AppState(rx.State):
                         "message": f"You have overspent by ${abs(budget.remaining):.2f} in {budget.category}.",
                     }
                 )
+        expense_count = self._metrics.count_by_type().get("Expense", 0)
         avg_expense_amount = (
-            self.total_expenses
-            / len([t for t in self.transactions if "Expense" in t.type])
-            if len([t for t in self.transactions if "Expense" in t.type]) > 0
-            else 0
+            self.total_expenses / expense_count if expense_count > 0 else 0
         )
-        if avg_expense_amount > 0:
-            for t in self.transactions:
-                if t.type == "Expense" and t.amount > avg_expense_amount * 3:
-                    alerts.append(
-                        {
-                            "type": "info",
-                            "title": "Unusual Transaction Detected",
-                            "message": f"A transaction of ${t.amount:.2f} for '{t.category}' is significantly higher than your average.",
-                        }
-                    )
-                    break
+        if (
+            avg_expense_amount > 0
+            and self._metrics.max_amount("Expense") > avg_expense_amount * 3
+        ):
+            t = self._store().first_transaction_over("Expense", avg_expense_amount * 3)
+            if t:
+                alerts.append(
+                    {
+                        "type": "info",
+                        "title": "Unusual Transaction Detected",
+                        "message": f"A transaction of ${t.amount:.2f} for '{t.category}' is significantly higher than your average.",
+                    }
+                )
         return alerts
-
-    @rx.var
-    def income_vs_expense_data(self) -> list[dict]:
-        monthly_data = defaultdict(lambda: {"income": 0, "expense": 0})
-        today = datetime.date.today()
-        for i in range(6):
-            month = (today - datetime.timedelta(days=i * 30)).strftime("%b %Y")
-            monthly_data[month]
-        for t in self.transactions:
-            try:
-                t_date = datetime.datetime.strptime(t.date, "%Y-%m-%d").date()
-                month_key = t_date.strftime("%b %Y")
-                if month_key in monthly_data:
-                    if t.type == "Income":
-                        monthly_data[month_key]["income"] += t.amount
-                    elif t.type == "Expense":
-                        monthly_data[month_key]["expense"] += t.amount
-            except ValueError as e:
-                logging.exception(f"Error parsing transaction date for chart: {e}")
-                continue
-        return sorted(
-            [{"month": k, **v} for k, v in monthly_data.items()],
-            key=lambda x: datetime.datetime.strptime(x["month"], "%b %Y"),
-        )
-
-    @rx.var
-    def expense_by_category_data(self) -> list[dict]:
-        category_totals = defaultdict(float)
-        current_month = datetime.date.today().strftime("%Y-%m")
-        for t in self.transactions:
-            if t.type == "Expense" and t.date.startswith(current_month):
-                category_totals[t.category] += t.amount
-        return [
-            {"name": cat, "value": round(val)} for cat, val in category_totals.items()
-        ]
-
-    @rx.var
-    def cash_flow_data(self) -> list[dict]:
-        sorted_transactions = sorted(self.transactions, key=lambda t: t.date)
-        balance = self.initial_balance
-        data = []
-        for t in sorted_transactions:
-            if t.type == "Income":
-                balance += t.amount
-            elif t.type in {
-                "Expense",
-                "Loan Payment",
-                "Interest Payment",
-                "EMI",
-                "Insurance",
-                "Bill Payment",
-            }:
-                balance -= t.amount
-            data.append({"date": t.date, "balance": round(balance, 2)})
-        return data
-
-    @rx.var
-    def initial_balance(self) -> float:
-        """Calculate balance from transactions before the chart's date range."""
-        return 0.0
-
-    @rx.var
-    def categories_for_type_map(self) -> dict:
-        return {
-            "Income": ["Salary", "Freelance", "Investment", "Gift", "Other"],
-            "Expense": [
-                "Food",
-                "Groceries",
-                "Transport",
-                "Shopping",
-                "Entertainment",
-                "Utilities",
-                "Other",
-            ],
-            "Loan Payment": ["Personal Loan", "Home Loan", "Car Loan", "Student Loan"],
-            "Interest Payment": ["Credit Card", "Loan Interest"],
-            "EMI": ["Electronics", "Vehicle", "Home Appliance"],
-            "Insurance": ["Health", "Life", "Vehicle", "Home"],
-            "Bill Payment": ["Electricity", "Water", "Internet", "Phone", "Gas"],
-            "Payables": ["Friend", "Vendor", "Credit"],
-            "Receivables": ["Friend", "Client", "Refund"],
-            "Loan Taken": ["Personal", "Business"],
-            "Loan Given": ["Personal", "Business"],
-        }
-
-    @rx.var
-    def total_income(self) -> float:
-        """Calculates the total income."""
-        income_types = {"Income"}
-        return sum((t.amount for t in self.transactions if t.type in income_types))
-
-    @rx.var
-    def total_expenses(self) -> float:
-        """Calculates total expenses, including various payment types."""
-        expense_types = {
-            "Expense",
-            "Loan Payment",
-            "Interest Payment",
-            "EMI",
-            "Insurance",
-            "Bill Payment",
-        }
-        return sum((t.amount for t in self.transactions if t.type in expense_types))
-
-    @rx.var
-    def current_balance(self) -> float:
-        """Calculates the current balance (income - expenses)."""
-        return self.total_income - self.total_expenses
-
-    @rx.var
-    def pending_payables(self) -> float:
-        """Calculates money you owe others (Payables + Loans Taken)."""
-        payables_amount = sum(
-            (
-                t.amount
-                for t in self.transactions
-                if t.type == "Payables" and t.status == "pending"
-            )
-        )
-        loan_taken_amount = sum(
-            (
-                l.outstanding_balance
-                for l in self.loans
-                if l.type == "Taken" and l.status == "Active"
-            )
-        )
-        return payables_amount + loan_taken_amount
-
-    @rx.var
-    def pending_receivables(self) -> float:
-        """Calculates money others owe you (Receivables + Loans Given)."""
-        receivables_amount = sum(
-            (
-                t.amount
-                for t in self.transactions
-                if t.type == "Receivables" and t.status == "pending"
-            )
-        )
-        loan_given_amount = sum(
-            (
-                l.outstanding_balance
-                for l in self.loans
-                if l.type == "Given" and l.status == "Active"
-            )
-        )
-        return receivables_amount + loan_given_amount
\ No newline at end of file
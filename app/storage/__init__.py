@@ -0,0 +1,24 @@
+import os
+from app.storage.base import LedgerStore, StoreUpdate
+from app.storage.local import SHARD_FIELDS, LocalLedgerStore
+from app.storage.sql import SqlLedgerDatabase, SqlLedgerStore
+from app.storage.sqlite import SqliteLedgerDatabase, sqlite_database
+
+STORAGE_BACKEND = os.environ.get("FINTRACK_STORAGE", "local")
+"""Where ledgers live: "local" (browser LocalStorage), "sqlite" (server-side file) or
+"postgres" (a Postgres/Supabase database at FINTRACK_DATABASE_URL)."""
+
+SQLITE_PATH = os.environ.get("FINTRACK_SQLITE_PATH", "fintrack.db")
+
+DATABASE_URL = os.environ.get("FINTRACK_DATABASE_URL", "")
+
+DATABASE_POOL_SIZE = int(os.environ.get("FINTRACK_DATABASE_POOL_SIZE", "10"))
+
+
+def ledger_database() -> SqlLedgerDatabase:
+    """The shared server-side database for the configured STORAGE_BACKEND."""
+    if STORAGE_BACKEND == "postgres":
+        from app.storage.postgres import postgres_database
+
+        return postgres_database(DATABASE_URL, DATABASE_POOL_SIZE)
+    return sqlite_database(SQLITE_PATH)
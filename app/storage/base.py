@@ -0,0 +1,198 @@
+import dataclasses
+from abc import ABC, abstractmethod
+from typing import Any, Collection, Hashable, Iterator, Optional
+
+from app.ledger.columns import INVALID_DAY, ledger_columns, prefix_days
+from app.ledger.index import date_index, loan_index, transaction_index
+from app.ledger.metrics import LedgerMetrics, ledger_metrics
+from app.ledger.query import (
+    SORT_MODES,
+    TransactionCursor,
+    TransactionQuery,
+    amount_by_category,
+    amount_by_type,
+    count_transactions,
+    filtered_transactions,
+    seek_transactions,
+)
+from app.ledger.records import TransactionLike, TransactionRecord
+from app.ledger.rollup import LedgerRollup, RollupKey, ledger_rollup
+from app.ledger.snapshot import LedgerSnapshot
+from app.models import Budget, Loan
+
+StoreUpdate = dict[str, Any]
+"""State fields a write changed; the caller assigns them back onto AppState."""
+
+
+class LedgerStore(ABC):
+    """Where a session's transactions, loans and budgets live.
+
+    Reads return immutable rows. Writes return the AppState fields they changed, which is
+    empty for server-side stores.
+    """
+
+    @abstractmethod
+    def snapshot(self) -> LedgerSnapshot: ...
+
+    @abstractmethod
+    def ledger_key(self) -> Hashable:
+        """Identifies the ledger at its current revision: anything derived from the ledger
+        alone is the same for equal keys, whichever session reads it. Equal keys must
+        mean the same ledger, not just equal hashes, since results are shared by it."""
+
+    @abstractmethod
+    def put_transactions(self, *transactions: TransactionLike) -> StoreUpdate:
+        """Inserts transactions, or replaces the rows with the same ids."""
+
+    @abstractmethod
+    def delete_transaction(self, transaction_id: str) -> StoreUpdate: ...
+
+    @abstractmethod
+    def put_loans(self, *loans: Loan) -> StoreUpdate: ...
+
+    @abstractmethod
+    def put_budgets(self, *budgets: Budget) -> StoreUpdate: ...
+
+    @abstractmethod
+    def delete_budget(self, budget_id: str) -> StoreUpdate: ...
+
+    def compact(self) -> StoreUpdate:
+        return {}
+
+    def needs_compaction(self) -> bool:
+        return False
+
+    def transactions(self) -> tuple[TransactionRecord, ...]:
+        return self.snapshot().transactions
+
+    def loans(self) -> tuple[Loan, ...]:
+        return self.snapshot().loans
+
+    def budgets(self) -> tuple[Budget, ...]:
+        return self.snapshot().budgets
+
+    def get_transaction(self, transaction_id: str) -> Optional[TransactionRecord]:
+        return transaction_index(self.transactions()).by_id.get(transaction_id)
+
+    def get_loan(self, loan_id: str) -> Optional[Loan]:
+        return loan_index(self.loans()).get(loan_id)
+
+    def transactions_for_loan(self, loan_id: str) -> tuple[TransactionRecord, ...]:
+        """The transactions recorded against a loan, newest first."""
+        return transaction_index(self.transactions()).by_loan.get(loan_id, ())
+
+    def settlements_of(self, transaction_id: str) -> tuple[TransactionRecord, ...]:
+        """The transactions whose linked_transaction_id is transaction_id."""
+        return transaction_index(self.transactions()).settlements.get(
+            transaction_id, ()
+        )
+
+    def settlement_chain(self, transaction_id: str) -> list[TransactionRecord]:
+        """The original transaction of a settlement chain followed by every row settling it.
+
+        Walks linked_transaction_id back to the root, then the settlements forward, with
+        point lookups only.
+        """
+        root = self.get_transaction(transaction_id)
+        seen = {transaction_id}
+        while root and root.linked_transaction_id not in (None, *seen):
+            seen.add(root.linked_transaction_id)
+            parent = self.get_transaction(root.linked_transaction_id)
+            if parent is None:
+                break
+            root = parent
+        if root is None:
+            return []
+        chain = [root]
+        visited = {root.id}
+        for t in chain:
+            for settlement in self.settlements_of(t.id):
+                if settlement.id not in visited:
+                    visited.add(settlement.id)
+                    chain.append(settlement)
+        return chain
+
+    def query_transactions(self, query: TransactionQuery) -> list[TransactionRecord]:
+        return list(filtered_transactions(self.transactions(), query))
+
+    def seek_transactions(
+        self,
+        query: TransactionQuery,
+        after: Optional[TransactionCursor],
+        limit: int,
+    ) -> tuple[TransactionRecord, ...]:
+        """The next limit filtered rows after a cursor (from the start when None)."""
+        return seek_transactions(self.transactions(), query, after, limit)
+
+    def count_transactions(self, query: TransactionQuery) -> int:
+        return count_transactions(self.transactions(), query)
+
+    def iter_transactions(
+        self, query: TransactionQuery, chunk_size: int
+    ) -> Iterator[tuple[TransactionRecord, ...]]:
+        """All filtered rows, chunk_size at a time, each chunk sought after the last row
+        of the one before; a database store reads no more than a chunk per query."""
+        if query.sort_by not in SORT_MODES:
+            query = dataclasses.replace(query, sort_by="date_desc")
+        after = None
+        while rows := self.seek_transactions(query, after, chunk_size):
+            yield rows
+            if len(rows) < chunk_size:
+                return
+            after = TransactionCursor.after(rows[-1], query.sort_by)
+
+    def amount_by_type(self, status: Optional[str] = None) -> dict[str, float]:
+        """Total amount per transaction type, optionally only for one status."""
+        return amount_by_type(self.transactions(), status)
+
+    def amount_by_category(
+        self, tx_type: str, date_prefix: str = ""
+    ) -> dict[str, float]:
+        """Total amount per category for one type, optionally only for dates with a prefix."""
+        return amount_by_category(self.transactions(), tx_type, date_prefix)
+
+    def metrics(self) -> LedgerMetrics:
+        """Every dashboard aggregate, computed in one pass per ledger revision."""
+        return ledger_metrics(self.transactions())
+
+    def rollup(self) -> LedgerRollup:
+        """Totals per month, type and category, kept up to date by every write."""
+        return ledger_rollup(self.transactions())
+
+    def rebuild_rollup(self) -> StoreUpdate:
+        """Recomputes the stored rollup from the transactions."""
+        return {}
+
+    def verify_rollup(self) -> list[RollupKey]:
+        """The rollup keys whose stored totals disagree with the transactions."""
+        return self.rollup().mismatches(LedgerRollup.build(self.transactions()))
+
+    def count_by_type(self) -> dict[str, int]:
+        return ledger_columns(self.transactions()).count_by_type()
+
+    def amount_by_month(
+        self, types: Collection[str], start_date: str = ""
+    ) -> dict[tuple[str, str], float]:
+        """Total amount per ("YYYY-MM", type) for dates on or after start_date."""
+        days = prefix_days(start_date) if start_date else None
+        return ledger_columns(self.transactions()).amount_by_month(
+            types, days[0] if days else INVALID_DAY
+        )
+
+    def first_transaction_over(
+        self, tx_type: str, amount: float
+    ) -> Optional[TransactionRecord]:
+        """The newest transaction of a type with an amount above the threshold."""
+        return next(
+            (t for t in self.transactions() if t.type == tx_type and t.amount > amount),
+            None,
+        )
+
+    def cash_flow_rows(self) -> list[tuple[str, str, float]]:
+        """(date, type, amount) for every transaction in date order (ties by id)."""
+        return [
+            (t.date, t.type, t.amount) for t in date_index(self.transactions()).rows
+        ]
+
+    def categories(self) -> list[str]:
+        return sorted({t.category for t in self.transactions()})
@@ -0,0 +1,281 @@
+from dataclasses import dataclass
+from typing import Hashable, Iterable, Optional
+
+from app.ledger.codec import storage_codec
+from app.ledger.index import carry_sorted_indexes, transaction_index
+from app.ledger.journal import (
+    EMPTY_JOURNAL,
+    JournalRecord,
+    append_records,
+    delete_record,
+    needs_compaction,
+    put_record,
+)
+from app.ledger.query import (
+    SORT_MODES,
+    TransactionCursor,
+    TransactionQuery,
+    count_transactions,
+    filtered_transactions,
+    query_days,
+    seek_transactions,
+)
+from app.ledger.records import TransactionLike, TransactionRecord, as_record
+from app.ledger.rollup import LedgerRollup, decode_rollup, ledger_rollup
+from app.ledger.search import carry_search_index
+from app.ledger.shards import (
+    SHARD_COUNT,
+    decode_manifest,
+    shard_ledger,
+    shards_between,
+    write_shards,
+)
+from app.ledger.snapshot import LedgerSnapshot, ledger_cache
+from app.models import Budget, Loan
+from app.storage.base import LedgerStore, StoreUpdate
+
+SHARD_FIELDS = tuple(f"transactions_m{m:02d}" for m in range(1, SHARD_COUNT + 1))
+"""The AppState fields holding the month shards, January first."""
+
+
+@dataclass(frozen=True)
+class LocalLedgerStore(LedgerStore):
+    """The browser LocalStorage blobs and their journals, as held on AppState.
+
+    Transactions live in twelve month shards (app/ledger/shards.py) plus a manifest, and
+    a write only appends to the transactions journal; compaction folds the journal into
+    the shards of the months it touched. Totals and indexes cover the whole ledger, so
+    most reads merge every shard (each decoded once per revision of its blob) and replay
+    the journal; a query for a date range reads only the shards of its months. A ledger
+    saved before the shards, as a JSON (legacy_transactions_json) or packed
+    (transactions_json) blob, is read from there, with the journal, until compaction
+    migrates it.
+    """
+
+    transactions_json: str = "[]"
+    loans_json: str = "[]"
+    budgets_json: str = "[]"
+    transactions_journal: str = EMPTY_JOURNAL
+    loans_journal: str = EMPTY_JOURNAL
+    budgets_journal: str = EMPTY_JOURNAL
+    rollup_json: str = ""
+    legacy_transactions_json: str = ""
+    transaction_shards: tuple[str, ...] = ("",) * SHARD_COUNT
+    transactions_manifest: str = ""
+
+    @property
+    def _unsharded(self) -> bool:
+        """Whether the transactions still live in a blob from before the shards."""
+        legacy = bool(self.legacy_transactions_json)
+        return legacy or self.transactions_json not in ("", "[]")
+
+    @property
+    def _transactions_base(self) -> str:
+        return self.legacy_transactions_json or self.transactions_json
+
+    def snapshot(self) -> LedgerSnapshot:
+        return ledger_cache.snapshot(
+            self._transactions_base,
+            self.loans_json,
+            self.budgets_json,
+            self.transactions_journal,
+            self.loans_journal,
+            self.budgets_journal,
+            () if self._unsharded else self.transaction_shards,
+        )
+
+    def ledger_key(self) -> Hashable:
+        """The blobs themselves, undecoded. Their str hashes are memoized, so the key is
+        cheap to hash, and a lookup that matches the hash then compares the blobs (by
+        identity first), so two ledgers never share a key on a hash collision."""
+        return (
+            self.transactions_json,
+            self.loans_json,
+            self.budgets_json,
+            self.transactions_journal,
+            self.loans_journal,
+            self.budgets_journal,
+            self.rollup_json,
+            self.legacy_transactions_json,
+            *self.transaction_shards,
+            self.transactions_manifest,
+        )
+
+    def transactions(self) -> tuple[TransactionRecord, ...]:
+        return self._journaled(self.transactions_journal)
+
+    def _journaled(self, raw_journal: str) -> tuple[TransactionRecord, ...]:
+        """The ledger with raw_journal as its transactions journal."""
+        if self._unsharded:
+            return ledger_cache.transactions(self._transactions_base, raw_journal)
+        return ledger_cache.sharded_transactions(self.transaction_shards, raw_journal)
+
+    def _transactions_for(
+        self, query: TransactionQuery
+    ) -> tuple[TransactionRecord, ...]:
+        """The rows a query selects from: for a date range in fewer than twelve months,
+        only the shards of those months, merged with the journal replayed on top. Rows
+        the journal moved out of the range are still there, and the query's own date
+        filter drops them."""
+        if self._unsharded or query.sort_by not in SORT_MODES:
+            return self.transactions()
+        try:
+            days = query_days(query)
+        except ValueError:
+            return self.transactions()
+        if days is None or len(shards := shards_between(*days)) == SHARD_COUNT:
+            return self.transactions()
+        return ledger_cache.sharded_transactions(
+            tuple(self.transaction_shards[i] for i in shards),
+            self.transactions_journal,
+        )
+
+    def query_transactions(self, query: TransactionQuery) -> list[TransactionRecord]:
+        return list(filtered_transactions(self._transactions_for(query), query))
+
+    def seek_transactions(
+        self,
+        query: TransactionQuery,
+        after: Optional[TransactionCursor],
+        limit: int,
+    ) -> tuple[TransactionRecord, ...]:
+        return seek_transactions(self._transactions_for(query), query, after, limit)
+
+    def count_transactions(self, query: TransactionQuery) -> int:
+        return count_transactions(self._transactions_for(query), query)
+
+    def loans(self) -> tuple[Loan, ...]:
+        return ledger_cache.loans(self.loans_json, self.loans_journal)
+
+    def budgets(self) -> tuple[Budget, ...]:
+        return ledger_cache.budgets(self.budgets_json, self.budgets_journal)
+
+    def rollup(self) -> LedgerRollup:
+        """The stored rollup; rebuilt from the transactions if none was stored yet."""
+        return decode_rollup(self.rollup_json) or ledger_rollup(self.transactions())
+
+    def rebuild_rollup(self) -> StoreUpdate:
+        return {"rollup_json": LedgerRollup.build(self.transactions()).to_json()}
+
+    def _append_transactions(
+        self,
+        *records: JournalRecord,
+        put: Iterable[TransactionRecord] = (),
+        removed: Iterable[TransactionRecord] = (),
+    ) -> StoreUpdate:
+        """Appends records to the transactions journal, carrying the search and sort
+        indexes of the current rows over to the rows after them."""
+        journal = append_records(self.transactions_journal, *records)
+        current = lambda: self._journaled(journal)
+        for carry in (carry_search_index, carry_sorted_indexes):
+            carry(self.transactions(), current, put, removed)
+        return {"transactions_journal": journal}
+
+    def put_transactions(self, *transactions: TransactionLike) -> StoreUpdate:
+        transactions = tuple(map(as_record, transactions))
+        by_id = transaction_index(self.transactions()).by_id
+        replaced = [old for t in transactions if (old := by_id.get(t.id))]
+        return {
+            **self._append_transactions(
+                *map(put_record, transactions), put=transactions, removed=replaced
+            ),
+            "rollup_json": self.rollup().applied(transactions, replaced).to_json(),
+        }
+
+    def delete_transaction(self, transaction_id: str) -> StoreUpdate:
+        removed = self.get_transaction(transaction_id)
+        if removed is None:
+            return {}
+        return {
+            **self._append_transactions(
+                delete_record(transaction_id), removed=[removed]
+            ),
+            "rollup_json": self.rollup().applied(removed=[removed]).to_json(),
+        }
+
+    def put_loans(self, *loans: Loan) -> StoreUpdate:
+        return {
+            "loans_journal": append_records(
+                self.loans_journal, *(put_record(l) for l in loans)
+            )
+        }
+
+    def put_budgets(self, *budgets: Budget) -> StoreUpdate:
+        return {
+            "budgets_journal": append_records(
+                self.budgets_journal, *(put_record(b) for b in budgets)
+            )
+        }
+
+    def delete_budget(self, budget_id: str) -> StoreUpdate:
+        return {
+            "budgets_journal": append_records(
+                self.budgets_journal, delete_record(budget_id)
+            )
+        }
+
+    def needs_compaction(self) -> bool:
+        """True once a journal outgrew its limit, or while unsharded transactions await
+        migration."""
+        return self._unsharded or any(
+            needs_compaction(journal)
+            for journal in (
+                self.transactions_journal,
+                self.loans_journal,
+                self.budgets_journal,
+            )
+        )
+
+    def _compact_transactions(self) -> StoreUpdate:
+        """Folds the transactions journal into the month shards, rewriting only the
+        shards of the rows it put or deleted, and the manifest. An unsharded ledger is
+        migrated instead: every shard is written and the blobs it was read from are
+        cleared.
+
+        The shards merge into the rows already decoded, in the same order (inserted
+        rows take new sequence numbers in the order the journal first put them), so
+        those rows and their indexes are cached as the new shards' ledger.
+        """
+        current = self.transactions()
+        update: StoreUpdate = {"transactions_journal": EMPTY_JOURNAL}
+        if self._unsharded:
+            shards, manifest = shard_ledger(current)
+            changed = dict(enumerate(shards))
+            update["transactions_json"] = ""
+            if self.legacy_transactions_json:
+                update["legacy_transactions_json"] = ""
+        else:
+            base = ledger_cache.sharded_transactions(self.transaction_shards)
+            before = transaction_index(base).by_id
+            after = transaction_index(current).by_id
+            put = [t for t in reversed(current) if before.get(t.id) is not t]
+            delete = [t.id for t in base if t.id not in after]
+            changed, manifest = write_shards(
+                list(map(ledger_cache.transaction_shard, self.transaction_shards)),
+                decode_manifest(self.transactions_manifest),
+                before.get,
+                put,
+                delete,
+            )
+        blobs = list(self.transaction_shards)
+        for index, shard in changed.items():
+            blobs[index] = update[SHARD_FIELDS[index]] = shard.pack()
+            ledger_cache.put_shard(blobs[index], shard)
+        update["transactions_manifest"] = manifest.to_json()
+        ledger_cache.put_merged(tuple(blobs), current)
+        return update
+
+    def compact(self) -> StoreUpdate:
+        """Folds each non-empty journal into its base blob or shards, and migrates
+        unsharded transactions to the month shards."""
+        codec = storage_codec()
+        update: StoreUpdate = {}
+        if self._unsharded or self.transactions_journal != EMPTY_JOURNAL:
+            update.update(self._compact_transactions())
+        if self.loans_journal != EMPTY_JOURNAL:
+            update["loans_json"] = codec.dumps(self.loans())
+            update["loans_journal"] = EMPTY_JOURNAL
+        if self.budgets_journal != EMPTY_JOURNAL:
+            update["budgets_json"] = codec.dumps(self.budgets())
+            update["budgets_journal"] = EMPTY_JOURNAL
+        return update
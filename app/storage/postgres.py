@@ -0,0 +1,142 @@
+import functools
+from contextlib import contextmanager
+from typing import Any, Iterator, Sequence
+
+import psycopg
+from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool
+
+from app.storage.sql import SqlLedgerDatabase, SqlWriter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledgers (
+    ledger_id TEXT PRIMARY KEY,
+    revision BIGINT NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    seq BIGSERIAL PRIMARY KEY,
+    ledger_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    amount DOUBLE PRECISION NOT NULL,
+    category TEXT NOT NULL,
+    date TEXT NOT NULL,
+    description TEXT NOT NULL,
+    status TEXT NOT NULL,
+    linked_transaction_id TEXT,
+    loan_id TEXT,
+    party TEXT,
+    UNIQUE (ledger_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_seq ON transactions (ledger_id, seq);
+DROP INDEX IF EXISTS idx_transactions_date;
+CREATE INDEX IF NOT EXISTS idx_transactions_date_id
+    ON transactions (ledger_id, date, id);
+CREATE INDEX IF NOT EXISTS idx_transactions_amount_id
+    ON transactions (ledger_id, amount, id);
+CREATE INDEX IF NOT EXISTS idx_transactions_type
+    ON transactions (ledger_id, type, status);
+CREATE INDEX IF NOT EXISTS idx_transactions_category
+    ON transactions (ledger_id, category);
+CREATE INDEX IF NOT EXISTS idx_transactions_party ON transactions (ledger_id, party);
+CREATE INDEX IF NOT EXISTS idx_transactions_loan_id
+    ON transactions (ledger_id, loan_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_linked
+    ON transactions (ledger_id, linked_transaction_id);
+CREATE TABLE IF NOT EXISTS loans (
+    seq BIGSERIAL PRIMARY KEY,
+    ledger_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    principal DOUBLE PRECISION NOT NULL,
+    interest_rate DOUBLE PRECISION NOT NULL,
+    party TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payments_made DOUBLE PRECISION NOT NULL,
+    UNIQUE (ledger_id, id)
+);
+CREATE TABLE IF NOT EXISTS budgets (
+    seq BIGSERIAL PRIMARY KEY,
+    ledger_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    limit_amount DOUBLE PRECISION NOT NULL,
+    UNIQUE (ledger_id, id)
+);
+CREATE TABLE IF NOT EXISTS rollups (
+    ledger_id TEXT NOT NULL,
+    month TEXT NOT NULL,
+    type TEXT NOT NULL,
+    category TEXT NOT NULL,
+    amount DOUBLE PRECISION NOT NULL,
+    count BIGINT NOT NULL,
+    PRIMARY KEY (ledger_id, month, type, category)
+);
+"""
+
+
+def _to_pyformat(sql: str) -> str:
+    """Translates "?" placeholders to psycopg's "%s"."""
+    return sql.replace("%", "%%").replace("?", "%s")
+
+
+class _PostgresWriter(SqlWriter):
+    def __init__(self, cursor: psycopg.Cursor):
+        self.cursor = cursor
+
+    def execute(self, sql: str, params: Sequence[Any] = ()):
+        self.cursor.execute(_to_pyformat(sql), params, prepare=True)
+
+    def executemany(self, sql: str, params: Sequence[Sequence[Any]]):
+        self.cursor.executemany(_to_pyformat(sql), params)
+
+
+class PostgresLedgerDatabase(SqlLedgerDatabase):
+    """A Postgres-compatible database (e.g. Supabase) behind a pool shared by every session.
+
+    Statements run server-side prepared, and executemany pipelines a whole batch of
+    inserts in one round trip. The state calls it from worker threads (app.memo.off_loop),
+    so up to max_size sessions query at once while the event loop serves the rest.
+    """
+
+    contains_sql = "strpos({haystack}, {needle}) > 0"
+
+    def __init__(
+        self,
+        conninfo: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        cache_size: int = 32,
+    ):
+        super().__init__(cache_size)
+        self.pool = ConnectionPool(
+            conninfo,
+            min_size=min_size,
+            max_size=max_size,
+            kwargs={"autocommit": True, "row_factory": dict_row},
+            open=True,
+        )
+        with self.pool.connection() as connection:
+            connection.execute(SCHEMA)
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> list[dict[str, Any]]:
+        with self.pool.connection() as connection:
+            return connection.execute(
+                _to_pyformat(sql), params, prepare=True
+            ).fetchall()
+
+    @contextmanager
+    def transaction(self) -> Iterator[SqlWriter]:
+        with self.pool.connection() as connection, connection.transaction():
+            with connection.cursor() as cursor:
+                yield _PostgresWriter(cursor)
+
+    def close(self):
+        self.pool.close()
+
+
+@functools.lru_cache(maxsize=None)
+def postgres_database(conninfo: str, pool_size: int = 10) -> PostgresLedgerDatabase:
+    """The shared pool for a connection string, opened on first use."""
+    return PostgresLedgerDatabase(conninfo, max_size=pool_size)
@@ -0,0 +1,43 @@
+"""Verifies or rebuilds the server-side ledger rollups.
+
+    python -m app.storage.rollups verify [LEDGER_ID ...]
+    python -m app.storage.rollups rebuild [LEDGER_ID ...]
+
+Without ledger ids every ledger in the configured database is processed. Browser-held
+(FINTRACK_STORAGE=local) rollups are checked from the app with AppState.rebuild_rollup.
+"""
+
+import argparse
+import sys
+
+from app.storage import STORAGE_BACKEND, SqlLedgerStore, ledger_database
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Verify or rebuild ledger rollups.")
+    parser.add_argument("command", choices=("verify", "rebuild"))
+    parser.add_argument("ledger_ids", nargs="*")
+    args = parser.parse_args(argv)
+    if STORAGE_BACKEND == "local":
+        print("Rollups of the local backend live in the browser; nothing to do here.")
+        return 0
+    database = ledger_database()
+    ledger_ids = args.ledger_ids or [
+        row["ledger_id"] for row in database.query("SELECT ledger_id FROM ledgers")
+    ]
+    stale = 0
+    for ledger_id in ledger_ids:
+        store = SqlLedgerStore(database, ledger_id)
+        mismatches = store.verify_rollup()
+        if mismatches:
+            stale += 1
+            print(f"{ledger_id}: {len(mismatches)} stale cells")
+            if args.command == "rebuild":
+                store.rebuild_rollup()
+                print(f"{ledger_id}: rebuilt")
+    print(f"{len(ledger_ids)} ledgers checked, {stale} stale")
+    return 1 if stale and args.command == "verify" else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
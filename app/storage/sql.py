@@ -0,0 +1,478 @@
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Collection, Hashable, Iterator, Optional, Sequence
+
+from app.ledger.metrics import LedgerMetrics
+from app.ledger.query import TransactionCursor, TransactionQuery
+from app.ledger.records import TransactionLike, TransactionRecord
+from app.ledger.rollup import LedgerRollup, RollupCell, rollup_key
+from app.ledger.snapshot import LedgerSnapshot
+from app.models import Budget, Loan
+from app.storage.base import LedgerStore, StoreUpdate
+
+TRANSACTION_COLUMNS = (
+    "id",
+    "type",
+    "amount",
+    "category",
+    "date",
+    "description",
+    "status",
+    "linked_transaction_id",
+    "loan_id",
+    "party",
+)
+LOAN_COLUMNS = (
+    "id",
+    "type",
+    "principal",
+    "interest_rate",
+    "party",
+    "start_date",
+    "status",
+    "payments_made",
+)
+BUDGET_COLUMNS = ("id", "category", "limit_amount")
+
+SORT_ORDER = {
+    "date_asc": "date ASC, id ASC",
+    "date_desc": "date DESC, id DESC",
+    "amount_asc": "amount ASC, id ASC",
+    "amount_desc": "amount DESC, id DESC",
+}
+SEEK_AFTER = {
+    "date_asc": " AND date >= ? AND (date > ? OR (date = ? AND id > ?))",
+    "date_desc": " AND date <= ? AND (date < ? OR (date = ? AND id < ?))",
+    "amount_asc": " AND amount >= ? AND (amount > ? OR (amount = ? AND id > ?))",
+    "amount_desc": " AND amount <= ? AND (amount < ? OR (amount = ? AND id < ?))",
+}
+"""Keyset conditions selecting the rows after a (sort value, id) cursor in each order.
+
+The leading range repeats the sort value on its own so the (sort value, id) index is
+entered at the cursor; under the OR alone it is scanned from the start of the ledger.
+"""
+
+
+ROLLUP_ADD_SQL = (
+    "INSERT INTO rollups (ledger_id, month, type, category, amount, count) "
+    "VALUES (?, ?, ?, ?, ?, 1) "
+    "ON CONFLICT (ledger_id, month, type, category) DO UPDATE SET "
+    "amount = rollups.amount + excluded.amount, count = rollups.count + 1"
+)
+ROLLUP_RETRACT_SQL = (
+    "INSERT INTO rollups (ledger_id, month, type, category, amount, count) "
+    "SELECT ledger_id, substr(date, 1, 7), type, category, -amount, -1 "
+    "FROM transactions WHERE ledger_id = ? AND id = ? "
+    "ON CONFLICT (ledger_id, month, type, category) DO UPDATE SET "
+    "amount = rollups.amount + excluded.amount, count = rollups.count - 1"
+)
+"""Subtracts a stored transaction from its rollup cell, before it is replaced or deleted."""
+
+
+def upsert_sql(table: str, columns: tuple[str, ...]) -> str:
+    names = ", ".join(("ledger_id", *columns))
+    placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "id")
+    return (
+        f"INSERT INTO {table} ({names}) VALUES ({placeholders}) "
+        f"ON CONFLICT (ledger_id, id) DO UPDATE SET {updates}"
+    )
+
+
+def prefix_range(prefix: str) -> tuple[str, str]:
+    """The [low, high) string range matching every value that starts with prefix."""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class SqlWriter(ABC):
+    """Statement execution inside one write transaction."""
+
+    @abstractmethod
+    def execute(self, sql: str, params: Sequence[Any] = ()): ...
+
+    @abstractmethod
+    def executemany(self, sql: str, params: Sequence[Sequence[Any]]):
+        """Runs one statement for every parameter row as a single batch."""
+
+
+class SqlLedgerDatabase(ABC):
+    """A SQL database holding the ledgers of every session, one ledger_id per browser.
+
+    Statements are written with "?" placeholders; each database translates them.
+    """
+
+    contains_sql = "instr({haystack}, {needle}) > 0"
+
+    def __init__(self, cache_size: int = 32):
+        self._cache_lock = threading.Lock()
+        self._cache: OrderedDict[tuple[str, str, int], Any] = OrderedDict()
+        self.cache_size = cache_size
+
+    @abstractmethod
+    def query(self, sql: str, params: Sequence[Any] = ()) -> list[dict[str, Any]]: ...
+
+    @abstractmethod
+    def transaction(self) -> Iterator[SqlWriter]:
+        """A context manager running its body in one database transaction."""
+
+    @contextmanager
+    def write(self, ledger_id: str) -> Iterator[SqlWriter]:
+        """Runs a write transaction and bumps the ledger revision on success."""
+        with self.transaction() as writer:
+            yield writer
+            writer.execute(
+                "INSERT INTO ledgers (ledger_id, revision) VALUES (?, 1) "
+                "ON CONFLICT (ledger_id) DO UPDATE SET revision = ledgers.revision + 1",
+                (ledger_id,),
+            )
+
+    def revision(self, ledger_id: str) -> int:
+        rows = self.query(
+            "SELECT revision FROM ledgers WHERE ledger_id = ?", (ledger_id,)
+        )
+        return rows[0]["revision"] if rows else 0
+
+    def cached(self, kind: str, ledger_id: str, revision: int) -> Any:
+        """A value cached for one ledger revision (e.g. its snapshot), or None."""
+        with self._cache_lock:
+            value = self._cache.get((kind, ledger_id, revision))
+            if value is not None:
+                self._cache.move_to_end((kind, ledger_id, revision))
+            return value
+
+    def cache(self, kind: str, ledger_id: str, revision: int, value: Any):
+        with self._cache_lock:
+            self._cache[(kind, ledger_id, revision)] = value
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+@dataclass(frozen=True)
+class SqlLedgerStore(LedgerStore):
+    """One ledger inside a SqlLedgerDatabase; filters and aggregates run as indexed queries.
+
+    revision is the ledger revision the session last wrote or read, 0 if unknown. Writes
+    report the new revision back as the _ledger_revision state field.
+    """
+
+    database: SqlLedgerDatabase
+    ledger_id: str
+    revision: int = 0
+
+    def snapshot(self) -> LedgerSnapshot:
+        revision = self.revision or self.database.revision(self.ledger_id)
+        snapshot = self.database.cached("snapshot", self.ledger_id, revision)
+        if snapshot is None:
+            snapshot = self._load_snapshot()
+            self.database.cache(
+                "snapshot", self.ledger_id, snapshot.revision[0], snapshot
+            )
+        return snapshot
+
+    def ledger_key(self) -> Hashable:
+        return (self.ledger_id, self.revision or self.database.revision(self.ledger_id))
+
+    def metrics(self) -> LedgerMetrics:
+        revision = self.revision or self.database.revision(self.ledger_id)
+        metrics = self.database.cached("metrics", self.ledger_id, revision)
+        if metrics is None:
+            metrics = LedgerMetrics.from_rows(
+                (
+                    row["type"],
+                    row["status"],
+                    row["month"],
+                    row["category"],
+                    row["total"],
+                    row["n"],
+                    row["largest"],
+                )
+                for row in self.database.query(
+                    "SELECT type, status, substr(date, 1, 7) AS month, category, "
+                    "SUM(amount) AS total, COUNT(*) AS n, MAX(amount) AS largest "
+                    "FROM transactions WHERE ledger_id = ? "
+                    "GROUP BY type, status, substr(date, 1, 7), category "
+                    "ORDER BY MAX(seq) DESC",
+                    (self.ledger_id,),
+                )
+            )
+            self.database.cache("metrics", self.ledger_id, revision, metrics)
+        return metrics
+
+    def _load_snapshot(self) -> LedgerSnapshot:
+        revision = self.database.revision(self.ledger_id)
+        return LedgerSnapshot(
+            (revision,),
+            self._select_transactions("", (), "seq DESC"),
+            tuple(
+                Loan.model_construct(**row)
+                for row in self.database.query(
+                    f"SELECT {', '.join(LOAN_COLUMNS)} FROM loans "
+                    "WHERE ledger_id = ? ORDER BY seq",
+                    (self.ledger_id,),
+                )
+            ),
+            tuple(
+                Budget.model_construct(
+                    id=row["id"], category=row["category"], limit=row["limit_amount"]
+                )
+                for row in self.database.query(
+                    f"SELECT {', '.join(BUDGET_COLUMNS)} FROM budgets "
+                    "WHERE ledger_id = ? ORDER BY seq",
+                    (self.ledger_id,),
+                )
+            ),
+        )
+
+    def _select_transactions(
+        self, where: str, params: tuple[Any, ...], order_by: str, limit: str = ""
+    ) -> tuple[TransactionRecord, ...]:
+        rows = self.database.query(
+            f"SELECT {', '.join(TRANSACTION_COLUMNS)} FROM transactions "
+            f"WHERE ledger_id = ?{where} ORDER BY {order_by}{limit}",
+            (self.ledger_id, *params),
+        )
+        return tuple(TransactionRecord.from_dict(row) for row in rows)
+
+    def get_transaction(self, transaction_id: str) -> Optional[TransactionRecord]:
+        rows = self._select_transactions(" AND id = ?", (transaction_id,), "seq")
+        return rows[0] if rows else None
+
+    def get_loan(self, loan_id: str) -> Optional[Loan]:
+        rows = self.database.query(
+            f"SELECT {', '.join(LOAN_COLUMNS)} FROM loans "
+            "WHERE ledger_id = ? AND id = ?",
+            (self.ledger_id, loan_id),
+        )
+        return Loan.model_construct(**rows[0]) if rows else None
+
+    def transactions_for_loan(self, loan_id: str) -> tuple[TransactionRecord, ...]:
+        return self._select_transactions(" AND loan_id = ?", (loan_id,), "seq DESC")
+
+    def settlements_of(self, transaction_id: str) -> tuple[TransactionRecord, ...]:
+        return self._select_transactions(
+            " AND linked_transaction_id = ?", (transaction_id,), "seq DESC"
+        )
+
+    def _filter_sql(self, query: TransactionQuery) -> tuple[str, tuple[Any, ...]]:
+        where = ""
+        params: list[Any] = []
+        if query.search:
+            contains = self.database.contains_sql
+            fields = ("description", "category", "coalesce(party, '')")
+            where += " AND ({})".format(
+                " OR ".join(
+                    contains.format(haystack=f"lower({field})", needle="?")
+                    for field in fields
+                )
+            )
+            params += [query.search.lower()] * len(fields)
+        if query.type:
+            where += " AND type = ?"
+            params.append(query.type)
+        if query.category:
+            where += " AND category = ?"
+            params.append(query.category)
+        if query.start_date:
+            where += " AND date >= ?"
+            params.append(query.start_date)
+        if query.end_date:
+            where += " AND date <= ?"
+            params.append(query.end_date)
+        return where, tuple(params)
+
+    def query_transactions(self, query: TransactionQuery) -> list[TransactionRecord]:
+        where, params = self._filter_sql(query)
+        order_by = SORT_ORDER.get(query.sort_by, "seq DESC")
+        return list(self._select_transactions(where, params, order_by))
+
+    def seek_transactions(
+        self,
+        query: TransactionQuery,
+        after: Optional[TransactionCursor],
+        limit: int,
+    ) -> tuple[TransactionRecord, ...]:
+        where, params = self._filter_sql(query)
+        if after is not None and query.sort_by in SEEK_AFTER:
+            where += SEEK_AFTER[query.sort_by]
+            params += (after.value, after.value, after.value, after.id)
+        return self._select_transactions(
+            where,
+            (*params, limit),
+            SORT_ORDER.get(query.sort_by, "seq DESC"),
+            " LIMIT ?",
+        )
+
+    def count_transactions(self, query: TransactionQuery) -> int:
+        where, params = self._filter_sql(query)
+        return self.database.query(
+            f"SELECT COUNT(*) AS n FROM transactions WHERE ledger_id = ?{where}",
+            (self.ledger_id, *params),
+        )[0]["n"]
+
+    def amount_by_type(self, status: Optional[str] = None) -> dict[str, float]:
+        where, params = ("", ()) if status is None else (" AND status = ?", (status,))
+        rows = self.database.query(
+            "SELECT type, SUM(amount) AS total FROM transactions "
+            f"WHERE ledger_id = ?{where} GROUP BY type",
+            (self.ledger_id, *params),
+        )
+        return {row["type"]: row["total"] for row in rows}
+
+    def count_by_type(self) -> dict[str, int]:
+        rows = self.database.query(
+            "SELECT type, COUNT(*) AS n FROM transactions "
+            "WHERE ledger_id = ? GROUP BY type",
+            (self.ledger_id,),
+        )
+        return {row["type"]: row["n"] for row in rows}
+
+    def amount_by_category(
+        self, tx_type: str, date_prefix: str = ""
+    ) -> dict[str, float]:
+        where = ""
+        params: tuple[Any, ...] = (self.ledger_id, tx_type)
+        if date_prefix:
+            where = " AND date >= ? AND date < ?"
+            params += prefix_range(date_prefix)
+        rows = self.database.query(
+            "SELECT category, SUM(amount) AS total FROM transactions "
+            f"WHERE ledger_id = ? AND type = ?{where} GROUP BY category",
+            params,
+        )
+        return {row["category"]: row["total"] for row in rows}
+
+    def amount_by_month(
+        self, types: Collection[str], start_date: str = ""
+    ) -> dict[tuple[str, str], float]:
+        placeholders = ", ".join("?" for _ in types)
+        rows = self.database.query(
+            "SELECT substr(date, 1, 7) AS month, type, SUM(amount) AS total "
+            "FROM transactions "
+            f"WHERE ledger_id = ? AND type IN ({placeholders}) AND date >= ? "
+            "GROUP BY substr(date, 1, 7), type",
+            (self.ledger_id, *types, start_date),
+        )
+        return {(row["month"], row["type"]): row["total"] for row in rows}
+
+    def first_transaction_over(
+        self, tx_type: str, amount: float
+    ) -> Optional[TransactionRecord]:
+        rows = self._select_transactions(
+            " AND type = ? AND amount > ?", (tx_type, amount), "seq DESC", " LIMIT 1"
+        )
+        return rows[0] if rows else None
+
+    def cash_flow_rows(self) -> list[tuple[str, str, float]]:
+        rows = self.database.query(
+            "SELECT date, type, amount FROM transactions "
+            "WHERE ledger_id = ? ORDER BY date ASC, id ASC",
+            (self.ledger_id,),
+        )
+        return [(row["date"], row["type"], row["amount"]) for row in rows]
+
+    def categories(self) -> list[str]:
+        rows = self.database.query(
+            "SELECT DISTINCT category FROM transactions "
+            "WHERE ledger_id = ? ORDER BY category",
+            (self.ledger_id,),
+        )
+        return [row["category"] for row in rows]
+
+    def _written(self) -> StoreUpdate:
+        return {"_ledger_revision": self.database.revision(self.ledger_id)}
+
+    def rollup(self) -> LedgerRollup:
+        revision = self.revision or self.database.revision(self.ledger_id)
+        rollup = self.database.cached("rollup", self.ledger_id, revision)
+        if rollup is None:
+            rollup = LedgerRollup(
+                {
+                    (row["month"], row["type"], row["category"]): RollupCell(
+                        row["amount"], row["count"]
+                    )
+                    for row in self.database.query(
+                        "SELECT month, type, category, amount, count FROM rollups "
+                        "WHERE ledger_id = ?",
+                        (self.ledger_id,),
+                    )
+                }
+            )
+            self.database.cache("rollup", self.ledger_id, revision, rollup)
+        return rollup
+
+    def rebuild_rollup(self) -> StoreUpdate:
+        with self.database.write(self.ledger_id) as writer:
+            writer.execute("DELETE FROM rollups WHERE ledger_id = ?", (self.ledger_id,))
+            writer.execute(
+                "INSERT INTO rollups (ledger_id, month, type, category, amount, count) "
+                "SELECT ledger_id, substr(date, 1, 7), type, category, SUM(amount), "
+                "COUNT(*) FROM transactions WHERE ledger_id = ? "
+                "GROUP BY ledger_id, substr(date, 1, 7), type, category",
+                (self.ledger_id,),
+            )
+        return self._written()
+
+    def _retract(self, writer: SqlWriter, ids: Sequence[str]):
+        writer.executemany(ROLLUP_RETRACT_SQL, [(self.ledger_id, i) for i in ids])
+
+    def _prune_rollup(self, writer: SqlWriter):
+        writer.execute(
+            "DELETE FROM rollups WHERE ledger_id = ? AND count = 0", (self.ledger_id,)
+        )
+
+    def put_transactions(self, *transactions: TransactionLike) -> StoreUpdate:
+        with self.database.write(self.ledger_id) as writer:
+            self._retract(writer, [t.id for t in transactions])
+            writer.executemany(
+                upsert_sql("transactions", TRANSACTION_COLUMNS),
+                [
+                    (self.ledger_id, *(getattr(t, c) for c in TRANSACTION_COLUMNS))
+                    for t in transactions
+                ],
+            )
+            writer.executemany(
+                ROLLUP_ADD_SQL,
+                [(self.ledger_id, *rollup_key(t), t.amount) for t in transactions],
+            )
+            self._prune_rollup(writer)
+        return self._written()
+
+    def delete_transaction(self, transaction_id: str) -> StoreUpdate:
+        with self.database.write(self.ledger_id) as writer:
+            self._retract(writer, [transaction_id])
+            writer.execute(
+                "DELETE FROM transactions WHERE ledger_id = ? AND id = ?",
+                (self.ledger_id, transaction_id),
+            )
+            self._prune_rollup(writer)
+        return self._written()
+
+    def put_loans(self, *loans: Loan) -> StoreUpdate:
+        with self.database.write(self.ledger_id) as writer:
+            writer.executemany(
+                upsert_sql("loans", LOAN_COLUMNS),
+                [
+                    (self.ledger_id, *(getattr(l, c) for c in LOAN_COLUMNS))
+                    for l in loans
+                ],
+            )
+        return self._written()
+
+    def put_budgets(self, *budgets: Budget) -> StoreUpdate:
+        with self.database.write(self.ledger_id) as writer:
+            writer.executemany(
+                upsert_sql("budgets", BUDGET_COLUMNS),
+                [(self.ledger_id, b.id, b.category, b.limit) for b in budgets],
+            )
+        return self._written()
+
+    def delete_budget(self, budget_id: str) -> StoreUpdate:
+        with self.database.write(self.ledger_id) as writer:
+            writer.execute(
+                "DELETE FROM budgets WHERE ledger_id = ? AND id = ?",
+                (self.ledger_id, budget_id),
+            )
+        return self._written()
@@ -0,0 +1,125 @@
+import functools
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, Sequence
+
+from app.storage.sql import SqlLedgerDatabase, SqlWriter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledgers (
+    ledger_id TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    ledger_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    amount REAL NOT NULL,
+    category TEXT NOT NULL,
+    date TEXT NOT NULL,
+    description TEXT NOT NULL,
+    status TEXT NOT NULL,
+    linked_transaction_id TEXT,
+    loan_id TEXT,
+    party TEXT,
+    UNIQUE (ledger_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_seq ON transactions (ledger_id, seq);
+DROP INDEX IF EXISTS idx_transactions_date;
+CREATE INDEX IF NOT EXISTS idx_transactions_date_id
+    ON transactions (ledger_id, date, id);
+CREATE INDEX IF NOT EXISTS idx_transactions_amount_id
+    ON transactions (ledger_id, amount, id);
+CREATE INDEX IF NOT EXISTS idx_transactions_type
+    ON transactions (ledger_id, type, status);
+CREATE INDEX IF NOT EXISTS idx_transactions_category
+    ON transactions (ledger_id, category);
+CREATE INDEX IF NOT EXISTS idx_transactions_party ON transactions (ledger_id, party);
+CREATE INDEX IF NOT EXISTS idx_transactions_loan_id
+    ON transactions (ledger_id, loan_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_linked
+    ON transactions (ledger_id, linked_transaction_id);
+CREATE TABLE IF NOT EXISTS loans (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    ledger_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    principal REAL NOT NULL,
+    interest_rate REAL NOT NULL,
+    party TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payments_made REAL NOT NULL,
+    UNIQUE (ledger_id, id)
+);
+CREATE TABLE IF NOT EXISTS budgets (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    ledger_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    limit_amount REAL NOT NULL,
+    UNIQUE (ledger_id, id)
+);
+CREATE TABLE IF NOT EXISTS rollups (
+    ledger_id TEXT NOT NULL,
+    month TEXT NOT NULL,
+    type TEXT NOT NULL,
+    category TEXT NOT NULL,
+    amount REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (ledger_id, month, type, category)
+);
+"""
+
+
+class _SqliteWriter(SqlWriter):
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def execute(self, sql: str, params: Sequence[Any] = ()):
+        self.connection.execute(sql, params)
+
+    def executemany(self, sql: str, params: Sequence[Sequence[Any]]):
+        self.connection.executemany(sql, params)
+
+
+class SqliteLedgerDatabase(SqlLedgerDatabase):
+    """A local SQLite file; also the stand-in for Postgres when testing the SQL store.
+
+    One connection is shared by every session; sqlite3 keeps its compiled statements
+    cached, so repeated queries are not re-parsed.
+    """
+
+    def __init__(self, path: str, cache_size: int = 32):
+        super().__init__(cache_size)
+        self.path = path
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, cached_statements=256
+        )
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> list[dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._connection.execute(sql, params)]
+
+    @contextmanager
+    def transaction(self) -> Iterator[SqlWriter]:
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield _SqliteWriter(self._connection)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+
+@functools.lru_cache(maxsize=None)
+def sqlite_database(path: str) -> SqliteLedgerDatabase:
+    """The shared database handle for a file, opened on first use."""
+    return SqliteLedgerDatabase(path)
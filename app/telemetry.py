@@ -0,0 +1,185 @@
+import json
+import logging
+import os
+import time
+from collections.abc import Sized
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from reflex.vars.base import ComputedVar
+
+from app.ledger import decode_counter
+
+METRICS_ENABLED = os.environ.get("FINTRACK_METRICS", "") == "1"
+"""Whether computed vars and events are timed; FINTRACK_METRICS=1 turns it on. Off, a
+timed_var costs one flag check per recompute and the middleware is not installed."""
+
+metrics_log = logging.getLogger("fintrack.metrics")
+"""One JSON object per event handled: its time, delta bytes and the vars it recomputed."""
+
+
+@dataclass
+class Timing:
+    """Running totals for one var or event handler."""
+
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    size: int = 0
+
+    def add(self, seconds: float, size: int):
+        self.count += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.size += size
+
+
+var_timings: dict[str, Timing] = {}
+"""Per State.var: recomputes, their time, and the items of the results. A var's time
+leaves out the vars it reads, which count for themselves, so times add up."""
+
+event_timings: dict[str, Timing] = {}
+"""Per event name: events handled, their time to the last update, and delta bytes."""
+
+
+@dataclass
+class EventMetrics:
+    """What one event cost so far, collected while it is handled."""
+
+    started: float
+    delta_bytes: int = 0
+    vars: dict[str, float] = field(default_factory=dict)
+
+
+current_event: ContextVar[Optional[EventMetrics]] = ContextVar(
+    "current_event", default=None
+)
+
+
+def result_size(value: Any) -> int:
+    """Items in a var's value: elements of a list or dict, characters of a str, 1 for a
+    number or anything else."""
+    return len(value) if isinstance(value, Sized) else 1
+
+
+def record_var(name: str, seconds: float, value: Any):
+    var_timings.setdefault(name, Timing()).add(seconds, result_size(value))
+    if (event := current_event.get()) is not None:
+        event.vars[name] = event.vars.get(name, 0.0) + seconds
+
+
+_nested_seconds: list[float] = []
+"""For each var being recomputed, innermost last, the time spent in the vars it read.
+A recompute never awaits, so one stack serves the whole event loop."""
+
+
+class TimedComputedVar(ComputedVar):
+    """A computed var whose recomputes are recorded when METRICS_ENABLED.
+
+    Only fget (what ComputedVar.__get__ calls to recompute) is wrapped; dependency
+    tracking reads _fget, so the var depends on exactly what it did as a plain rx.var.
+    """
+
+    __slots__ = ()
+
+    @property
+    def fget(self) -> Callable:
+        if not METRICS_ENABLED:
+            return self._fget
+        fget, var = self._fget, self._name
+
+        def timed(instance):
+            _nested_seconds.append(0.0)
+            start = time.perf_counter()
+            try:
+                value = fget(instance)
+            finally:
+                seconds = time.perf_counter() - start
+                nested = _nested_seconds.pop()
+                if _nested_seconds:
+                    _nested_seconds[-1] += seconds
+            record_var(f"{type(instance).__name__}.{var}", seconds - nested, value)
+            return value
+
+        return timed
+
+
+def timed_var(fget: Optional[Callable] = None, **kwargs) -> Any:
+    """rx.var, timed by TimedComputedVar; takes the same keyword arguments."""
+    if fget is None:
+        return lambda fget: TimedComputedVar(fget, **kwargs)
+    return TimedComputedVar(fget, **kwargs)
+
+
+def record_event(name: str, event: EventMetrics):
+    seconds = time.perf_counter() - event.started
+    event_timings.setdefault(name, Timing()).add(seconds, event.delta_bytes)
+    metrics_log.info(
+        json.dumps(
+            {
+                "event": name,
+                "ms": round(seconds * 1000, 3),
+                "delta_bytes": event.delta_bytes,
+                "vars_ms": {
+                    var: round(s * 1000, 3)
+                    for var, s in sorted(event.vars.items(), key=lambda i: -i[1])
+                },
+            }
+        )
+    )
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _summary(
+    lines: list[str],
+    metric: str,
+    help: str,
+    label: str,
+    timings: dict[str, Timing],
+    size_metric: str,
+    size_help: str,
+):
+    lines += [f"# HELP {metric} {help}", f"# TYPE {metric} summary"]
+    for name, t in sorted(timings.items()):
+        lines.append(f'{metric}_sum{{{label}="{_label(name)}"}} {t.seconds:.6f}')
+        lines.append(f'{metric}_count{{{label}="{_label(name)}"}} {t.count}')
+    lines += [f"# HELP {metric}_max Slowest single one.", f"# TYPE {metric}_max gauge"]
+    for name, t in sorted(timings.items()):
+        lines.append(f'{metric}_max{{{label}="{_label(name)}"}} {t.max_seconds:.6f}')
+    lines += [f"# HELP {size_metric} {size_help}", f"# TYPE {size_metric} counter"]
+    for name, t in sorted(timings.items()):
+        lines.append(f'{size_metric}{{{label}="{_label(name)}"}} {t.size}')
+
+
+def prometheus_text() -> str:
+    """The timings (and ledger decodes) in the Prometheus text exposition format."""
+    lines: list[str] = []
+    _summary(
+        lines,
+        "fintrack_event_seconds",
+        "Time from an event's arrival to its last state update.",
+        "event",
+        event_timings,
+        "fintrack_event_delta_bytes_total",
+        "Bytes of state delta sent for the event.",
+    )
+    _summary(
+        lines,
+        "fintrack_var_seconds",
+        "Time recomputing a computed var.",
+        "var",
+        var_timings,
+        "fintrack_var_result_items_total",
+        "Items in the recomputed values (elements, characters, or 1).",
+    )
+    lines += [
+        "# HELP fintrack_ledger_decodes_total Ledger blobs decoded.",
+        "# TYPE fintrack_ledger_decodes_total counter",
+    ]
+    for blob, count in sorted(decode_counter.items()):
+        lines.append(f'fintrack_ledger_decodes_total{{blob="{_label(blob)}"}} {count}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1 @@
+"""Performance benchmarks for the ledger; run each module with ``python -m benchmarks.<name>``."""
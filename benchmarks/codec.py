@@ -0,0 +1,50 @@
+"""Encode and decode throughput of the storage codecs on a transactions blob.
+
+encode writes the rows as compaction does; decode parses the blob and loads the records
+as the ledger cache does, and parse is the loads half of that. The "json dicts" line is the stdlib path with the per-row
+to_dict the blob writers used before the codec took the rows directly.
+
+    python -m benchmarks.codec [--sizes N ...] [--repeat R]
+"""
+
+import argparse
+import json
+
+from app.ledger.codec import orjson, storage_codec
+from app.ledger.records import TransactionRecord
+from benchmarks.synthetic import synthetic_ledger
+from benchmarks.timing import best_of
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    codecs = {"json dicts": None, "json": storage_codec("json")}
+    if orjson is not None:
+        codecs["orjson"] = storage_codec("orjson")
+    print(f"best of {args.repeat}, rows per second (MB/s of JSON)")
+    print(f"  {'rows':>7} {'codec':>10} {'encode':>22} {'parse':>22} {'decode':>22}")
+    for n in args.sizes:
+        rows = synthetic_ledger(n).transactions
+        for name, codec in codecs.items():
+            if codec is None:
+                encode = lambda: json.dumps([t.to_dict() for t in rows])
+                parse = lambda: json.loads(blob)
+            else:
+                encode = lambda: codec.dumps(rows)
+                parse = lambda: codec.loads(blob)
+            decode = lambda: tuple(map(TransactionRecord.from_dict, parse()))
+            blob = encode()
+            assert decode() == rows
+            mb = len(blob.encode()) / 2**20
+            timings = [best_of(args.repeat, run) for run in (encode, parse, decode)]
+            cells = " ".join(f"{n / t:>12,.0f} ({mb / t:5.0f})" for t in timings)
+            print(f"  {n:7d} {name:>10} {cells}")
+
+
+if __name__ == "__main__":
+    main()
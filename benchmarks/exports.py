@@ -0,0 +1,106 @@
+"""Times streaming an export of a large ledger, and the memory and event loop it takes.
+
+For each format, stream is the download route's body read end to end, with the longest
+the event loop went without running another task alongside it; peak is the most memory
+allocated while streaming, against building the whole file in memory at once (whole).
+The ledger is in a SQLite file by default, as a large one would be.
+
+    python -m benchmarks.exports [--rows N] [--store sqlite|local] [--chunk-rows C]
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+from app.api import PendingExport, _stream
+from app.ledger.exports import EXPORT_CHUNK_ROWS, EXPORT_FORMATS, export_formats
+from app.ledger.query import TransactionQuery
+from app.storage.base import LedgerStore
+from app.storage.local import LocalLedgerStore
+from app.storage.sql import SqlLedgerStore
+from app.storage.sqlite import sqlite_database
+from benchmarks.shard_writes import applied
+from benchmarks.synthetic import synthetic_ledger
+
+
+def peak(run: Callable[[], object]) -> int:
+    """The most bytes allocated at once while run runs."""
+    gc.collect()
+    tracemalloc.start()
+    run()
+    size = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size
+
+
+async def streamed(export: PendingExport, chunk_rows: int) -> tuple[int, float]:
+    """The bytes of the export's body, and the longest stall of the loop sending it."""
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0)
+            now = time.perf_counter()
+            stall, last = max(stall, now - last), now
+
+    ticking = asyncio.create_task(ticker())
+    size = 0
+    async for piece in _stream(export, chunk_rows):
+        size += len(piece)
+    done = True
+    await ticking
+    return size, stall
+
+
+def whole(store: LedgerStore, query: TransactionQuery, format: str) -> bytes:
+    rows = tuple(t for chunk in store.iter_transactions(query, 10**9) for t in chunk)
+    return b"".join(EXPORT_FORMATS[format].encode([rows]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--store", choices=("sqlite", "local"), default="sqlite")
+    parser.add_argument("--chunk-rows", type=int, default=EXPORT_CHUNK_ROWS)
+    args = parser.parse_args()
+    rows = synthetic_ledger(args.rows).transactions
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.store == "sqlite":
+            database = sqlite_database(os.path.join(tmp, "ledger.db"))
+            SqlLedgerStore(database, "bench").put_transactions(*rows)
+            store = SqlLedgerStore(database, "bench")
+        else:
+            store = applied(
+                LocalLedgerStore(), LocalLedgerStore().put_transactions(*rows)
+            )
+        del rows
+        query = TransactionQuery()
+        print(f"{args.rows} rows in {args.store}, chunks of {args.chunk_rows}")
+        print(
+            f"  {'format':>7} {'MB':>6} {'stream s':>9} {'rows/s':>9}"
+            f" {'stall ms':>9} {'peak MB':>8} {'whole MB':>9}"
+        )
+        for format in export_formats():
+            export = PendingExport(store, query, format, time.monotonic())
+            start = time.perf_counter()
+            size, stall = asyncio.run(streamed(export, args.chunk_rows))
+            seconds = time.perf_counter() - start
+            streaming = peak(lambda: asyncio.run(streamed(export, args.chunk_rows)))
+            building = peak(lambda: whole(store, query, format))
+            print(
+                f"  {format:>7} {size / 2**20:6.1f} {seconds:9.2f}"
+                f" {args.rows / seconds:9,.0f} {stall * 1000:9.1f}"
+                f" {streaming / 2**20:8.1f} {building / 2**20:9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Times a bulk import of bank statements into the local month shards.
+
+Each statement (CSV, OFX and QIF) holds the same rows. parse is streaming the file into
+validated batches; write is committing each batch with one put_transactions call, as
+ImportState.import_transactions does.
+
+    python -m benchmarks.imports [--rows N] [--batch-size B]
+"""
+
+import argparse
+import io
+import time
+
+from app.ledger.imports import IMPORT_BATCH_SIZE, import_batches, parse_file
+from app.ledger.records import TransactionRecord
+from app.storage.local import LocalLedgerStore
+from benchmarks.shard_writes import applied
+from benchmarks.synthetic import synthetic_ledger
+
+
+def _signed(t: TransactionRecord) -> float:
+    return t.amount if t.type in ("Income", "Receivables") else -t.amount
+
+
+def csv_statement(rows: tuple[TransactionRecord, ...]) -> bytes:
+    lines = ["Date,Description,Category,Amount\n"]
+    lines += [
+        f'{t.date},"{t.description}",{t.category},{_signed(t):.2f}\n' for t in rows
+    ]
+    return "".join(lines).encode()
+
+
+def ofx_statement(rows: tuple[TransactionRecord, ...]) -> bytes:
+    lines = ["OFXHEADER:100\nDATA:OFXSGML\n\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS>\n"]
+    lines += [
+        f"<STMTTRN><TRNTYPE>{'CREDIT' if _signed(t) > 0 else 'DEBIT'}"
+        f"<DTPOSTED>{t.date.replace('-', '')}120000<TRNAMT>{_signed(t):.2f}"
+        f"<FITID>{i}<NAME>{t.description}</STMTTRN>\n"
+        for i, t in enumerate(rows)
+    ]
+    lines.append("</STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n")
+    return "".join(lines).encode()
+
+
+def qif_statement(rows: tuple[TransactionRecord, ...]) -> bytes:
+    lines = ["!Type:Bank\n"]
+    lines += [
+        f"D{t.date[5:7]}/{t.date[8:]}/{t.date[:4]}\nT{_signed(t):.2f}\n"
+        f"P{t.description}\nL{t.category}\n^\n"
+        for t in rows
+    ]
+    return "".join(lines).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+    rows = synthetic_ledger(args.rows).transactions
+    print(f"{args.rows} rows, batches of {args.batch_size}")
+    print(f"  {'format':>6} {'MB':>6} {'parse s':>8} {'write s':>8} {'rows/s':>9}")
+    for kind, write in (
+        ("csv", csv_statement),
+        ("ofx", ofx_statement),
+        ("qif", qif_statement),
+    ):
+        statement = write(rows)
+        store = LocalLedgerStore()
+        parsing = writing = 0.0
+        batches = import_batches(
+            parse_file(io.BytesIO(statement), kind), args.batch_size
+        )
+        while True:
+            start = time.perf_counter()
+            batch = next(batches, None)
+            parsing += time.perf_counter() - start
+            if batch is None:
+                break
+            start = time.perf_counter()
+            store = applied(store, store.put_transactions(*batch.rows))
+            writing += time.perf_counter() - start
+        assert len(store.transactions()) == args.rows
+        total = parsing + writing
+        print(
+            f"  {kind:>6} {len(statement) / 2**20:6.1f} {parsing:8.2f} {writing:8.2f}"
+            f" {args.rows / total:9,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Times decoding a stored transactions blob in each load mode, per 10k rows.
+
+per-row validate is what the ledger cache did before: model_validate on every element.
+The bulk modes run one TypeAdapter pass over the payload, as imports and migrations do;
+construct skips validation with model_construct; trusted records is the path the cache
+takes now for blobs the app wrote itself.
+
+    python -m benchmarks.load [--rows N] [--repeat R]
+"""
+
+import argparse
+import json
+
+from pydantic import TypeAdapter
+
+from app.ledger.records import TransactionRecord
+from app.ledger.snapshot import transaction_loader
+from app.models import Transaction
+from benchmarks.synthetic import synthetic_ledger
+from benchmarks.timing import best_of
+
+adapter = TypeAdapter(list[Transaction])
+
+MODES = {
+    "per-row validate": lambda blob: tuple(
+        Transaction.model_validate(row) for row in json.loads(blob)
+    ),
+    "bulk validate_python": lambda blob: tuple(
+        adapter.validate_python(json.loads(blob))
+    ),
+    "bulk validate_json": lambda blob: tuple(adapter.validate_json(blob)),
+    "validated records": transaction_loader.validated,
+    "construct": lambda blob: tuple(
+        Transaction.model_construct(**row) for row in json.loads(blob)
+    ),
+    "trusted records": lambda blob: tuple(
+        map(TransactionRecord.from_dict, json.loads(blob))
+    ),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    blob = json.dumps([t.to_dict() for t in synthetic_ledger(args.rows).transactions])
+    print(f"{args.rows} transactions, best of {args.repeat}")
+
+    for name, load in {"json.loads alone": json.loads, **MODES}.items():
+        assert len(load(blob)) == args.rows
+        best = best_of(args.repeat, lambda: load(blob))
+        print(f"  {name:>22} {best * 1e4 / args.rows * 1000:8.2f} ms/10k")
+
+
+if __name__ == "__main__":
+    main()
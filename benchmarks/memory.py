@@ -0,0 +1,59 @@
+"""Measures the memory a decoded ledger takes as pydantic models and as compact records.
+
+Each mode decodes the same transactions blob the way the ledger cache does and reports
+the bytes still allocated once the intermediate JSON objects are gone. The session line
+is what one session held on top of the shared decode: the old transactions var copied
+the rows into its own list, sessions now read the shared tuple through the store.
+
+    python -m benchmarks.memory [--rows N]
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+from typing import Callable
+
+from app.ledger.records import TransactionRecord
+from app.models import Transaction
+from benchmarks.synthetic import synthetic_ledger
+
+
+def allocated(build: Callable[[], object]) -> tuple[object, int]:
+    """The value built and the bytes it keeps allocated."""
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+    blob = json.dumps([t.to_dict() for t in synthetic_ledger(args.rows).transactions])
+    print(f"{args.rows} transactions, {len(blob) / 2**20:.1f} MB of JSON")
+
+    models, model_bytes = allocated(
+        lambda: tuple(Transaction.model_validate(row) for row in json.loads(blob))
+    )
+    records, record_bytes = allocated(
+        lambda: tuple(map(TransactionRecord.from_dict, json.loads(blob)))
+    )
+    for name, size in (("pydantic", model_bytes), ("records", record_bytes)):
+        print(f"  {name:>8}: {size / 2**20:6.1f} MB, {size / args.rows:5.0f} B/row")
+    print(f"  records take {model_bytes / record_bytes:.1f}x less memory")
+
+    _, copied = allocated(lambda: list(models))
+    _, shared = allocated(lambda: records)
+    print(
+        f"  per session: {copied / 2**20:.2f} MB list copy before,"
+        f" {shared / 2**20:.2f} MB now"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Counts full-ledger scans needed to render the dashboard and insight metrics.
+
+The per-var baseline reproduces the loops each computed var used to run on its own; the
+kernel is the single aggregation pass (LedgerMetrics) every metric var now reads from.
+
+    python -m benchmarks.metric_scans [--rows N] [--repeat R]
+"""
+
+import argparse
+import datetime
+import time
+from collections import defaultdict
+from typing import Iterator
+
+from app.ledger.columns import LedgerColumns
+from app.ledger.metrics import aggregate, scan_counter
+from app.ledger.records import TransactionRecord
+from benchmarks.synthetic import synthetic_ledger
+
+EXPENSE_TYPES = {
+    "Expense",
+    "Loan Payment",
+    "Interest Payment",
+    "EMI",
+    "Insurance",
+    "Bill Payment",
+}
+
+
+class CountingRows:
+    """A transactions sequence that counts how many times it is iterated."""
+
+    def __init__(self, rows: tuple[TransactionRecord, ...]):
+        self.rows = rows
+        self.scans = 0
+
+    def __iter__(self) -> Iterator[TransactionRecord]:
+        self.scans += 1
+        return iter(self.rows)
+
+
+def per_var_metrics(transactions: CountingRows) -> dict:
+    """The metric vars as they were computed before the kernel, one scan (or more) each."""
+    current_month = datetime.date.today().strftime("%Y-%m")
+    by_budget_cat = defaultdict(float)
+    for t in transactions:  # budgets_with_progress
+        if t.type == "Expense" and t.date.startswith(current_month):
+            by_budget_cat[t.category] += t.amount
+    total_income = sum(t.amount for t in transactions if t.type == "Income")
+    total_expenses = sum(t.amount for t in transactions if t.type in EXPENSE_TYPES)
+    savings = defaultdict(float)
+    for t in transactions:  # savings_suggestions
+        if t.type == "Expense":
+            savings[t.category] += t.amount
+    expense_count = len(
+        [t for t in transactions if "Expense" in t.type]
+    )  # smart_alerts
+    avg = total_expenses / expense_count if expense_count else 0
+    len([t for t in transactions if "Expense" in t.type])
+    unusual = next(
+        (t for t in transactions if t.type == "Expense" and t.amount > avg * 3), None
+    )
+    monthly = defaultdict(float)
+    for t in transactions:  # income_vs_expense_data
+        if t.type in ("Income", "Expense"):
+            monthly[t.date[:7], t.type] += t.amount
+    by_category = defaultdict(float)
+    for t in transactions:  # expense_by_category_data
+        if t.type == "Expense" and t.date.startswith(current_month):
+            by_category[t.category] += t.amount
+    payables = sum(
+        t.amount for t in transactions if t.type == "Payables" and t.status == "pending"
+    )
+    receivables = sum(
+        t.amount
+        for t in transactions
+        if t.type == "Receivables" and t.status == "pending"
+    )
+    categories = sorted({t.category for t in transactions})  # all_categories
+    return {
+        "total_income": total_income,
+        "total_expenses": total_expenses,
+        "pending": (payables, receivables),
+        "unusual": unusual,
+        "by_category": dict(by_category),
+        "monthly": dict(monthly),
+        "categories": categories,
+        "budgets": dict(by_budget_cat),
+        "savings": dict(savings),
+    }
+
+
+def kernel_metrics(columns: LedgerColumns) -> dict:
+    """The same metrics read from one aggregation pass."""
+    current_month = datetime.date.today().strftime("%Y-%m")
+    metrics = aggregate(columns)
+    by_type = metrics.amount_by_type()
+    pending = metrics.amount_by_type("pending")
+    return {
+        "total_income": by_type.get("Income", 0),
+        "total_expenses": sum(by_type.get(t, 0) for t in EXPENSE_TYPES),
+        "pending": (pending.get("Payables", 0), pending.get("Receivables", 0)),
+        "unusual": metrics.max_amount("Expense"),
+        "by_category": metrics.amount_by_category("Expense", current_month),
+        "monthly": metrics.amount_by_month(("Income", "Expense")),
+        "categories": metrics.categories(),
+        "budgets": metrics.amount_by_category("Expense", current_month),
+        "savings": metrics.amount_by_category("Expense"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    rows = synthetic_ledger(args.rows).transactions
+    print(f"{args.rows} transactions, best of {args.repeat}")
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        counting = CountingRows(rows)
+        start = time.perf_counter()
+        per_var_metrics(counting)
+        best = min(best, time.perf_counter() - start)
+    print(f"  per-var: {counting.scans:2d} scans, {best * 1000:8.1f} ms")
+
+    build = kernel = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        columns = LedgerColumns.build(rows)
+        built = time.perf_counter()
+        scans = scan_counter["metrics"]
+        kernel_metrics(columns)
+        scans = scan_counter["metrics"] - scans
+        build = min(build, built - start)
+        kernel = min(kernel, time.perf_counter() - built)
+    print(f"   kernel: {scans:2d} scans, {kernel * 1000:8.1f} ms")
+    print(f"  columns: built once per revision in {build * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
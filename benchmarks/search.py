@@ -0,0 +1,107 @@
+"""Compares transaction search through the inverted index with the per-row scan it replaced.
+
+The scan lowercases every row's description and category on every query, as the search
+filter did before the index; the index looks up trigram or token postings and only
+touches the rows that can match.
+
+    python -m benchmarks.search [--rows N] [--repeat R]
+"""
+
+import argparse
+import time
+
+from app.ledger.query import (
+    SORT_MODES,
+    TransactionQuery,
+    count_transactions,
+    filter_transactions,
+    seek_transactions,
+)
+from app.ledger.records import TransactionRecord
+from app.ledger.search import SearchIndex
+from benchmarks.synthetic import synthetic_ledger
+from benchmarks.timing import best_of
+
+NEEDLES = ("#4242", "groc", "bob", "12", "no such text")
+
+
+def scan(
+    transactions: tuple[TransactionRecord, ...], needle: str
+) -> list[TransactionRecord]:
+    return [
+        t
+        for t in transactions
+        if needle in t.description.lower()
+        or needle in t.category.lower()
+        or needle in (t.party or "").lower()
+    ]
+
+
+def check_date_ranges():
+    """Checks a date range selects the same rows with a search as without one: a row
+    whose date does not parse is outside the range either way."""
+    rows = (
+        TransactionRecord(
+            id="a",
+            type="Expense",
+            amount=1,
+            category="Food",
+            date="2024-05-1",
+            description="lunch",
+        ),
+        TransactionRecord(
+            id="b",
+            type="Expense",
+            amount=2,
+            category="Food",
+            date="2024-05-15",
+            description="lunch",
+        ),
+    )
+    for sort_by in SORT_MODES:
+        for search in ("", "lunch"):
+            query = TransactionQuery(
+                search=search,
+                start_date="2024-05-01",
+                end_date="2024-05-31",
+                sort_by=sort_by,
+            )
+            found = (
+                [t.id for t in filter_transactions(rows, query)],
+                [t.id for t in seek_transactions(rows, query, None, 10)],
+                count_transactions(rows, query),
+            )
+            if found != (["b"], ["b"], 1):
+                raise RuntimeError(f"{query} selected {found}, not just b")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    check_date_ranges()
+    rows = synthetic_ledger(args.rows).transactions
+    print(f"{args.rows} transactions, best of {args.repeat}")
+
+    start = time.perf_counter()
+    index = SearchIndex.build(rows)
+    print(f"  index built once per revision in {(time.perf_counter() - start):.2f} s")
+    added = synthetic_ledger(10, seed=2).transactions
+    write = best_of(args.repeat, lambda: index.applied(added[:1], rows[:1]))
+    print(f"  one insert/delete applied in {write * 1000:.2f} ms")
+
+    print(f"  {'needle':>18} {'matches':>8} {'scan ms':>9} {'index ms':>9}")
+    for needle in NEEDLES:
+        matches = index.search(needle)
+        assert {t.id for t in matches} == {t.id for t in scan(rows, needle)}
+        scanned = best_of(args.repeat, lambda: scan(rows, needle))
+        indexed = best_of(args.repeat, lambda: index.search(needle))
+        print(
+            f"  {needle!r:>18} {len(matches):8d}"
+            f" {scanned * 1000:9.2f} {indexed * 1000:9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
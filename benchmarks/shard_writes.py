@@ -0,0 +1,94 @@
+"""Measures what transaction writes send to the browser with the journal and month shards.
+
+Each write returns the LocalStorage fields it changed; their size is what goes over the
+websocket and into LocalStorage. A write appends to the transactions journal, so it
+sends the journal (at most about JOURNAL_COMPACT_BYTES) whatever the ledger's size.
+Once the journal outgrows that, compaction rewrites the shards of the months its rows
+touched, plus the manifest; the baseline is the whole packed ledger compaction wrote
+before the shards. New rows are dated over the last month, as they are entered.
+
+    python -m benchmarks.shard_writes [--rows N] [--writes W]
+"""
+
+import argparse
+import time
+
+from app.ledger.packed import pack_transactions
+from app.ledger.shards import shard_ledger
+from app.storage.local import SHARD_FIELDS, LocalLedgerStore
+from app.storage.base import StoreUpdate
+from benchmarks.synthetic import synthetic_ledger
+
+
+def applied(store: LocalLedgerStore, update: StoreUpdate) -> LocalLedgerStore:
+    """The store after AppState assigned the fields of update."""
+    fields = dict(store.__dict__)
+    shards = list(store.transaction_shards)
+    for name, value in update.items():
+        if name in SHARD_FIELDS:
+            shards[SHARD_FIELDS.index(name)] = value
+        else:
+            fields[name] = value
+    fields["transaction_shards"] = tuple(shards)
+    return LocalLedgerStore(**fields)
+
+
+def sent(update: StoreUpdate) -> int:
+    """The characters of the transaction fields a write sends (the rollup aside)."""
+    return sum(len(value) for name, value in update.items() if name != "rollup_json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--writes", type=int, default=500)
+    args = parser.parse_args()
+    rows = synthetic_ledger(args.rows).transactions
+    shards, manifest = shard_ledger(rows)
+    store = LocalLedgerStore(
+        transaction_shards=tuple(shard.pack() for shard in shards),
+        transactions_manifest=manifest.to_json(),
+    )
+    new_rows = synthetic_ledger(args.writes, seed=2, years=1 / 12).transactions
+    print(f"{args.rows} transactions, {args.writes} inserts")
+
+    writes: list[int] = []
+    compactions: list[tuple[int, int, float]] = []
+    writing = 0.0
+    for row in new_rows:
+        start = time.perf_counter()
+        update = store.put_transactions(row)
+        writing += time.perf_counter() - start
+        writes.append(sent(update))
+        store = applied(store, update)
+        if store.needs_compaction():
+            start = time.perf_counter()
+            update = store.compact()
+            elapsed = time.perf_counter() - start
+            rewritten = sum(name in SHARD_FIELDS for name in update)
+            compactions.append((sent(update), rewritten, elapsed))
+            store = applied(store, update)
+    print(
+        f"  write (journal): {sum(writes) / len(writes):>9,.0f} chars on average,"
+        f" {max(writes):,} at most, {writing / args.writes * 1000:.1f} ms"
+    )
+
+    start = time.perf_counter()
+    whole = len(pack_transactions(store.transactions()))
+    packing = time.perf_counter() - start
+    if compactions:
+        size = sum(c[0] for c in compactions) / len(compactions)
+        shard_count = sum(c[1] for c in compactions) / len(compactions)
+        elapsed = sum(c[2] for c in compactions) / len(compactions)
+        print(
+            f"  compaction: {size:>14,.0f} chars, {elapsed * 1000:6.1f} ms"
+            f" ({len(compactions)}x, {shard_count:.1f} shards + manifest each)"
+        )
+        print(f"  whole-ledger compaction: {whole:>,} chars, {packing * 1000:6.1f} ms")
+        print(f"  {whole / size:.1f}x less written per compaction")
+    else:
+        print("  the journal never outgrew its limit; raise --writes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""Times the app's computed vars and ledger event handlers on synthetic ledgers, headless.
+
+For each ledger size (see benchmarks.synthetic.synthetic_ledger) the ledger is written
+through the configured store, as the app writes it; FINTRACK_STORAGE=sqlite benchmarks
+the server-side store. A local ledger is first checked to be seen changing by a write to
+one month shard alone. Then:
+
+  load   the first read of the ledger, which decodes it into the process-wide caches;
+  var    each computed var on a fresh session on its state's page, so it pays for the
+         vars it reads too, with the shared caches warm as they are for every session
+         after the first, but no memoized var results (app/memo.py), as after a write;
+  event  each handler on the dashboard, and the delta after it (the dirty vars
+         recomputed, and the bytes of JSON sent); page_load is what reloading the
+         page costs, idle.
+
+Times are the median of --repeat runs. --json writes the results with the commit they
+were measured at; --baseline compares against such a file from an earlier commit.
+
+    python -m benchmarks.state [--sizes N ...] [--repeat R] [--json PATH]
+                               [--baseline PATH]
+"""
+
+import argparse
+import asyncio
+import datetime
+import inspect
+import json
+import platform
+import statistics
+import subprocess
+import time
+from typing import Any, AsyncIterator, Callable, Optional
+
+import reflex as rx
+from reflex import constants
+from reflex.istate.data import RouterData
+from reflex.utils.format import json_dumps
+
+from app.memo import clear_memos
+from app.state import (
+    AnalyticsState,
+    AppState,
+    BudgetState,
+    InsightsState,
+    LoanState,
+    TransactionFormState,
+    TransactionListState,
+)
+from app.storage import SHARD_FIELDS, STORAGE_BACKEND
+from benchmarks.synthetic import synthetic_ledger
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+STATES = (
+    AppState,
+    TransactionListState,
+    TransactionFormState,
+    LoanState,
+    BudgetState,
+    AnalyticsState,
+    InsightsState,
+)
+"""The states with computed vars, the ledger's first."""
+
+
+def substate(root: rx.State, state: type[AppState]) -> Any:
+    return root.get_substate(state.get_full_name().split(".")[1:])
+
+
+def new_state(fields: dict[str, Any]) -> rx.State:
+    """A fresh session over the stored ledger: no var is cached on it yet."""
+    root = rx.State(_reflex_internal_init=True)
+    ledger = substate(root, AppState)
+    for name, value in fields.items():
+        setattr(ledger, name, value)
+    return root
+
+
+def show(root: rx.State, state: type[AppState]):
+    """Puts the session on the state's page, as navigating to it does."""
+    route = "/index" if state.route == "/" else state.route
+    root.router = RouterData.from_router_data({constants.RouteVar.PATH: route})
+
+
+def stored_ledger(n: int) -> dict[str, Any]:
+    """The session fields of a new n-row ledger written through the store."""
+    ledger = synthetic_ledger(n)
+    state = substate(new_state({}), AppState)
+    fields: dict[str, Any] = {}
+    store = state._writable_store()
+    fields["ledger_id"] = state.ledger_id
+    for update in (
+        store.put_loans(*ledger.loans),
+        store.put_transactions(*ledger.transactions),
+        store.put_budgets(*ledger.budgets),
+    ):
+        state._apply(update)
+        fields.update(update)
+        store = state._store()
+    if store.needs_compaction():
+        # As compact_journal does after a write outgrows the journal.
+        update = store.compact()
+        state._apply(update)
+        fields.update(update)
+    return fields
+
+
+def check_shard_write(fields: dict[str, Any]):
+    """Changes one month shard and nothing else, as a write from another tab can, and
+    checks the ledger revision moves: every ledger var is recomputed and memoized by it.
+    """
+    if STORAGE_BACKEND != "local":
+        return
+    root = new_state(fields)
+    state = substate(root, AppState)
+    revision = state._revision
+    root.get_delta()
+    root._clean()
+    for field in SHARD_FIELDS:
+        if getattr(state, field):
+            setattr(state, field, "")
+            if state._revision == revision:
+                raise RuntimeError(f"changing only {field} kept the ledger revision")
+            return
+
+
+def timed(run: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def drain(result: Any):
+    """Runs an event handler's generator, as the event processor does."""
+    if inspect.isasyncgen(result):
+        asyncio.run(_drain_async(result))
+    elif result is not None and hasattr(result, "__next__"):
+        for _ in result:
+            pass
+
+
+async def _drain_async(result: AsyncIterator[Any]):
+    async for _ in result:
+        pass
+
+
+def session_fields(root: rx.State, fields: dict[str, Any]) -> dict[str, Any]:
+    ledger = substate(root, AppState)
+    return {name: getattr(ledger, name) for name in fields}
+
+
+def event_cases(root: rx.State) -> list[tuple[str, Callable[[], Any]]]:
+    """The handlers to time, bound to rows of the session's ledger."""
+    state = substate(root, AppState)
+    form_state = substate(root, TransactionFormState)
+    list_state = substate(root, TransactionListState)
+    rows = state._store().transactions()
+    payable = next(t.id for t in rows if t.type == "Payables" and t.status == "pending")
+    receivable = next(
+        t.id for t in rows if t.type == "Receivables" and t.status == "pending"
+    )
+    form = {
+        "amount": "42.50",
+        "date": datetime.date.today().isoformat(),
+        "category": "Food",
+        "description": "Benchmark lunch",
+    }
+    added: list[str] = []
+    stored = {
+        n: getattr(state, n) for n in AppState.base_vars if state._is_client_storage(n)
+    }
+
+    def page_load():
+        # The browser sends back every stored field, unchanged, then runs on_load.
+        for name, value in stored.items():
+            setattr(state, name, value)
+        drain(state.check_storage())
+
+    def add_transaction():
+        form_state.current_transaction_type = "Expense"
+        drain(form_state.add_transaction(form))
+        added.append(state._store().transactions()[0].id)
+
+    return [
+        ("page_load", page_load),
+        ("add_transaction", add_transaction),
+        ("settle_payable", lambda: drain(state.settle_payable(payable))),
+        ("settle_receivable", lambda: drain(state.settle_receivable(receivable))),
+        ("delete_transaction", lambda: drain(state.delete_transaction(added[-1]))),
+        ("set_search_query", lambda: drain(list_state.set_search_query("coffee"))),
+        ("set_filter_type", lambda: drain(list_state.set_filter_type("Expense"))),
+        ("next_page", lambda: drain(list_state.next_page())),
+        ("clear_filters", lambda: drain(list_state.clear_filters())),
+    ]
+
+
+def benchmark(n: int, repeat: int) -> list[dict[str, Any]]:
+    results = []
+
+    def record(kind: str, name: str, seconds: list[float], **extra):
+        results.append(
+            {
+                "rows": n,
+                "kind": kind,
+                "name": name,
+                "ms": statistics.median(seconds) * 1000,
+                "min_ms": min(seconds) * 1000,
+                **extra,
+            }
+        )
+
+    start = time.perf_counter()
+    fields = stored_ledger(n)
+    print(f"{n} rows written in {time.perf_counter() - start:.2f}s")
+    check_shard_write(fields)
+    state = substate(new_state(fields), AppState)
+    record("load", "ledger", [timed(lambda: state._store().snapshot())])
+
+    for cls in STATES:
+        for name in sorted(cls.computed_vars):
+            seconds = []
+            for _ in range(repeat):
+                root = new_state(fields)
+                show(root, cls)
+                state = substate(root, cls)
+                clear_memos()
+                seconds.append(timed(lambda: getattr(state, name)))
+            record("var", name, seconds)
+
+    handler_times: dict[str, list[float]] = {}
+    delta_times: dict[str, list[float]] = {}
+    delta_sizes: dict[str, int] = {}
+    for _ in range(repeat):
+        # Each round runs on a session that has rendered the dashboard, so only what
+        # an event dirties is recomputed; the ledger carries over from round to round.
+        root = new_state(fields)
+        show(root, TransactionListState)
+        root.get_delta()
+        root._clean()
+        for name, run in event_cases(root):
+            handler_times.setdefault(name, []).append(timed(run))
+            start = time.perf_counter()
+            delta = root.get_delta()
+            delta_times.setdefault(name, []).append(time.perf_counter() - start)
+            delta_sizes[name] = len(json_dumps(delta).encode())
+            root._clean()
+        fields = session_fields(root, fields)
+    for name, seconds in handler_times.items():
+        delta = statistics.median(delta_times[name]) * 1000
+        record("event", name, seconds, delta_ms=delta, delta_bytes=delta_sizes[name])
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: list[dict[str, Any]], baseline: dict[tuple, float]):
+    print(
+        f"  {'kind':>5} {'name':<28} {'ms':>10} {'delta ms':>9} {'delta KB':>9}"
+        f" {'vs base':>8}"
+    )
+    for r in results:
+        delta = f"{r['delta_ms']:9.2f}" if "delta_ms" in r else " " * 9
+        size = f"{r['delta_bytes'] / 1024:9.1f}" if "delta_bytes" in r else " " * 9
+        before = baseline.get((r["rows"], r["kind"], r["name"]))
+        change = f"{r['ms'] / before:7.2f}x" if before else ""
+        print(
+            f"  {r['kind']:>5} {r['name']:<28} {r['ms']:10.2f} {delta} {size}"
+            f" {change:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="a --json file to compare against")
+    args = parser.parse_args()
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {
+                (r["rows"], r["kind"], r["name"]): r["ms"]
+                for r in json.load(f)["results"]
+            }
+    results = []
+    for n in args.sizes:
+        rows = benchmark(n, args.repeat)
+        print_results(rows, baseline)
+        results += rows
+    if args.json:
+        report = {
+            "commit": git_commit(),
+            "storage": STORAGE_BACKEND,
+            "python": platform.python_version(),
+            "measured": datetime.datetime.now().isoformat(timespec="seconds"),
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Compares the size of the transactions blob as JSON (transactions_v2) and packed.
+
+Browsers cap LocalStorage at about 5 MB per origin, counted in UTF-16 characters; the
+packed blob is ASCII base64, so characters are what counts for both formats.
+
+    python -m benchmarks.storage_size [--rows N] [--repeat R]
+"""
+
+import argparse
+import json
+
+from app.ledger.packed import pack_transactions, unpack_transactions
+from app.ledger.records import TransactionRecord
+from benchmarks.synthetic import synthetic_ledger
+from benchmarks.timing import best_of
+
+QUOTA_CHARS = 5 * 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    rows = synthetic_ledger(args.rows).transactions
+    legacy = json.dumps([t.to_dict() for t in rows])
+    packed = pack_transactions(rows)
+    assert unpack_transactions(packed) == rows
+    print(f"{args.rows} transactions, best of {args.repeat}")
+    print(
+        f"  {'format':>8} {'chars/row':>10} {'rows in 5 MB':>13} {'write ms':>9} {'read ms':>8}"
+    )
+    formats = (
+        (
+            "json",
+            legacy,
+            lambda: json.dumps([t.to_dict() for t in rows]),
+            lambda: tuple(map(TransactionRecord.from_dict, json.loads(legacy))),
+        ),
+        (
+            "packed",
+            packed,
+            lambda: pack_transactions(rows),
+            lambda: unpack_transactions(packed),
+        ),
+    )
+    for name, blob, write, read in formats:
+        per_row = len(blob) / args.rows
+        print(
+            f"  {name:>8} {per_row:10.1f} {QUOTA_CHARS / per_row:13,.0f}"
+            f" {best_of(args.repeat, write) * 1000:9.0f}"
+            f" {best_of(args.repeat, read) * 1000:8.0f}"
+        )
+    print(f"  packed fits {len(legacy) / len(packed):.1f}x more transactions")
+
+
+if __name__ == "__main__":
+    main()
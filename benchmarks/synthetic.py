@@ -0,0 +1,196 @@
+import datetime
+import random
+from dataclasses import dataclass
+
+from app.ledger.records import TransactionRecord
+from app.models import Budget, Loan
+
+DESCRIPTIONS = (
+    "Groceries",
+    "Coffee",
+    "Uber ride",
+    "Rent",
+    "Electricity bill",
+    "Monthly salary",
+    "Netflix",
+    "Lunch with team",
+    "Fuel",
+    "Amazon order",
+)
+
+
+LEDGER_CATEGORIES = {
+    "Income": ("Salary", "Freelance", "Investment", "Gift", "Other"),
+    "Expense": ("Food", "Groceries", "Transport", "Shopping", "Entertainment"),
+    "EMI": ("Electronics", "Vehicle", "Home Appliance"),
+    "Insurance": ("Health", "Life", "Vehicle", "Home"),
+    "Bill Payment": ("Electricity", "Water", "Internet", "Phone", "Gas"),
+    "Payables": ("Friend", "Vendor", "Credit"),
+    "Receivables": ("Friend", "Client", "Refund"),
+}
+"""Categories per type, as the transaction form offers them."""
+
+LEDGER_AMOUNTS = {
+    "Income": (500, 5000),
+    "Expense": (1, 300),
+    "EMI": (50, 800),
+    "Insurance": (30, 500),
+    "Bill Payment": (20, 300),
+    "Payables": (10, 1000),
+    "Receivables": (10, 1000),
+}
+
+LEDGER_ROWS = {
+    "Expense": 40,
+    "Income": 8,
+    "Bill Payment": 8,
+    "EMI": 3,
+    "Insurance": 2,
+    "Payables": 4,
+    "Receivables": 4,
+    "Settlement": 4,
+    "Loan Payment": 3,
+    "Interest Payment": 2,
+    "Loan Taken": 0.05,
+    "Loan Given": 0.05,
+}
+"""How often each kind of row is entered; a settlement pays off an open payable or
+receivable."""
+
+PARTIES = ("Alice", "Bob", "Landlord", "Bank", "Acme Corp", "Carol")
+
+
+@dataclass(frozen=True)
+class SyntheticLedger:
+    transactions: tuple[TransactionRecord, ...]
+    loans: tuple[Loan, ...]
+    budgets: tuple[Budget, ...]
+
+
+def synthetic_ledger(n: int, seed: int = 1, years: float = 3) -> SyntheticLedger:
+    """A ledger of n transactions entered through the app over the last few years.
+
+    Every transaction type occurs: loans are taken and given, then paid down (some to
+    Paid Off) with Loan and Interest Payments, and about half of the payables and
+    receivables are settled by a linked settlement row, as settle_payable and
+    settle_receivable write them. Rows are newest first, with a budget per expense
+    category.
+    """
+    rng = random.Random(seed)
+    span = datetime.timedelta(days=365 * years)
+    step = span / max(n, 1)
+    start = datetime.datetime.now() - span
+    kinds = list(LEDGER_ROWS)
+    weights = list(LEDGER_ROWS.values())
+    # Enter each type once up front, so small ledgers have them all.
+    first = ["Loan Taken", "Loan Given", *LEDGER_AMOUNTS, "Loan Payment"]
+    first += ["Interest Payment", "Settlement"]
+    rows: list[TransactionRecord] = []
+    loans: dict[str, Loan] = {}
+    active: list[str] = []
+    open_pending: list[int] = []
+    for i in range(n):
+        moment = start + step * i
+        tx_id = moment.isoformat()
+        date = (moment.date() - datetime.timedelta(days=rng.randint(0, 3))).isoformat()
+        kind = first[i] if i < len(first) else rng.choices(kinds, weights)[0]
+        if kind in ("Loan Payment", "Interest Payment") and not active:
+            kind = "Expense"
+        if kind == "Settlement" and not open_pending:
+            kind = "Expense"
+        if kind in ("Loan Taken", "Loan Given"):
+            party = rng.choice(PARTIES)
+            loan = Loan(
+                id=tx_id,
+                type=kind.split()[1],
+                principal=round(rng.uniform(1000, 50_000), 2),
+                interest_rate=round(rng.uniform(3, 15), 1),
+                party=party,
+                start_date=date,
+            )
+            loans[loan.id] = loan
+            active.append(loan.id)
+            row = TransactionRecord(
+                id=tx_id,
+                type=kind,
+                amount=loan.principal,
+                category=f"Loan with {party}",
+                date=date,
+                description=f"{kind} from/to {party}",
+                loan_id=loan.id,
+                party=party,
+            )
+        elif kind in ("Loan Payment", "Interest Payment"):
+            loan = loans[rng.choice(active)]
+            status = "active"
+            if kind == "Loan Payment":
+                amount = min(
+                    loan.outstanding_balance,
+                    round(loan.principal * rng.uniform(0.005, 0.03), 2),
+                )
+                loan = loan.model_copy(
+                    update={"payments_made": loan.payments_made + amount}
+                )
+                if loan.outstanding_balance <= 0:
+                    loan = loan.model_copy(update={"status": "Paid Off"})
+                    active.remove(loan.id)
+                    status = "settled"
+                loans[loan.id] = loan
+            else:
+                amount = round(loan.principal * loan.interest_rate / 1200, 2)
+            row = TransactionRecord(
+                id=tx_id,
+                type=kind,
+                amount=amount,
+                category=f"{kind.split(' ')[0]} for loan from/to {loan.party}",
+                date=date,
+                description=f"{kind} for loan with {loan.party}",
+                status=status,
+                loan_id=loan.id,
+            )
+        elif kind == "Settlement":
+            index = open_pending.pop(rng.randrange(len(open_pending)))
+            original = rows[index] = rows[index].replace(status="settled")
+            payable = original.type == "Payables"
+            row = TransactionRecord(
+                id=tx_id,
+                type="Expense" if payable else "Income",
+                amount=original.amount,
+                category="Settlement",
+                date=date,
+                description=(
+                    f"Paid off: {original.description}"
+                    if payable
+                    else f"Received payment for: {original.description}"
+                ),
+                status="settled" if payable else "received",
+                linked_transaction_id=original.id,
+                party=original.party,
+            )
+        else:
+            pending = kind in ("Payables", "Receivables")
+            low, high = LEDGER_AMOUNTS[kind]
+            category = rng.choice(LEDGER_CATEGORIES[kind])
+            description = rng.choice(DESCRIPTIONS)
+            if rng.random() < 0.2:
+                description = f"{description} #{rng.randint(1, 9999)}"
+            row = TransactionRecord(
+                id=tx_id,
+                type=kind,
+                amount=round(rng.uniform(low, high), 2),
+                category=category,
+                date=date,
+                description=description,
+                status="pending" if pending else "active",
+                party=rng.choice(PARTIES) if pending else None,
+            )
+            if pending:
+                open_pending.append(len(rows))
+        rows.append(row)
+    budgets = tuple(
+        Budget(
+            id=f"budget-{category}", category=category, limit=rng.randrange(200, 2000)
+        )
+        for category in LEDGER_CATEGORIES["Expense"]
+    )
+    return SyntheticLedger(tuple(reversed(rows)), tuple(loans.values()), budgets)